@@ -0,0 +1,606 @@
+"""
+적재 파이프라인 벤치마크
+
+사용법 (airflow 컨테이너의 dags 디렉토리에서):
+    python -m alter.benchmarks bulk-upsert                        # SQLite 메모리 DB, 10,000건
+    python -m alter.benchmarks bulk-upsert --listings 50000 --batch-size 500
+    python -m alter.benchmarks bulk-upsert --db-url postgresql://user:pw@host:5432/db
+    python -m alter.benchmarks landing-replay --listings 50000   # 원본 보관 → 재처리 처리량
+    python -m alter.benchmarks transform                         # 코드 변환/매물 변환 처리량 (10,000건 기준)
+    python -m alter.benchmarks haversine                         # 스칼라/벡터/kdtree 거리 계산 (매물 100,000 x 주소 50,000)
+    python -m alter.benchmarks distance-pool --processes 1 2 4   # 프로세스 수별 거리 계산 처리량
+    python -m alter.benchmarks distance-pipeline                 # 합성 서울 데이터로 calculate_distances 전체/증분 실행
+    python -m alter.benchmarks distance-pipeline --db-url postgresql://user:pw@host:5432/db --output result.json
+
+--db-url 에는 테스트용 DB를 사용한다 (합성 매물은 BENCHMARK_ID_START 이후 ID로 저장되고 남아 있음).
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from alter.models import Base
+from alter.property_writer import PropertyBulkWriter, transform_listing
+from .enums import (
+    SeoulDistrictCode, PropertyType, NaverSubCategory, HeatingType, DirectionType,
+    BuildingUseType, MoveInType, LoanAvailability, TransactionType,
+    CoolingType, LivingFacilityType, SecurityType, FacilityType, decoder_for
+)
+
+# 서울 경계 (import_real_estate.get_property_data 의 조회 범위와 동일)
+SEOUL_BBOX = (37.3707375, 126.662614, 37.6909188, 127.266862)
+
+# 실제 매물 ID와 겹치지 않도록 합성 매물은 이 값부터 ID를 부여
+BENCHMARK_ID_START = 900000000
+
+
+def create_benchmark_engine(db_url=None):
+    """벤치마크용 엔진 생성 (db_url 이 없으면 realestate 스키마를 붙인 SQLite 메모리 DB)"""
+    if db_url:
+        engine = create_engine(db_url, connect_args={'options': '-c search_path=realestate,public'})
+    else:
+        engine = create_engine('sqlite://', poolclass=StaticPool)
+
+        @event.listens_for(engine, 'connect')
+        def attach_schema(dbapi_connection, connection_record):
+            dbapi_connection.execute("ATTACH DATABASE ':memory:' AS realestate")
+
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _codes(enum_type):
+    return [member.value for member in enum_type if member.value != 'UNKNOWN']
+
+
+def make_listings(count: int, seed: int = 42, start_id: int = BENCHMARK_ID_START) -> List[dict]:
+    """상세 API 응답(item)과 같은 형태의 합성 매물 생성"""
+    rng = random.Random(seed)
+    south, west, north, east = SEOUL_BBOX
+    districts = [district.name for district in SeoulDistrictCode]
+    trade_types = _codes(TransactionType)
+
+    listings = []
+    for property_id in range(start_id, start_id + count):
+        listings.append({
+            'seq': property_id,
+            'legalDong': {'sidoName': '서울시', 'gugunName': rng.choice(districts), 'dongName': '테스트동'},
+            'center': {'coordinates': [rng.uniform(west, east), rng.uniform(south, north)]},
+            'jibunMainNumber': str(rng.randint(1, 999)),
+            'jibunSubNumber': str(rng.randint(0, 99)),
+            'categoryCode': rng.choice(_codes(PropertyType)),
+            'subCategoryCode': rng.choice(_codes(NaverSubCategory)),
+            'buildingName': f'테스트빌딩{property_id % 500}',
+            'useApproveDay': '2010-01-01',
+            'space1': round(rng.uniform(20, 200), 2),
+            'space2': round(rng.uniform(15, 150), 2),
+            'onFloorCount': rng.randint(1, 30),
+            'underFloorCount': rng.randint(0, 3),
+            'room': rng.randint(1, 5),
+            'restroom': rng.randint(1, 3),
+            'parkingCount': rng.randint(0, 2),
+            'heatTypeCode': rng.choice(_codes(HeatingType)),
+            'directionCode': rng.choice(_codes(DirectionType)),
+            'lawUsageCode': rng.choice(_codes(BuildingUseType)),
+            'facilitiesAircon': f'["{rng.choice(_codes(CoolingType))}"]',
+            'facilitiesLife': f'["{rng.choice(_codes(LivingFacilityType))}", "{rng.choice(_codes(LivingFacilityType))}"]',
+            'facilitiesSecurity': f'["{rng.choice(_codes(SecurityType))}"]',
+            'facilitiesEtc': f'["{rng.choice(_codes(FacilityType))}"]',
+            'description': '역세권 채광 좋은 매물 ' * rng.randint(1, 10),
+            'photoList': [],
+            'moveInTypeCode': rng.choice(_codes(MoveInType)),
+            'loanCode': rng.choice(_codes(LoanAvailability)),
+            'negotiationFlagCode': rng.choice(['30054Y', '30054N']),
+            'tradeTypeCode': rng.choice(trade_types),
+            'price1': rng.randint(1000, 200000),
+            'price2': rng.randint(0, 300),
+        })
+    return listings
+
+
+def benchmark_bulk_upsert(listings: int, batch_size: int, db_url=None, seed: int = 42):
+    """
+    PropertyBulkWriter 의 집합 단위 저장과 매물 단위(savepoint) 저장 속도 비교
+
+    두 번째 실행(rerun)은 같은 매물을 다시 적재한다. bulk 는 내용 해시가 같아 last_seen 만 갱신하고,
+    row 는 매번 ON CONFLICT DO UPDATE 로 다시 쓴다.
+    """
+    results = []
+
+    for offset, mode in enumerate(('bulk', 'row')):
+        items = make_listings(listings, seed, BENCHMARK_ID_START + offset * listings)
+        engine = create_benchmark_engine(db_url)
+        session = sessionmaker(bind=engine)()
+        writer = PropertyBulkWriter(session)
+
+        for run in ('insert', 'rerun'):
+            start = time.perf_counter()
+            saved = 0
+            for i in range(0, len(items), batch_size):
+                batch = items[i:i + batch_size]
+                if mode == 'bulk':
+                    saved += writer.write_batch(batch)
+                else:
+                    listings_, _ = writer.transform_batch(batch)
+                    saved += writer._write_one_by_one(listings_)[0]
+            elapsed = time.perf_counter() - start
+            results.append((mode, run, saved, elapsed))
+
+        session.close()
+        engine.dispose()
+
+    print(f"\n{'mode':<6} {'run':<7} {'rows':>8} {'seconds':>9} {'rows/sec':>10}")
+    for mode, run, saved, elapsed in results:
+        print(f"{mode:<6} {run:<7} {saved:>8} {elapsed:>9.2f} {saved / elapsed:>10.0f}")
+
+
+def benchmark_landing_replay(listings: int, batch_size: int, db_url=None, seed: int = 42):
+    """
+    합성 상세 응답을 landing 파티션에 저장한 뒤 네트워크 없이 재처리하는 속도 측정
+
+    landing 쓰기, 파일 읽기(압축 해제 + JSON 파싱), 재처리 적재를 나눠서 출력한다.
+    """
+    from alter.landing import LandingWriter, iter_landing, replay_district
+
+    items = make_listings(listings, seed)
+    with tempfile.TemporaryDirectory() as root:
+        landing = LandingWriter(root=root, run_date='2024-01-01')
+        start = time.perf_counter()
+        for i in range(0, len(items), 100):
+            landing.write_details('벤치마크구', [{'result': {'item': item}} for item in items[i:i + 100]])
+        write_elapsed = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(root, 'dt=2024-01-01', 'detail', '벤치마크구.jsonl.gz'))
+
+        start = time.perf_counter()
+        read_count = sum(1 for _ in iter_landing('2024-01-01', 'detail', '벤치마크구', root))
+        read_elapsed = time.perf_counter() - start
+
+        engine = create_benchmark_engine(db_url)
+        session = sessionmaker(bind=engine)()
+        writer = PropertyBulkWriter(session)
+        start = time.perf_counter()
+        replayed = replay_district(writer, '2024-01-01', '벤치마크구', batch_size, root)
+        replay_elapsed = time.perf_counter() - start
+        session.close()
+        engine.dispose()
+
+    print(f"\nlanding 파일 크기: {size / 1024 / 1024:.1f} MB ({size / listings:.0f} bytes/매물)")
+    print(f"{'stage':<8} {'rows':>8} {'seconds':>9} {'rows/sec':>10}")
+    for stage, rows, elapsed in (('write', listings, write_elapsed),
+                                 ('read', read_count, read_elapsed),
+                                 ('replay', replayed, replay_elapsed)):
+        print(f"{stage:<8} {rows:>8} {elapsed:>9.2f} {rows / elapsed:>10.0f}")
+
+
+def benchmark_transform(listings: int, repeat: int = 3, seed: int = 42):
+    """
+    코드 변환 방식별 처리량과 transform_listing 처리량 측정 (10,000건당 소요 시간 출력)
+
+    enum: 매물마다 HeatingType(code).name 처럼 enum 생성자 호출 (이전 방식)
+    table: decoder_for(enum).decode_many 로 미리 만든 dict 조회
+    """
+    from datetime import datetime
+
+    items = make_listings(listings, seed)
+    columns = (
+        (PropertyType, 'categoryCode'), (NaverSubCategory, 'subCategoryCode'), (HeatingType, 'heatTypeCode'),
+        (DirectionType, 'directionCode'), (BuildingUseType, 'lawUsageCode'), (MoveInType, 'moveInTypeCode'),
+        (LoanAvailability, 'loanCode'), (TransactionType, 'tradeTypeCode'),
+    )
+    code_columns = [(enum_type, [item[key] for item in items]) for enum_type, key in columns]
+
+    def enum_decode():
+        for enum_type, codes in code_columns:
+            [enum_type(code).name if code else 'UNKNOWN' for code in codes]
+
+    def table_decode():
+        for enum_type, codes in code_columns:
+            decoder_for(enum_type).decode_many(codes)
+
+    def transform():
+        now = datetime.now()
+        for item in items:
+            transform_listing(item, now)
+
+    per_10k = 10000 / listings
+    print(f"\n{'stage':<10} {'sec/10k':>9} {'rows/sec':>10}")
+    for stage, func in (('enum', enum_decode), ('table', table_decode), ('transform', transform)):
+        elapsed = min(_timed(func) for _ in range(repeat))
+        print(f"{stage:<10} {elapsed * per_10k:>9.3f} {listings / elapsed:>10.0f}")
+
+    # 대기열에 쌓이는 형태별 메모리: 원본 JSON / 테이블별 dict 4개 / ListingRecord
+    now = datetime.now()
+    tracemalloc.start()
+    raw = json.loads(json.dumps(items))
+    raw_size = tracemalloc.get_traced_memory()[0]
+    records = [transform_listing(item, now) for item in raw]
+    del raw
+    records_size = tracemalloc.get_traced_memory()[0]
+    rows = [record.as_rows() for record in records]
+    del records
+    rows_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+
+    print(f"\n{'format':<10} {'MB/10k':>9}")
+    for name, size in (('raw json', raw_size), ('dict rows', rows_size), ('record', records_size)):
+        print(f"{name:<10} {size * per_10k / 1024 / 1024:>9.1f}")
+
+
+def make_points(count: int, seed: int = 42, start_id: int = 1):
+    """서울 경계 안의 합성 (id, 위도, 경도) 목록"""
+    rng = random.Random(seed)
+    south, west, north, east = SEOUL_BBOX
+    return [(point_id, rng.uniform(south, north), rng.uniform(west, east))
+            for point_id in range(start_id, start_id + count)]
+
+
+def benchmark_haversine(properties: int, addresses: int, max_distance: int = 1000,
+                        sample_pairs: int = 200000, verify_origins: int = 2000, seed: int = 42):
+    """
+    매물 x 주소 거리 계산: 스칼라(이전 방식)와 NumPy 벡터 방식 비교
+
+    scalar: 쌍마다 _quick_distance_filter + calculate_distance (표본 쌍으로 측정해 전체 쌍 수로 환산)
+    matrix: haversine_matrix 로 전체 행렬 계산 (매물 표본으로 측정해 환산)
+    pairs: pairs_within 으로 반경 안 쌍만 추출 (전체 실행)
+    kdtree: AddressIndex(cKDTree) 생성 + 전체 매물 반경 질의 (scipy 가 있을 때)
+
+    끝으로 매물 표본에 대해 인덱스 질의 결과가 전체 쌍 계산과 정확히 같은지 확인한다.
+    """
+    import numpy as np
+    from alter.calculate_distances import DistanceCalculator
+    from alter.spatial_index import AddressIndex, cKDTree, verify_against_brute_force
+
+    calculator = DistanceCalculator(max_distance=max_distance)
+    property_rows = make_points(properties, seed)
+    address_rows = make_points(addresses, seed + 1)
+    total_pairs = properties * addresses
+
+    start = time.perf_counter()
+    property_points = calculator.prepare_points(property_rows)
+    address_points = calculator.prepare_points(address_rows)
+    prepare_elapsed = time.perf_counter() - start
+
+    # 스칼라: 표본 매물 x 전체 주소 중 앞쪽 sample_pairs 쌍
+    sample_properties = max(1, sample_pairs // addresses)
+    scalar_rows = property_rows[:sample_properties]
+    scalar_targets = address_rows[:sample_pairs // sample_properties]
+    scalar_results = {}
+    start = time.perf_counter()
+    for prop_id, prop_lat, prop_lon in scalar_rows:
+        for addr_id, addr_lat, addr_lon in scalar_targets:
+            if calculator._quick_distance_filter(prop_lat, prop_lon, addr_lat, addr_lon):
+                distance = calculator.calculate_distance(prop_lat, prop_lon, addr_lat, addr_lon)
+                if distance <= max_distance:
+                    scalar_results[(prop_id, addr_id)] = distance
+    scalar_elapsed = time.perf_counter() - start
+    scalar_count = len(scalar_rows) * len(scalar_targets)
+
+    # 같은 표본을 벡터 방식으로 계산해 결과 비교
+    vector_ids = calculator.pairs_within(calculator.prepare_points(scalar_rows),
+                                         calculator.prepare_points(scalar_targets))
+    vector_results = dict(zip(zip(vector_ids[0].tolist(), vector_ids[1].tolist()), vector_ids[2].tolist()))
+    max_error = max((abs(vector_results[key] - value) for key, value in scalar_results.items()
+                     if key in vector_results), default=0.0)
+
+    matrix_rows = property_points.slice(0, max(1, sample_pairs * 10 // addresses))
+    start = time.perf_counter()
+    calculator.haversine_matrix(matrix_rows, address_points)
+    matrix_elapsed = time.perf_counter() - start
+    matrix_count = len(matrix_rows) * addresses
+
+    start = time.perf_counter()
+    found = sum(len(ids) for ids, _, _ in calculator.iter_pairs_within(property_points, address_points))
+    pairs_elapsed = time.perf_counter() - start
+
+    index_rows = []
+    if cKDTree is not None:
+        start = time.perf_counter()
+        index = AddressIndex(address_points, calculator.earth_radius)
+        build_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        index_found = sum(len(ids) for ids, _, _ in index.iter_query_radius(property_points, max_distance))
+        index_rows.append(('kdtree', total_pairs, build_elapsed + time.perf_counter() - start))
+        if index_found != found:
+            raise AssertionError(f"kdtree/band 결과 쌍 수가 다릅니다: {index_found} / {found}")
+
+    # 매물 표본으로 인덱스 질의 결과가 전체 쌍 계산과 정확히 같은지 확인
+    verify_points = property_points.take(
+        np.random.default_rng(seed).choice(len(property_points), min(verify_origins, len(property_points)),
+                                           replace=False)
+    )
+    checks = [verify_against_brute_force(AddressIndex(address_points, calculator.earth_radius, backend),
+                                         verify_points, max_distance)
+              for backend in (('kdtree', 'band') if cKDTree is not None else ('band',))]
+
+    print(f"\n매물 {properties:,} x 주소 {addresses:,} = {total_pairs:,}쌍, 반경 {max_distance}m, "
+          f"좌표 준비 {prepare_elapsed:.2f}초")
+    print(f"표본 결과: 스칼라 {len(scalar_results)}쌍 / 벡터 {len(vector_results)}쌍, 최대 오차 {max_error:.2e}m")
+    print(f"{'method':<8} {'measured':>12} {'seconds':>9} {'pairs/sec':>14} {'est. total sec':>15}")
+    for method, count, elapsed in (('scalar', scalar_count, scalar_elapsed),
+                                   ('matrix', matrix_count, matrix_elapsed),
+                                   ('pairs', total_pairs, pairs_elapsed), *index_rows):
+        rate = count / elapsed
+        print(f"{method:<8} {count:>12,} {elapsed:>9.2f} {rate:>14,.0f} {total_pairs / rate:>15,.1f}")
+    print(f"반경 안 쌍: {found:,}개")
+    for check in checks:
+        print(f"전체 계산 대조 ({check['backend']}): 매물 {check['origins']:,}개, {check['pairs']:,}쌍 일치")
+
+
+def benchmark_distance_pool(properties: int, addresses: int, processes: List[int], max_distance: int = 1000,
+                            batch_size: int = 20000, seed: int = 42):
+    """
+    프로세스 수별 거리 계산 처리량 (DB 저장 제외)
+
+    calculate_distances 와 같이 매물을 batch_size 개씩 나눠 DistancePool.compute 로 계산한다.
+    1 은 메인 프로세스에서 AddressIndex 로 직접 계산한 기준값이며, 모든 모드의 결과 쌍 수가 같아야 한다.
+    """
+    from alter.distance_pool import DistancePool
+    from alter.spatial_index import AddressIndex, prepare_points
+
+    property_rows = make_points(properties, seed)
+    address_points = prepare_points(make_points(addresses, seed + 1))
+    batches = [property_rows[i:i + batch_size] for i in range(0, len(property_rows), batch_size)]
+
+    results = []
+    for count in processes:
+        start = time.perf_counter()
+        found = 0
+        if count <= 1:
+            index = AddressIndex(address_points)
+            for rows in batches:
+                found += len(index.query_radius(prepare_points(rows), max_distance)[0])
+        else:
+            with DistancePool({'all': address_points}, count) as pool:
+                for rows in batches:
+                    found += sum(len(pairs[0]) for _, pairs in pool.compute([('all', rows, max_distance)]))
+        results.append((count, found, time.perf_counter() - start))
+
+    baseline_found, baseline_elapsed = results[0][1], results[0][2]
+    print(f"\n매물 {properties:,} x 주소 {addresses:,}, 반경 {max_distance}m, CPU {os.cpu_count()}개")
+    print(f"{'procs':>5} {'pairs':>12} {'seconds':>9} {'pairs/sec':>12} {'speedup':>8}")
+    for count, found, elapsed in results:
+        if found != baseline_found:
+            raise AssertionError(f"프로세스 {count}개 결과가 다릅니다: {found} / {baseline_found}")
+        print(f"{count:>5} {found:>12,} {elapsed:>9.2f} {found / elapsed:>12,.0f} {baseline_elapsed / elapsed:>8.2f}")
+
+
+def make_seoul_dataset(session, properties: int, addresses: int, subway: int, facilities: int, festivals: int,
+                       cluster_ratio: float = 0.7, seed: int = 42, start_id: int = BENCHMARK_ID_START):
+    """
+    서울 경계 안의 합성 매물/주소/POI 를 DB에 저장
+
+    주소는 앞에서부터 지하철역(subway), 문화시설(facilities), 문화축제(festivals), 일반 주소 순이다.
+    매물의 cluster_ratio 는 임의의 지하철역 주변(표준편차 약 500m)에, 나머지는 경계 안에 고르게 배치한다.
+    """
+    from sqlalchemy import insert
+    from alter.geohash import encode
+    from alter.models import (Address, CulturalFacility, CulturalFestival, PropertyLocation,
+                              SubwayStation)
+
+    if subway + facilities + festivals > addresses:
+        raise ValueError("POI 수의 합이 주소 수보다 많습니다")
+    rng = random.Random(seed)
+    south, west, north, east = SEOUL_BBOX
+    address_rows = make_points(addresses, seed + 1, start_id)
+    stations = address_rows[:subway] or address_rows
+
+    property_rows = []
+    for property_id in range(start_id, start_id + properties):
+        if rng.random() < cluster_ratio:
+            _, lat, lon = rng.choice(stations)
+            lat = min(max(rng.gauss(lat, 0.0045), south), north)
+            lon = min(max(rng.gauss(lon, 0.0057), west), east)
+        else:
+            lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+        property_rows.append((property_id, lat, lon))
+
+    def insert_rows(model, rows):
+        for i in range(0, len(rows), 5000):
+            session.execute(insert(model.__table__), rows[i:i + 5000])
+        session.commit()
+
+    insert_rows(Address, [
+        {'id': address_id, 'area_name': f'합성주소{address_id}', 'latitude': lat, 'longitude': lon,
+         'geohash': encode(lat, lon)}
+        for address_id, lat, lon in address_rows
+    ])
+    insert_rows(PropertyLocation, [
+        {'property_id': property_id, 'sido': '서울특별시', 'sigungu': '합성구', 'latitude': lat, 'longitude': lon,
+         'geohash': encode(lat, lon)}
+        for property_id, lat, lon in property_rows
+    ])
+    poi_ids = [row[0] for row in address_rows]
+    insert_rows(SubwayStation, [
+        {'id': start_id + i, 'address_id': address_id, 'line_info': f'{i % 9 + 1}호선'}
+        for i, address_id in enumerate(poi_ids[:subway])
+    ])
+    insert_rows(CulturalFacility, [
+        {'id': start_id + i, 'address_id': address_id, 'facility_name': f'합성시설{i}', 'facility_type': '공연장'}
+        for i, address_id in enumerate(poi_ids[subway:subway + facilities])
+    ])
+    insert_rows(CulturalFestival, [
+        {'id': start_id + i, 'address_id': address_id, 'festival_name': f'합성축제{i}'}
+        for i, address_id in enumerate(poi_ids[subway + facilities:subway + facilities + festivals])
+    ])
+    return property_rows
+
+
+def _peak_rss_mb():
+    """(메인 프로세스, 종료된 작업자 프로세스 중 최대) 최대 RSS (MB, 실행 시작부터 누적)"""
+    scale = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+
+def benchmark_distance_pipeline(properties: int, addresses: int, subway: int, facilities: int, festivals: int,
+                                moved_ratio: float = 0.01, batch_size: int = 1000, processes: int = 1,
+                                db_url=None, seed: int = 42, output=None):
+    """
+    합성 서울 데이터로 calculate_distances 실행 (전체 → 변경 없음 → 일부 매물 이동)
+
+    단계별(주소 읽기/인덱스 생성, 거리 계산 커널, 저장, POI 피처 등) 건수와 시간은 calculate_distances 가 기록한
+    import_run_stats 에서 읽는다. 최대 RSS 는 프로세스 누적값이라 각 시나리오까지의 최댓값이다.
+    """
+    from sqlalchemy import bindparam, update
+    from alter.calculate_distances import calculate_distances
+    from alter.models import PropertyLocation
+    from alter.run_stats import load_run_summary
+
+    # provide_session 은 항상 Airflow 설정의 DB 세션을 넣으므로 원래 함수를 벤치마크 세션으로 호출
+    run_calculation = getattr(calculate_distances, '__wrapped__', calculate_distances)
+
+    engine = create_benchmark_engine(db_url)
+    session = sessionmaker(bind=engine)()
+    start = time.perf_counter()
+    property_rows = make_seoul_dataset(session, properties, addresses, subway, facilities, festivals, seed=seed)
+    generate_seconds = time.perf_counter() - start
+
+    rng = random.Random(seed + 2)
+    moved = rng.sample(property_rows, int(len(property_rows) * moved_ratio))
+    locations = PropertyLocation.__table__
+    prefix = f"benchmark__{int(time.time())}"
+
+    def move_properties():
+        session.execute(
+            update(locations).where(locations.c.property_id == bindparam('moved_id'))
+            .values(latitude=bindparam('lat'), longitude=bindparam('lon')),
+            [{'moved_id': property_id, 'lat': lat + 0.001, 'lon': lon} for property_id, lat, lon in moved],
+        )
+        session.commit()
+
+    scenarios = [('full', None, True), ('noop', None, False), ('moved', move_properties, False)]
+    results = []
+    for name, prepare, full_refresh in scenarios:
+        if prepare:
+            prepare()
+        start = time.perf_counter()
+        run_calculation(session=session, batch_size=batch_size, full_refresh=full_refresh,
+                        run_id=f"{prefix}__{name}", processes=processes)
+        elapsed = time.perf_counter() - start
+        main_rss, worker_rss = _peak_rss_mb()
+        results.append({'scenario': name, 'seconds': elapsed, 'peak_rss_mb': main_rss,
+                        'worker_peak_rss_mb': worker_rss})
+
+    stages_by_run = {run_id: stages for run_id, _, stages in load_run_summary(session, 'distances', runs=50)}
+    for result in results:
+        stages = stages_by_run.get(f"{prefix}__{result['scenario']}", [])
+        result['stages'] = {stage['stage']: {'items': stage['items'], 'seconds': stage['seconds']} for stage in stages}
+        total = result['stages'].get('total', {}).get('items', 0)
+        compute = result['stages'].get('compute', {'items': 0, 'seconds': 0})
+        result['pairs'] = total
+        result['pairs_per_sec'] = total / result['seconds'] if result['seconds'] else 0.0
+        result['kernel_pairs_per_sec'] = compute['items'] / compute['seconds'] if compute['seconds'] else 0.0
+    session.close()
+    engine.dispose()
+
+    print(f"\n매물 {properties:,} / 주소 {addresses:,} (지하철 {subway:,}, 문화시설 {facilities:,}, 축제 {festivals:,}), "
+          f"{'PostgreSQL' if db_url else 'SQLite 메모리 DB'}, 프로세스 {processes}, 배치 {batch_size:,}, "
+          f"이동 매물 {len(moved):,}, 데이터 생성 {generate_seconds:.1f}초")
+    print(f"{'scenario':<9} {'stage':<15} {'items':>11} {'seconds':>9} {'items/sec':>12}")
+    for result in results:
+        for stage, stats in result['stages'].items():
+            rate = stats['items'] / stats['seconds'] if stats['seconds'] else 0.0
+            print(f"{result['scenario']:<9} {stage:<15} {stats['items']:>11,} {stats['seconds']:>9.2f} {rate:>12,.0f}")
+    print(f"\n{'scenario':<9} {'pairs':>11} {'seconds':>9} {'pairs/sec':>12} {'kernel/sec':>12} {'RSS MB':>8} {'worker MB':>10}")
+    for result in results:
+        print(f"{result['scenario']:<9} {result['pairs']:>11,} {result['seconds']:>9.2f} {result['pairs_per_sec']:>12,.0f} "
+              f"{result['kernel_pairs_per_sec']:>12,.0f} {result['peak_rss_mb']:>8.0f} {result['worker_peak_rss_mb']:>10.0f}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'config': {'properties': properties, 'addresses': addresses, 'subway': subway,
+                           'facilities': facilities, 'festivals': festivals, 'moved_ratio': moved_ratio,
+                           'batch_size': batch_size, 'processes': processes, 'seed': seed,
+                           'database': 'postgresql' if db_url else 'sqlite', 'cpu_count': os.cpu_count()},
+                'generate_seconds': generate_seconds,
+                'scenarios': results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {output}")
+    return results
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='적재 파이프라인 벤치마크')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    bulk_parser = subparsers.add_parser('bulk-upsert', help='매물 배치 upsert 처리량 측정')
+    bulk_parser.add_argument('--listings', type=int, default=10000)
+    bulk_parser.add_argument('--batch-size', type=int, default=100)
+    bulk_parser.add_argument('--db-url', default=None, help='PostgreSQL URL (없으면 SQLite 메모리 DB)')
+    bulk_parser.add_argument('--seed', type=int, default=42)
+
+    replay_parser = subparsers.add_parser('landing-replay', help='landing 파티션 재처리 처리량 측정')
+    replay_parser.add_argument('--listings', type=int, default=10000)
+    replay_parser.add_argument('--batch-size', type=int, default=500)
+    replay_parser.add_argument('--db-url', default=None, help='PostgreSQL URL (없으면 SQLite 메모리 DB)')
+    replay_parser.add_argument('--seed', type=int, default=42)
+
+    transform_parser = subparsers.add_parser('transform', help='코드 변환 및 매물 변환 처리량 측정')
+    transform_parser.add_argument('--listings', type=int, default=10000)
+    transform_parser.add_argument('--repeat', type=int, default=3)
+    transform_parser.add_argument('--seed', type=int, default=42)
+
+    haversine_parser = subparsers.add_parser('haversine', help='스칼라/벡터 거리 계산 처리량 비교')
+    haversine_parser.add_argument('--properties', type=int, default=100000)
+    haversine_parser.add_argument('--addresses', type=int, default=50000)
+    haversine_parser.add_argument('--max-distance', type=int, default=1000)
+    haversine_parser.add_argument('--sample-pairs', type=int, default=200000)
+    haversine_parser.add_argument('--verify-origins', type=int, default=2000, help='전체 계산과 대조할 매물 수')
+    haversine_parser.add_argument('--seed', type=int, default=42)
+
+    pool_parser = subparsers.add_parser('distance-pool', help='프로세스 수별 거리 계산 처리량 측정')
+    pool_parser.add_argument('--properties', type=int, default=100000)
+    pool_parser.add_argument('--addresses', type=int, default=50000)
+    pool_parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    pool_parser.add_argument('--max-distance', type=int, default=1000)
+    pool_parser.add_argument('--batch-size', type=int, default=20000)
+    pool_parser.add_argument('--seed', type=int, default=42)
+
+    pipeline_parser = subparsers.add_parser('distance-pipeline',
+                                            help='합성 서울 데이터로 calculate_distances 단계별 처리량 측정')
+    pipeline_parser.add_argument('--properties', type=int, default=100000)
+    pipeline_parser.add_argument('--addresses', type=int, default=50000)
+    pipeline_parser.add_argument('--subway', type=int, default=300, help='지하철역 주소 수')
+    pipeline_parser.add_argument('--facilities', type=int, default=2000, help='문화시설 주소 수')
+    pipeline_parser.add_argument('--festivals', type=int, default=200, help='문화축제 주소 수')
+    pipeline_parser.add_argument('--moved-ratio', type=float, default=0.01, help='증분 시나리오에서 이동할 매물 비율')
+    pipeline_parser.add_argument('--batch-size', type=int, default=1000)
+    pipeline_parser.add_argument('--processes', type=int, default=1)
+    pipeline_parser.add_argument('--db-url', default=None, help='PostgreSQL URL (없으면 SQLite 메모리 DB)')
+    pipeline_parser.add_argument('--seed', type=int, default=42)
+    pipeline_parser.add_argument('--output', default=None, help='결과를 저장할 JSON 파일')
+
+    args = parser.parse_args()
+    if args.benchmark == 'bulk-upsert':
+        benchmark_bulk_upsert(args.listings, args.batch_size, args.db_url, args.seed)
+    elif args.benchmark == 'landing-replay':
+        benchmark_landing_replay(args.listings, args.batch_size, args.db_url, args.seed)
+    elif args.benchmark == 'transform':
+        benchmark_transform(args.listings, args.repeat, args.seed)
+    elif args.benchmark == 'haversine':
+        benchmark_haversine(args.properties, args.addresses, args.max_distance, args.sample_pairs,
+                            args.verify_origins, args.seed)
+    elif args.benchmark == 'distance-pool':
+        benchmark_distance_pool(args.properties, args.addresses, args.processes, args.max_distance,
+                                args.batch_size, args.seed)
+    elif args.benchmark == 'distance-pipeline':
+        benchmark_distance_pipeline(args.properties, args.addresses, args.subway, args.facilities, args.festivals,
+                                    args.moved_ratio, args.batch_size, args.processes, args.db_url, args.seed,
+                                    args.output)
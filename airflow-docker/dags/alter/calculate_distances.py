@@ -1,28 +1,66 @@
-from sqlalchemy.orm import Session
 from alter.db_config import provide_session
-from alter.models import LocationDistance, PropertyLocation
-from alter.utils import (main_logger as logger,
-                        error_logger,
-                        db_logger)
-from sqlalchemy import text
+from alter.models import LocationDistance, DistanceRefreshQueue, DistanceSnapshot, PropertyPoiFeature
+from alter.distance_pool import DistancePool
+from alter.distance_writer import DistanceBulkWriter
+from alter.poi_features import PoiFeatureBuilder
+from alter.property_writer import dialect_insert
+from alter.run_stats import RunStatsRecorder
+from alter.spatial_index import (AddressIndex, CoordinateArrays, haversine_matrix, iter_band_pairs,
+                                 prepare_points)
+from alter.utils import main_logger as logger
+from sqlalchemy import delete, func, select, text, update
 import math
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from tqdm import tqdm
-from itertools import product
-import multiprocessing
-import logging
+import os
+import time
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+
+# POI 카테고리별 거리 계산 반경 (미터). 어느 카테고리에도 속하지 않는 주소는 default 를 쓰고,
+# 여러 카테고리에 속하는 주소는 가장 큰 반경을 쓴다.
+# 환경 변수 DISTANCE_RADII='subway=1500,festival=3000' 으로 카테고리별 값을 바꿀 수 있다.
+DEFAULT_DISTANCE_RADII = {'default': 1000, 'subway': 1500, 'cultural_facility': 1000, 'festival': 3000}
+
+# 반경 설정 도입 전에 계산된 주소 스냅샷(radius 가 NULL)의 반경
+LEGACY_RADIUS = 1000
+
+# 카테고리별 주소 id
+ADDRESS_CATEGORY_SQL = {
+    'subway': "SELECT DISTINCT address_id FROM realestate.subway_stations WHERE address_id IS NOT NULL",
+    'cultural_facility': "SELECT DISTINCT address_id FROM realestate.cultural_facilities WHERE address_id IS NOT NULL",
+    'festival': "SELECT DISTINCT address_id FROM realestate.cultural_festivals WHERE address_id IS NOT NULL",
+}
+
+
+def parse_radii(value: str) -> Dict[str, int]:
+    """'subway=1500,festival=3000' → DEFAULT_DISTANCE_RADII 에 덮어쓴 카테고리별 반경"""
+    radii = dict(DEFAULT_DISTANCE_RADII)
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        category, _, radius = item.partition('=')
+        category = category.strip()
+        if category not in DEFAULT_DISTANCE_RADII:
+            raise ValueError(f"알 수 없는 POI 카테고리: {category} (가능: {', '.join(DEFAULT_DISTANCE_RADII)})")
+        radii[category] = int(radius)
+        if radii[category] <= 0:
+            raise ValueError(f"반경은 0보다 커야 합니다: {item}")
+    return radii
+
+
+DISTANCE_RADII = parse_radii(os.getenv('DISTANCE_RADII', ''))
 
-# 로깅 레벨 설정
-logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
 
 class DistanceCalculator:
-    def __init__(self, max_distance=1000, grid_size=0.01):
-        self.max_distance = max_distance
-        self.grid_size = grid_size
+    def __init__(self, max_distance=None, radii=None):
+        """
+        Args:
+            max_distance: 모든 주소에 같은 반경을 쓸 때의 반경 (radii 가 없을 때만 사용)
+            radii: 카테고리별 반경 (없으면 DISTANCE_RADII)
+        """
+        if radii is None:
+            radii = {'default': max_distance} if max_distance else DISTANCE_RADII
+        self.radii = {'default': DISTANCE_RADII['default'], **radii}
+        self.max_distance = max(self.radii.values())
         self.earth_radius = 6371000
         self.batch_size = 1000
-        self.num_cores = multiprocessing.cpu_count()
-        self.processed_pairs = set()
 
     def _quick_distance_filter(self, prop_lat, prop_lon, addr_lat, addr_lon):
         """대략적인 거리 필터링 - 여유 있게 설정"""
@@ -43,200 +81,64 @@ class DistanceCalculator:
             return False
 
     def save_results(self, session, results_to_save):
-        """결과를 데이터베이스에 저장"""
+        """(매물 ID, 주소 ID, 거리) 목록을 DistanceBulkWriter 로 저장"""
         if not results_to_save:
-            return
-        
-        try:
-            # 결과 데이터 검증
-            valid_results = []
-            for r in results_to_save:
-                try:
-                    property_id = int(r[0])
-                    address_id = int(r[1])
-                    distance = float(r[2])
-                    
-                    if math.isnan(distance) or distance <= 0 or distance > self.max_distance:
-                        logger.warning(f"유효하지 않은 거리: property_id={property_id}, "
-                                     f"address_id={address_id}, distance={distance}")
-                        continue
-                    
-                    pair = (property_id, address_id)
-                    if pair not in self.processed_pairs:
-                        valid_results.append((property_id, address_id, distance))
-                        self.processed_pairs.add(pair)
-                except (ValueError, TypeError) as e:
-                    logger.error(f"데이터 변환 실패: {r} - {str(e)}")
-                    continue
-            
-            if not valid_results:
-                logger.info("저장할 유효한 결과가 없습니다.")
-                return
-            
-            logger.info(f"저장 시도: {len(valid_results)}개의 유효한 결과")
-            
-            # 배치 단위로 저장
-            batch_size = 100
-            total_saved = 0
-            
-            for i in range(0, len(valid_results), batch_size):
-                batch = valid_results[i:i + batch_size]
-                try:
-                    # 데이터 존재 여부 확인
-                    property_ids = [r[0] for r in batch]
-                    address_ids = [r[1] for r in batch]
-                    
-                    existing_properties = session.execute(text("""
-                        SELECT property_id 
-                        FROM realestate.property_locations 
-                        WHERE property_id = ANY(:ids)
-                    """), {'ids': property_ids}).fetchall()
-                    
-                    existing_addresses = session.execute(text("""
-                        SELECT id 
-                        FROM realestate.addresses 
-                        WHERE id = ANY(:ids)
-                    """), {'ids': address_ids}).fetchall()
-                    
-                    valid_properties = {p[0] for p in existing_properties}
-                    valid_addresses = {a[0] for a in existing_addresses}
-                    
-                    # 유효한 데이터만 필터링
-                    filtered_batch = [
-                        r for r in batch 
-                        if r[0] in valid_properties and r[1] in valid_addresses
-                    ]
-                    
-                    if not filtered_batch:
-                        logger.warning(f"배치에 유효한 데이터가 없습니다: "
-                                     f"properties={len(valid_properties)}/{len(property_ids)}, "
-                                     f"addresses={len(valid_addresses)}/{len(address_ids)}")
-                        continue
-                    
-                    # SQL 생성
-                    values = []
-                    for r in filtered_batch:
-                        values.append(f"({r[0]}::bigint, {r[1]}::integer, {r[2]}::double precision)")
-                    
-                    insert_sql = f"""
-                        INSERT INTO realestate.location_distances 
-                        (property_id, address_id, distance)
-                        VALUES {', '.join(values)}
-                        ON CONFLICT (property_id, address_id) DO NOTHING
-                        RETURNING id;
-                    """
-                    
-                    # 실행 및 커밋
-                    result = session.execute(text(insert_sql))
-                    inserted_ids = result.fetchall()
-                    session.commit()
-                    
-                    total_saved += len(inserted_ids)
-                    logger.info(f"배치 저장 완료: {len(inserted_ids)}개 저장됨 "
-                              f"(배치 크기: {len(filtered_batch)}, "
-                              f"누적: {total_saved}개)")
-                    
-                except Exception as e:
-                    logger.error(f"배치 저장 중 오류 발생: {str(e)}")
-                    session.rollback()
-                    continue
-            
-            # 최종 결과 확인
-            total_count = session.execute(text(
-                "SELECT COUNT(*) FROM realestate.location_distances"
-            )).scalar()
-            
-            logger.info(f"저장 완료: 총 {total_saved}개 저장됨")
-            logger.info(f"테이블 전체 데이터: {total_count}개")
-            logger.info(f"현재까지 총 처리된 쌍: {len(self.processed_pairs)}개")
-            
-        except Exception as e:
-            logger.error(f"저장 중 오류 발생: {str(e)}")
-            session.rollback()
+            return 0
+        property_ids, address_ids, distances = zip(*results_to_save)
+        return DistanceBulkWriter(session, self.max_distance).write(property_ids, address_ids, distances)
+
+    @staticmethod
+    def prepare_points(rows) -> CoordinateArrays:
+        """(id, 위도, 경도) 목록을 라디안 좌표 배열로 변환 (spatial_index.prepare_points)"""
+        return prepare_points(rows)
+
+    def haversine_matrix(self, origins: CoordinateArrays, targets: CoordinateArrays) -> np.ndarray:
+        """origins x targets 거리 행렬 (미터, shape=(len(origins), len(targets)))"""
+        return haversine_matrix(origins, targets, self.earth_radius)
+
+    def iter_pairs_within(self, origins: CoordinateArrays, targets: CoordinateArrays, max_distance=None,
+                          chunk_size=256) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """반경 안의 (origin id, target id, 거리) 배열을 origin 청크 단위로 생성 (위도 구간 방식)"""
+        max_distance = self.max_distance if max_distance is None else max_distance
+        return iter_band_pairs(origins, targets, max_distance, chunk_size, self.earth_radius)
+
+    def pairs_within(self, origins: CoordinateArrays, targets: CoordinateArrays, max_distance=None,
+                     chunk_size=256) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """반경 안의 모든 쌍을 (origin ids, target ids, 거리) 배열로 반환"""
+        parts = list(self.iter_pairs_within(origins, targets, max_distance, chunk_size))
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def load_address_radii(self, session) -> Dict[int, int]:
+        """POI 카테고리에 속하는 주소의 반경 {주소 id: 반경} (나머지 주소는 radii['default'])"""
+        address_radii = {}
+        for category, sql in ADDRESS_CATEGORY_SQL.items():
+            radius = self.radii.get(category, self.radii['default'])
+            for address_id in session.execute(text(sql)).scalars():
+                address_radii[int(address_id)] = max(address_radii.get(int(address_id), 0), radius)
+        return address_radii
+
+    def build_index(self, rows) -> AddressIndex:
+        """(id, 위도, 경도) 목록으로 주소 공간 인덱스 생성"""
+        index = AddressIndex(prepare_points(rows), self.earth_radius)
+        logger.info(f"주소 공간 인덱스 생성: {len(index)}개 ({index.backend})")
+        return index
 
-    def calculate_distances_for_chunk(self, chunk, address_grid):
-        """청크 단위로 거리 계산"""
-        results = []
+    def calculate_distances_for_chunk(self, chunk, address_index: AddressIndex):
+        """청크 단위로 거리 계산 (address_index 는 build_index 로 만든 주소 인덱스)"""
         try:
             logger.info(f"청크 크기: {len(chunk)}")
-            for prop_id, prop_lat, prop_lon in chunk:
-                try:
-                    # 좌표 타입 변환
-                    prop_lat = float(prop_lat)
-                    prop_lon = float(prop_lon)
-                    
-                    # 그리드 좌표 계산
-                    grid_x = int(prop_lon / self.grid_size)
-                    grid_y = int(prop_lat / self.grid_size)
-                    
-                    logger.info(f"매물 {prop_id} 처리 중: 좌표=({prop_lat}, {prop_lon}), 그리드=({grid_x}, {grid_y})")
-                    
-                    # 주변 그리드 검색
-                    for dx, dy in [(-1,0), (1,0), (0,-1), (0,1), (0,0)]:
-                        grid_key = (grid_x + dx, grid_y + dy)
-                        if grid_key in address_grid:
-                            addresses = address_grid[grid_key]
-                            logger.info(f"매물 {prop_id}의 그리드 {grid_key}에서 {len(addresses)}개의 주소 발견")
-                            
-                            for addr_id, addr_lat, addr_lon in addresses:
-                                try:
-                                    # 좌표 타입 변환
-                                    addr_lat = float(addr_lat)
-                                    addr_lon = float(addr_lon)
-                                    
-                                    # 빠른 거리 필터링
-                                    if self._quick_distance_filter(prop_lat, prop_lon, addr_lat, addr_lon):
-                                        distance = self.calculate_distance(prop_lat, prop_lon, addr_lat, addr_lon)
-                                        if distance and distance <= self.max_distance:
-                                            logger.info(f"거리 계산 결과: 매물 {prop_id} ({prop_lat}, {prop_lon}) - "
-                                                      f"주소 {addr_id} ({addr_lat}, {addr_lon}) = {distance}m")
-                                            results.append((prop_id, addr_id, distance))
-                                except (ValueError, TypeError) as e:
-                                    logger.error(f"주소 좌표 처리 오류: {str(e)}, 데이터: {addr_id}, {addr_lat}, {addr_lon}")
-                                    continue
-                except (ValueError, TypeError) as e:
-                    logger.error(f"매물 좌표 처리 오류: {str(e)}, 데이터: {prop_id}, {prop_lat}, {prop_lon}")
-                    continue
-            
+            property_ids, address_ids, distances = address_index.query_radius(
+                prepare_points(chunk), self.max_distance
+            )
+            results = list(zip(property_ids.tolist(), address_ids.tolist(), distances.tolist()))
             logger.info(f"청크에서 계산된 총 거리: {len(results)}개")
             return results
         except Exception as e:
             logger.error(f"청크 처리 중 오류 발생: {str(e)}")
             raise
 
-    @staticmethod
-    def create_grid_index(locations, grid_size=0.01):
-        """위치 데이터를 그리드로 인덱싱"""
-        try:
-            grid = {}
-            total_locations = len(locations)
-            logger.info(f"그리드 인덱싱 시작: 총 {total_locations}개의 위치")
-            
-            for i, loc in enumerate(locations, 1):
-                try:
-                    grid_x = int(float(loc[2]) / grid_size)
-                    grid_y = int(float(loc[1]) / grid_size)
-                    grid_key = (grid_x, grid_y)
-                    
-                    if grid_key not in grid:
-                        grid[grid_key] = []
-                    grid[grid_key].append(loc)
-                    
-                    if i % 1000 == 0:
-                        logger.info(f"그리드 인덱싱 진행: {i}/{total_locations} ({i/total_locations*100:.1f}%)")
-                except (ValueError, TypeError, IndexError) as e:
-                    logger.error(f"위치 데이터 처리 오류: {str(e)}, 데이터: {loc}")
-                    continue
-            
-            total_grids = len(grid)
-            total_indexed = sum(len(points) for points in grid.values())
-            logger.info(f"그리드 인덱싱 완료: {total_grids}개의 그리드, {total_indexed}개의 위치 인덱싱됨")
-            
-            return grid
-        except Exception as e:
-            logger.error(f"그리드 인덱싱 중 오류 발생: {str(e)}")
-            raise
-
     def calculate_distance(self, lat1, lon1, lat2, lon2):
         """Haversine 공식을 사용한 두 지점 간의 거리 계산"""
         try:
@@ -259,211 +161,357 @@ class DistanceCalculator:
             logger.error(f"거리 계산 오류: {str(e)}, 좌표: ({lat1}, {lon1}) -> ({lat2}, {lon2})")
             return None
 
+# 거리 계산 프로세스 수 (1 이면 프로세스 풀을 쓰지 않음)
+DISTANCE_PROCESSES = int(os.getenv('DISTANCE_PROCESSES', '1'))
+
+PROPERTY_POINTS_SQL = """
+    SELECT property_id, latitude, longitude
+    FROM realestate.property_locations
+    WHERE latitude IS NOT NULL
+    AND longitude IS NOT NULL
+    AND latitude BETWEEN -90 AND 90
+    AND longitude BETWEEN -180 AND 180
+"""
+
+ADDRESS_POINTS_SQL = """
+    SELECT id, latitude, longitude
+    FROM realestate.addresses
+    WHERE latitude IS NOT NULL
+    AND longitude IS NOT NULL
+    AND latitude BETWEEN -90 AND 90
+    AND longitude BETWEEN -180 AND 180
+"""
+
+
+def _chunked(ids, size=5000):
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _diff_snapshot(rows, snapshot: Dict[int, Tuple[float, float]], forced=frozenset()):
+    """현재 좌표와 스냅샷 비교 → (신규/변경 행, 변경 없는 행)"""
+    changed, unchanged = [], []
+    for row in rows:
+        entity_id, lat, lon = int(row[0]), float(row[1]), float(row[2])
+        if math.isnan(lat) or math.isnan(lon):
+            continue
+        if entity_id in forced or snapshot.get(entity_id) != (lat, lon):
+            changed.append((entity_id, lat, lon))
+        else:
+            unchanged.append((entity_id, lat, lon))
+    return changed, unchanged
+
+
+def _group_by_radius(rows: List[tuple], radius_of) -> Dict[int, List[tuple]]:
+    """주소 행을 반경 등급별로 묶음 {반경: 행 목록}"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(radius_of(row[0]), []).append(row)
+    return groups
+
+
+def _distance_jobs(indexes: Dict[str, Tuple[int, AddressIndex]], changed: List[tuple],
+                   unchanged: List[tuple]) -> List[Tuple[str, List[tuple], int]]:
+    """
+    배치의 계산 작업 (인덱스 이름, 매물 행, 반경)
+
+    신규/변경 매물은 반경 등급별 전체 주소('all:반경')와, 변경 없는 매물은 등급별 신규/변경/반경이
+    넓어진 주소('new:반경')와 계산한다.
+    """
+    jobs = []
+    for name, (radius, _) in indexes.items():
+        rows = changed if name.startswith('all:') else unchanged
+        if rows:
+            jobs.append((name, rows, radius))
+    return jobs
+
+
+def _query_indexes(indexes: Dict[str, Tuple[int, AddressIndex]], jobs) -> Iterator[tuple]:
+    """메인 프로세스 계산: 작업마다 (인덱스 이름, 쌍 배열)"""
+    for name, rows, radius in jobs:
+        yield name, indexes[name][1].query_radius(prepare_points(rows), radius)
+
+
+def _drop_known_pairs(pairs: tuple, known_ids: np.ndarray, known_radii: np.ndarray) -> tuple:
+    """
+    반경이 넓어진 주소의 이전 반경 안쪽 쌍 제외 (이미 저장되어 있으므로 바깥 고리만 남김)
+
+    known_ids 는 정렬된 주소 id, known_radii 는 같은 순서의 이전 반경.
+    """
+    property_ids, address_ids, distances = pairs
+    if not len(known_ids) or not len(distances):
+        return pairs
+    positions = np.minimum(np.searchsorted(known_ids, address_ids), len(known_ids) - 1)
+    previous = np.where(known_ids[positions] == address_ids, known_radii[positions], -np.inf)
+    keep = distances > previous
+    return property_ids[keep], address_ids[keep], distances[keep]
+
+
+def _retier_distances(session, resized: Dict[int, List[int]]) -> int:
+    """
+    반경이 바뀐 주소의 거리 정리 {새 반경: 주소 ids}
+
+    새 반경 밖의 거리는 삭제하고 남은 거리의 radius_tier 를 새 반경으로 바꾼다.
+    (넓어진 주소의 바깥 고리는 이후 계산에서 새 반경 등급으로 저장됨)
+    """
+    distances = LocationDistance.__table__
+    deleted = 0
+    for radius, address_ids in resized.items():
+        for chunk in _chunked(address_ids):
+            deleted += session.execute(
+                delete(distances).where(distances.c.address_id.in_(chunk), distances.c.distance > radius)
+            ).rowcount
+            session.execute(
+                update(distances)
+                .where(distances.c.address_id.in_(chunk), distances.c.radius_tier != radius)
+                .values(radius_tier=radius)
+            )
+    session.commit()
+    return deleted
+
+
+def load_snapshots(session) -> Dict[str, Dict[int, Tuple[float, float]]]:
+    """지난 계산에 사용한 좌표 {'property': {id: (위도, 경도)}, 'address': {...}}"""
+    snapshots = DistanceSnapshot.__table__
+    previous = {'property': {}, 'address': {}}
+    for kind, entity_id, lat, lon in session.execute(
+        select(snapshots.c.kind, snapshots.c.entity_id, snapshots.c.latitude, snapshots.c.longitude)
+    ):
+        previous[kind][entity_id] = (lat, lon)
+    return previous
+
+
+def load_snapshot_radii(session) -> Dict[int, int]:
+    """지난 계산에 사용한 주소 반경 {주소 id: 반경} (반경 설정 전 스냅샷은 LEGACY_RADIUS)"""
+    snapshots = DistanceSnapshot.__table__
+    return {
+        entity_id: radius or LEGACY_RADIUS
+        for entity_id, radius in session.execute(
+            select(snapshots.c.entity_id, snapshots.c.radius).where(snapshots.c.kind == 'address')
+        )
+    }
+
+
+def stream_points(session, sql: str, batch_size: int) -> Iterator[List[tuple]]:
+    """
+    좌표 조회 결과를 서버 측 커서로 batch_size 행씩 읽음
+
+    거리 저장이 배치마다 커밋하므로 커서가 닫히지 않도록 별도 연결에서 읽는다.
+    """
+    with session.get_bind().connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(text(sql))
+        for partition in result.partitions(batch_size):
+            yield partition
+
+
+def _delete_distances(session, column: str, ids) -> int:
+    distances = LocationDistance.__table__
+    deleted = 0
+    for chunk in _chunked(ids):
+        deleted += session.execute(delete(distances).where(distances.c[column].in_(chunk))).rowcount
+    session.commit()
+    return deleted
+
+
+def _update_snapshots(session, kind: str, rows: List[tuple], removed_ids=(), radius_of=None):
+    """계산이 끝난 좌표(주소는 radius_of 로 구한 반경 포함)를 스냅샷에 기록하고 사라진 대상의 스냅샷 삭제"""
+    snapshots = DistanceSnapshot.__table__
+    stmt = dialect_insert(session, DistanceSnapshot)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['kind', 'entity_id'],
+        set_={'latitude': stmt.excluded.latitude, 'longitude': stmt.excluded.longitude,
+              'radius': stmt.excluded.radius, 'computed_at': func.now()},
+    )
+    for i in range(0, len(rows), 5000):
+        session.execute(stmt, [
+            {'kind': kind, 'entity_id': entity_id, 'latitude': lat, 'longitude': lon,
+             'radius': radius_of(entity_id) if radius_of else None}
+            for entity_id, lat, lon in rows[i:i + 5000]
+        ])
+    for chunk in _chunked(removed_ids):
+        session.execute(delete(snapshots).where(snapshots.c.kind == kind, snapshots.c.entity_id.in_(chunk)))
+    session.commit()
+
+
 @provide_session
-def calculate_distances(session=None, batch_size=1000):
+def calculate_distances(session=None, batch_size=1000, full_refresh=False, run_id=None, processes=None):
+    """
+    매물-주소 거리 증분 계산
+
+    distance_snapshots 에 기록된 지난 계산의 좌표와 비교해 신규/이동 매물(재계산 대기열 포함)은
+    전체 주소와, 나머지 매물은 신규/이동 주소와만 거리를 계산한다. 사라진 매물/주소의 거리는
+    삭제하고 나머지 거리는 그대로 둔다.
+
+    주소마다 POI 카테고리에 따른 반경(DISTANCE_RADII)을 쓰고, 반경 등급별로 인덱스를 만든다.
+    지난 계산보다 반경이 넓어진 주소는 변경 없는 매물과 바깥 고리(이전 반경 < 거리 <= 새 반경)만 계산하고,
+    좁아진 주소는 새 반경 밖의 거리만 삭제한다. 저장된 거리의 radius_tier 는 주소의 현재 반경이다.
+
+    주소는 한 번 읽어 메모리의 공간 인덱스로 만들고, 매물 좌표는 서버 측 커서로 한 번 스트리밍하며
+    batch_size 개씩 인덱스에 질의한다 (DB 에서는 매물 x 주소 조합을 만들지 않음).
+    processes 가 2 이상이면 배치를 타일 단위로 나눠 프로세스 풀에서 계산하고 끝난 순서대로 저장한다.
+    같은 배치에서 신규/변경 매물과 POI 목록이 바뀐 뒤 갱신되지 않은 매물의 property_poi_features 도 갱신한다.
+    단계별 소요 시간은 import_run_stats 에 'distances' 로 기록된다.
+
+    Args:
+        batch_size: 한 번에 읽어 거리를 계산/저장할 매물 수
+        full_refresh: 거리와 스냅샷을 모두 지우고 처음부터 계산
+        processes: 거리 계산 프로세스 수 (없으면 DISTANCE_PROCESSES, 1 이면 메인 프로세스에서 계산)
+    """
     calculator = DistanceCalculator()
-    
+    radii_label = ', '.join(f"{category} {radius}m" for category, radius in calculator.radii.items())
+    writer = DistanceBulkWriter(session, calculator.max_distance)
+    run_stats = RunStatsRecorder('distances', run_id)
+    processes = processes or DISTANCE_PROCESSES
+    pool = None
+    started = time.perf_counter()
+
     try:
         logger.info("거리 계산 시작...")
-        
-        # 주소 데이터 로드 및 검증
-        addresses = session.execute(text("""
-            SELECT id, latitude, longitude 
-            FROM realestate.addresses 
-            WHERE latitude IS NOT NULL 
-            AND longitude IS NOT NULL 
-            AND latitude BETWEEN -90 AND 90 
-            AND longitude BETWEEN -180 AND 180
-        """)).fetchall()
-        
-        logger.info(f"로드된 주소 데이터: {len(addresses)}개")
-        
-        # 주소 그리드 생성
-        address_grid = calculator.create_grid_index(addresses)
-        logger.info(f"생성된 그리드 수: {len(address_grid)}")
-        
-        # 스키마 생성 확인
-        session.execute(text("CREATE SCHEMA IF NOT EXISTS realestate;"))
-        session.execute(text("""
-            DROP TABLE IF EXISTS realestate.location_distances CASCADE;
-            CREATE TABLE realestate.location_distances (
-                id SERIAL PRIMARY KEY,
-                property_id BIGINT NOT NULL,
-                address_id INTEGER NOT NULL,
-                distance DOUBLE PRECISION NOT NULL,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                CONSTRAINT uq_property_address UNIQUE (property_id, address_id),
-                CONSTRAINT fk_property FOREIGN KEY (property_id) REFERENCES realestate.property_locations(property_id),
-                CONSTRAINT fk_address FOREIGN KEY (address_id) REFERENCES realestate.addresses(id)
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_location_distances_property ON realestate.location_distances(property_id);
-            CREATE INDEX IF NOT EXISTS idx_location_distances_address ON realestate.location_distances(address_id);
-        """))
-        session.commit()
-        
-        # 데이터베이스 상태 확인
-        property_count = session.execute(text("SELECT COUNT(*) FROM realestate.property_locations")).scalar()
-        address_count = session.execute(text("SELECT COUNT(*) FROM realestate.addresses")).scalar()
-        logger.info(f"데이터베이스 상태: property_locations={property_count}개, addresses={address_count}개")
-        
-        # 유효한 좌표를 가진 데이터 수 확인
-        valid_properties = session.execute(text("""
-            SELECT COUNT(*) 
-            FROM realestate.property_locations 
-            WHERE latitude IS NOT NULL 
-            AND longitude IS NOT NULL 
-            AND CAST(latitude AS TEXT) != 'NaN'
-            AND CAST(longitude AS TEXT) != 'NaN'
-            AND CAST(latitude AS DOUBLE PRECISION) BETWEEN -90 AND 90
-            AND CAST(longitude AS DOUBLE PRECISION) BETWEEN -180 AND 180
-        """)).scalar()
-        
-        valid_addresses = session.execute(text("""
-            SELECT COUNT(*) 
-            FROM realestate.addresses 
-            WHERE latitude IS NOT NULL 
-            AND longitude IS NOT NULL 
-            AND CAST(latitude AS TEXT) != 'NaN'
-            AND CAST(longitude AS TEXT) != 'NaN'
-            AND latitude BETWEEN -90 AND 90
-            AND longitude BETWEEN -180 AND 180
-        """)).scalar()
-        
-        logger.info(f"유효한 좌표를 가진 데이터: property_locations={valid_properties}개, addresses={valid_addresses}개")
-        
-        # 기존 거리 데이터 로드
-        logger.info("기존 거리 데이터 로드 중...")
-        existing_pairs = session.execute(text("""
-            SELECT property_id, address_id 
-            FROM realestate.location_distances
-        """)).fetchall()
-        calculator.processed_pairs.update((p[0], p[1]) for p in existing_pairs)
-        logger.info(f"기존 거리 데이터 {len(calculator.processed_pairs)}쌍 로드 완료")
-        
-        # SQL 쿼리 최적화 - 인덱스 힌트 추가
-        logger.info("새로운 매물-주소 조합 조회 중...")
-        new_pairs = session.execute(text("""
-            WITH property_batch AS (
-                SELECT DISTINCT 
-                    p.property_id, 
-                    CAST(p.latitude AS DOUBLE PRECISION) as latitude,
-                    CAST(p.longitude AS DOUBLE PRECISION) as longitude
-                FROM realestate.property_locations p
-                WHERE p.latitude IS NOT NULL 
-                AND p.longitude IS NOT NULL 
-                AND CAST(p.latitude AS TEXT) != 'NaN'
-                AND CAST(p.longitude AS TEXT) != 'NaN'
-                AND CAST(p.latitude AS DOUBLE PRECISION) BETWEEN -90 AND 90
-                AND CAST(p.longitude AS DOUBLE PRECISION) BETWEEN -180 AND 180
-                LIMIT :batch_size
-            ),
-            valid_addresses AS (
-                SELECT 
-                    a.id, 
-                    a.latitude,
-                    a.longitude
-                FROM realestate.addresses a
-                WHERE a.latitude IS NOT NULL 
-                AND a.longitude IS NOT NULL 
-                AND CAST(a.latitude AS TEXT) != 'NaN'
-                AND CAST(a.longitude AS TEXT) != 'NaN'
-                AND a.latitude BETWEEN -90 AND 90
-                AND a.longitude BETWEEN -180 AND 180
+        if full_refresh:
+            session.execute(delete(LocationDistance.__table__))
+            session.execute(delete(DistanceSnapshot.__table__))
+            session.execute(delete(PropertyPoiFeature.__table__))
+            session.commit()
+            logger.info("전체 재계산: 기존 거리, 스냅샷, POI 피처 삭제")
+
+        previous = load_snapshots(session)
+        previous_radii = load_snapshot_radii(session)
+        queued_ids = frozenset(int(property_id) for property_id in session.execute(
+            select(DistanceRefreshQueue.__table__.c.property_id)
+        ).scalars())
+
+        # 1. 주소: 전체를 읽어 스냅샷과 비교하고 인덱스 생성
+        with run_stats.stage('read_addresses') as stage:
+            changed_addresses, unchanged_addresses = _diff_snapshot(
+                session.execute(text(ADDRESS_POINTS_SQL)).fetchall(), previous['address']
             )
-            SELECT DISTINCT 
-                p.property_id, p.latitude, p.longitude,
-                a.id as address_id, a.latitude, a.longitude
-            FROM property_batch p
-            CROSS JOIN valid_addresses a
-            WHERE NOT EXISTS (
-                SELECT 1 
-                FROM realestate.location_distances d
-                WHERE d.property_id = p.property_id 
-                AND d.address_id = a.id
+            stage.items = len(changed_addresses) + len(unchanged_addresses)
+        current_address_ids = {row[0] for row in changed_addresses} | {row[0] for row in unchanged_addresses}
+        removed_address_ids = [i for i in previous['address'] if i not in current_address_ids]
+
+        # 반경이 바뀐 주소: 넓어지면 이전 반경 바깥 고리만, 좁아지면 삭제만
+        address_radii = calculator.load_address_radii(session)
+        default_radius = calculator.radii['default']
+
+        def radius_of(address_id):
+            return address_radii.get(address_id, default_radius)
+
+        widened_addresses, widened_from, resized = [], {}, {}
+        for row in unchanged_addresses:
+            old_radius, new_radius = previous_radii.get(row[0], LEGACY_RADIUS), radius_of(row[0])
+            if new_radius != old_radius:
+                resized.setdefault(new_radius, []).append(row[0])
+            if new_radius > old_radius:
+                widened_addresses.append(row)
+                widened_from[row[0]] = old_radius
+        known_ids = np.array(sorted(widened_from), dtype=np.int64)
+        known_radii = np.array([widened_from[i] for i in known_ids.tolist()], dtype=np.float64)
+
+        with run_stats.stage('index') as stage:
+            indexes = {
+                f'all:{radius}': (radius, calculator.build_index(rows))
+                for radius, rows in sorted(_group_by_radius(changed_addresses + unchanged_addresses, radius_of).items())
+            }
+            if previous['property']:
+                indexes.update({
+                    f'new:{radius}': (radius, calculator.build_index(rows))
+                    for radius, rows in sorted(_group_by_radius(changed_addresses + widened_addresses, radius_of).items())
+                })
+            stage.items = len(current_address_ids)
+
+        with run_stats.stage('poi_index') as stage:
+            poi_features = PoiFeatureBuilder(session, calculator.earth_radius)
+            fresh_feature_ids = poi_features.fresh_property_ids()
+            stage.items = sum(len(category) for category in poi_features.categories)
+
+        with run_stats.stage('delete') as stage:
+            stage.items = _delete_distances(
+                session, 'address_id', [row[0] for row in changed_addresses] + removed_address_ids
             )
-            AND ABS(p.latitude - a.latitude) * 111000 <= :max_distance
-            AND ABS(p.longitude - a.longitude) * 111000 * 
-                COS(RADIANS((p.latitude + a.latitude) / 2)) <= :max_distance
-        """), {
-            'batch_size': batch_size,
-            'max_distance': calculator.max_distance
-        }).fetchall()
-        
-        logger.info(f"새로운 거리 계산 필요: {len(new_pairs)}쌍")
-        
-        # 추가 데이터 검증
-        valid_pairs = []
-        for pair in new_pairs:
-            try:
-                prop_lat = float(pair[1])
-                prop_lon = float(pair[2])
-                addr_lat = float(pair[4])
-                addr_lon = float(pair[5])
-                
-                if (not math.isnan(prop_lat) and not math.isnan(prop_lon) and
-                    not math.isnan(addr_lat) and not math.isnan(addr_lon) and
-                    -90 <= prop_lat <= 90 and -180 <= prop_lon <= 180 and
-                    -90 <= addr_lat <= 90 and -180 <= addr_lon <= 180):
-                    valid_pair = (
-                        pair[0],
-                        prop_lat,
-                        prop_lon,
-                        pair[3],
-                        addr_lat,
-                        addr_lon
-                    )
-                    valid_pairs.append(valid_pair)
-            except (ValueError, TypeError) as e:
-                logger.debug(f"좌표 변환 실패: {pair} - {str(e)}")
-                continue
-        
-        logger.info(f"유효한 좌표를 가진 쌍: {len(valid_pairs)}/{len(new_pairs)}")
-        
-        if not valid_pairs:
-            logger.info("계산할 유효한 거리 데이터가 없습니다.")
-            return True
-        
-        # 매물 데이터 준비
-        property_data = [(p[0], p[1], p[2]) for p in valid_pairs]
-        property_data = list(set(property_data))
-        logger.info(f"총 {len(property_data)}개의 고유 매물 데이터 준비 완료")
-        
-        # 청크 크기 조정
-        chunk_size = 50  # 더 작은 청크 크기 사용
-        results = []
-        total_chunks = len(property_data) // chunk_size + (1 if len(property_data) % chunk_size else 0)
-        
-        for i in range(0, len(property_data), chunk_size):
-            chunk = property_data[i:i + chunk_size]
-            logger.info(f"청크 처리 중: {i//chunk_size + 1}/{total_chunks}")
-            
-            try:
-                chunk_results = calculator.calculate_distances_for_chunk(chunk, address_grid)
-                results.extend(chunk_results)
-                
-                # 더 작은 크기로 자주 저장
-                if len(results) >= 500:
-                    logger.info(f"중간 저장 시작: {len(results)}개의 결과")
-                    calculator.save_results(session, results)
-                    results = []
-                
-            except Exception as e:
-                logger.error(f"청크 {i//chunk_size + 1} 처리 중 오류 발생: {str(e)}")
-                continue
-        
-        # 남은 결과 저장
-        if results:
-            logger.info(f"최종 저장 시작: {len(results)}개의 결과")
-            calculator.save_results(session, results)
-        
-        logger.info("모든 거리 계산 및 저장 완료")
+            stage.items += _retier_distances(session, resized)
+
+        if processes > 1:
+            pool = DistancePool({name: index.points for name, (_, index) in indexes.items()},
+                                processes, calculator.earth_radius)
+            logger.info(f"프로세스 풀 거리 계산: {processes}개 프로세스")
+
+        # 2. 매물: 스트리밍하며 배치마다 신규/변경 매물 x 전체 주소, 변경 없는 매물 x 신규/변경/반경이 넓어진 주소 계산
+        seen_property_ids = set()
+        changed_count = unchanged_count = total = feature_count = 0
+        partitions = stream_points(session, PROPERTY_POINTS_SQL, batch_size)
+        while True:
+            read_start = time.perf_counter()
+            rows = next(partitions, None)
+            if rows is None:
+                break
+            run_stats.add('read_properties', items=len(rows), seconds=time.perf_counter() - read_start)
+
+            changed, unchanged = _diff_snapshot(rows, previous['property'], queued_ids)
+            seen_property_ids.update(row[0] for row in changed)
+            seen_property_ids.update(row[0] for row in unchanged)
+            changed_count += len(changed)
+            unchanged_count += len(unchanged)
+
+            if changed:
+                with run_stats.stage('delete') as stage:
+                    stage.items = _delete_distances(session, 'property_id', [row[0] for row in changed])
+
+            jobs = _distance_jobs(indexes, changed, unchanged)
+            batches = pool.compute(jobs) if pool is not None else _query_indexes(indexes, jobs)
+            while True:
+                compute_start = time.perf_counter()
+                result = next(batches, None)
+                if result is None:
+                    break
+                name, pairs = result
+                if name.startswith('new:'):
+                    pairs = _drop_known_pairs(pairs, known_ids, known_radii)
+                run_stats.add('compute', items=len(pairs[2]), seconds=time.perf_counter() - compute_start)
+                with run_stats.stage('save') as stage:
+                    stage.items = writer.write(*pairs, radius_tier=indexes[name][0])
+                total += stage.items
+            with run_stats.stage('features') as stage:
+                stage.items = poi_features.refresh(
+                    changed + [row for row in unchanged if row[0] not in fresh_feature_ids]
+                )
+            feature_count += stage.items
+            _update_snapshots(session, 'property', changed)
+
+        # 3. 사라진 매물 정리, 주소 스냅샷/재계산 대기열 갱신
+        removed_property_ids = [i for i in previous['property'] if i not in seen_property_ids]
+        with run_stats.stage('delete') as stage:
+            stage.items = _delete_distances(session, 'property_id', removed_property_ids)
+            stage.items += poi_features.delete(removed_property_ids)
+        _update_snapshots(session, 'property', [], removed_property_ids)
+        resized_ids = {address_id for address_ids in resized.values() for address_id in address_ids}
+        _update_snapshots(session, 'address',
+                          changed_addresses + [row for row in unchanged_addresses if row[0] in resized_ids],
+                          removed_address_ids, radius_of)
+        queue = DistanceRefreshQueue.__table__
+        for chunk in _chunked(queued_ids):
+            session.execute(delete(queue).where(queue.c.property_id.in_(chunk)))
+        session.commit()
+
+        run_stats.add('total', items=total, seconds=time.perf_counter() - started)
+        logger.info(
+            f"모든 거리 계산 및 저장 완료: {total}개 저장 "
+            f"(매물/주소가 없어 제외 {writer.skipped_count}개, 신규/변경 매물 {changed_count}개, 재계산 대기열 {len(queued_ids)}개, "
+            f"변경 없는 매물 {unchanged_count}개, 신규/변경 주소 {len(changed_addresses)}개 / 전체 주소 "
+            f"{len(current_address_ids)}개, 반경 변경 주소 {len(resized_ids)}개 (넓어짐 {len(widened_addresses)}개), "
+            f"삭제 매물 {len(removed_property_ids)}개, 삭제 주소 {len(removed_address_ids)}개, "
+            f"POI 피처 갱신 {feature_count}개, 반경: {radii_label})"
+        )
         return True
-        
+
     except Exception as e:
         logger.error(f"거리 계산 중 오류 발생: {str(e)}")
         session.rollback()
         raise
+    finally:
+        if pool is not None:
+            pool.close()
+        run_stats.flush(session)
 
 if __name__ == "__main__":
     calculate_distances() 
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+일별 매물 수집 체크포인트
+
+구역별로 상세 저장까지 끝난 마지막 목록 페이지와 완료 여부, 그날 저장된 매물 ID를 기록한다.
+Airflow 재시도나 같은 날짜 수동 재실행은 완료된 구역을 건너뛰고, 중단된 구역은 다음 페이지부터,
+이미 저장한 매물은 상세 조회 없이 이어서 수집한다.
+"""
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import delete, select
+
+from alter.models import ImportCheckpoint, ImportCheckpointArticle
+from alter.property_writer import dialect_insert
+from alter.utils import main_logger as logger
+
+
+def _to_date(run_date) -> date:
+    if run_date is None:
+        return date.today()
+    if isinstance(run_date, datetime):
+        return run_date.date()
+    if isinstance(run_date, date):
+        return run_date
+    return date.fromisoformat(str(run_date))
+
+
+class ImportCheckpointStore:
+    """
+    import_checkpoints / import_checkpoint_articles 테이블 접근
+
+    구역/페이지 기록은 생성 시 받은 세션으로, 매물 ID 기록은 저장한 세션(파이프라인 저장 스레드)으로 한다.
+    """
+
+    def __init__(self, session, run_date=None):
+        self.session = session
+        self.run_date = _to_date(run_date)
+        self.districts: Dict[str, ImportCheckpoint] = {}
+        self.loaded_ids: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """오늘 날짜의 진행 상황을 읽어옴"""
+        checkpoints = self.session.execute(
+            select(ImportCheckpoint).where(ImportCheckpoint.run_date == self.run_date)
+        ).scalars().all()
+        self.districts = {checkpoint.district: checkpoint for checkpoint in checkpoints}
+        self.loaded_ids = set(self.session.execute(
+            select(ImportCheckpointArticle.property_id)
+            .where(ImportCheckpointArticle.run_date == self.run_date)
+        ).scalars().all())
+        if self.districts:
+            done = sum(1 for checkpoint in self.districts.values() if checkpoint.completed)
+            logger.info(
+                f"체크포인트 로드 ({self.run_date}): 완료 구역 {done}개, 진행 중 구역 {len(self.districts) - done}개, "
+                f"저장된 매물 {len(self.loaded_ids)}개"
+            )
+        return self
+
+    def reset(self, districts: Optional[List[str]] = None):
+        """
+        진행 상황을 지우고 처음부터 수집
+
+        districts 가 주어지면 해당 구역 기록만 지운다 (구역 그룹별 병렬 task 가 서로의 기록을 지우지 않도록).
+        """
+        checkpoints = ImportCheckpoint.__table__
+        stmt = delete(checkpoints).where(checkpoints.c.run_date == self.run_date)
+        if districts:
+            stmt = stmt.where(checkpoints.c.district.in_(districts))
+        else:
+            articles = ImportCheckpointArticle.__table__
+            self.session.execute(delete(articles).where(articles.c.run_date == self.run_date))
+        self.session.execute(stmt)
+        self.session.commit()
+        self.districts = {}
+        self.loaded_ids = set()
+        logger.info(f"체크포인트 초기화 ({self.run_date}, {', '.join(districts) if districts else '전체'})")
+        return self
+
+    def is_completed(self, district: str) -> bool:
+        checkpoint = self.districts.get(district)
+        return bool(checkpoint and checkpoint.completed)
+
+    def resume_page(self, district: str) -> int:
+        """다음에 수집할 목록 페이지"""
+        checkpoint = self.districts.get(district)
+        return checkpoint.last_page + 1 if checkpoint else 1
+
+    def start_district(self, district: str, now: Optional[datetime] = None) -> datetime:
+        """
+        구역 수집 시작 기록
+
+        Returns:
+            구역의 첫 수집 시작 시각 (재개된 구역은 처음 시작한 시각을 유지해 이전 시도에서 본 매물이
+            비활성화되지 않도록 함)
+        """
+        checkpoint = self.districts.get(district)
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(
+                run_date=self.run_date, district=district, last_page=0,
+                completed=False, started_at=now or datetime.now(), updated_at=now or datetime.now()
+            )
+            self.session.add(checkpoint)
+            self.session.commit()
+            self.districts[district] = checkpoint
+        return checkpoint.started_at
+
+    def record_page(self, district: str, page_no: int):
+        """목록 페이지의 상세 정보 저장이 끝났음을 기록"""
+        checkpoint = self.districts[district]
+        checkpoint.last_page = page_no
+        checkpoint.updated_at = datetime.now()
+        self.session.commit()
+
+    def complete_district(self, district: str):
+        checkpoint = self.districts[district]
+        checkpoint.completed = True
+        checkpoint.updated_at = datetime.now()
+        self.session.commit()
+
+    def incomplete_districts(self, districts: List[str]) -> List[str]:
+        """완료 기록이 없는 구역 목록"""
+        return [district for district in districts if not self.is_completed(district)]
+
+    def filter_loaded(self, items: List[dict]) -> List[dict]:
+        """오늘 이미 상세 정보까지 저장한 매물 제외"""
+        with self._lock:
+            return [item for item in items if not item.get('seq') or int(item['seq']) not in self.loaded_ids]
+
+    def record_articles(self, session, property_ids: List[int]):
+        """
+        저장된 매물 ID 기록 (ImportPipeline 의 on_written 콜백)
+
+        변환/저장에 실패해 import_rejects 로 간 매물도 함께 기록되므로 재시도 시 다시 조회하지 않는다.
+        """
+        property_ids = {int(property_id) for property_id in property_ids if property_id}
+        if not property_ids:
+            return
+        stmt = dialect_insert(session, ImportCheckpointArticle).on_conflict_do_nothing(
+            index_elements=['run_date', 'property_id']
+        )
+        session.execute(stmt, [
+            {'run_date': self.run_date, 'property_id': property_id} for property_id in property_ids
+        ])
+        session.commit()
+        with self._lock:
+            self.loaded_ids.update(property_ids)
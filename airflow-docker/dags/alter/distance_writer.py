@@ -0,0 +1,144 @@
+"""
+location_distances 집합 단위 저장
+
+거리 배치를 PostgreSQL COPY FROM STDIN 으로 UNLOGGED 스테이징 테이블에 흘려 넣고,
+매물/주소 테이블과 JOIN 해 존재하는 쌍만 한 번의 INSERT ... ON CONFLICT 로 반영한다.
+(배치마다 ID 존재 여부 조회, 리터럴 INSERT 문 생성, 전체 건수 재조회를 하지 않음)
+
+SQLite(벤치마크/로컬 확인)에서는 COPY 대신 executemany 로 스테이징 테이블을 채운다.
+각 행에는 계산에 사용한 주소 반경(radius_tier)을 함께 기록한다.
+"""
+import io
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+
+from alter.utils import main_logger as logger
+
+STAGING_TABLE = 'realestate.location_distances_staging'
+
+CREATE_STAGING_SQL = {
+    'postgresql': f"""
+        CREATE UNLOGGED TABLE IF NOT EXISTS {STAGING_TABLE} (
+            property_id BIGINT NOT NULL,
+            address_id INTEGER NOT NULL,
+            distance DOUBLE PRECISION NOT NULL
+        )
+    """,
+    'sqlite': f"""
+        CREATE TABLE IF NOT EXISTS {STAGING_TABLE} (
+            property_id BIGINT NOT NULL,
+            address_id INTEGER NOT NULL,
+            distance DOUBLE PRECISION NOT NULL
+        )
+    """,
+}
+
+CLEAR_STAGING_SQL = {
+    # TRUNCATE 는 트랜잭션이 끝날 때까지 테이블을 잠그므로 동시에 실행된 거리 계산끼리 스테이징을 섞지 않는다
+    'postgresql': f"TRUNCATE {STAGING_TABLE}",
+    'sqlite': f"DELETE FROM {STAGING_TABLE}",
+}
+
+# 외래 키는 배치별 조회 대신 JOIN 으로 확인 (WHERE TRUE 는 SQLite 의 INSERT ... SELECT ... ON CONFLICT 구문 요건)
+MERGE_SQL = f"""
+    INSERT INTO realestate.location_distances (property_id, address_id, distance, radius_tier)
+    SELECT s.property_id, s.address_id, s.distance, :radius_tier
+    FROM {STAGING_TABLE} s
+    JOIN realestate.property_locations p ON p.property_id = s.property_id
+    JOIN realestate.addresses a ON a.id = s.address_id
+    WHERE TRUE
+    ON CONFLICT (property_id, address_id) DO UPDATE SET distance = excluded.distance, radius_tier = excluded.radius_tier
+"""
+
+
+class DistanceBulkWriter:
+    """
+    거리 배치 저장
+
+    write() 한 번이 한 트랜잭션이다: 스테이징 비우기 → COPY → 병합 → 커밋.
+    반경 밖이거나 유효하지 않은 거리(NaN, 0 이하)는 COPY 전에 배열 단위로 걸러낸다.
+    max_distance 는 가장 큰 반경 등급이고, write() 의 radius_tier 가 배치의 반경이다.
+    """
+
+    def __init__(self, session, max_distance: float):
+        self.session = session
+        self.max_distance = max_distance
+        self.dialect = session.get_bind().dialect.name
+        if self.dialect not in CREATE_STAGING_SQL:
+            raise NotImplementedError(f"지원하지 않는 DB입니다: {self.dialect}")
+        self.written_count = 0
+        self.skipped_count = 0
+        self._staging_ready = False
+
+    def _ensure_staging(self):
+        if not self._staging_ready:
+            self.session.execute(text(CREATE_STAGING_SQL[self.dialect]))
+            self._staging_ready = True
+
+    def _copy_postgres(self, property_ids, address_ids, distances):
+        buffer = io.StringIO()
+        buffer.writelines(
+            f"{property_id}\t{address_id}\t{distance!r}\n"
+            for property_id, address_id, distance in zip(property_ids, address_ids, distances)
+        )
+        buffer.seek(0)
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} (property_id, address_id, distance) FROM STDIN", buffer
+            )
+        finally:
+            cursor.close()
+
+    def _copy_sqlite(self, property_ids, address_ids, distances):
+        self.session.execute(
+            text(f"INSERT INTO {STAGING_TABLE} (property_id, address_id, distance) VALUES (:p, :a, :d)"),
+            [{'p': p, 'a': a, 'd': d} for p, a, d in zip(property_ids, address_ids, distances)],
+        )
+
+    def write(self, property_ids: Sequence[int], address_ids: Sequence[int], distances: Sequence[float],
+              radius_tier: Optional[float] = None) -> int:
+        """
+        거리 배치 저장
+
+        Args:
+            radius_tier: 배치 계산에 사용한 반경 (미터, 없으면 max_distance). 이 반경 밖의 거리는 저장하지 않는다.
+
+        Returns:
+            location_distances 에 추가/갱신된 행 수 (매물/주소가 없는 쌍은 제외됨)
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        if not len(distances):
+            return 0
+        radius_tier = int(radius_tier or self.max_distance)
+        valid = np.isfinite(distances) & (distances > 0) & (distances <= min(radius_tier, self.max_distance))
+        if not valid.all():
+            logger.warning(f"유효하지 않은 거리 {int((~valid).sum())}개 제외")
+        property_ids = np.asarray(property_ids, dtype=np.int64)[valid].tolist()
+        address_ids = np.asarray(address_ids, dtype=np.int64)[valid].tolist()
+        distances = distances[valid].tolist()
+        if not distances:
+            return 0
+
+        try:
+            self._ensure_staging()
+            self.session.execute(text(CLEAR_STAGING_SQL[self.dialect]))
+            if self.dialect == 'postgresql':
+                self._copy_postgres(property_ids, address_ids, distances)
+            else:
+                self._copy_sqlite(property_ids, address_ids, distances)
+            written = self.session.execute(text(MERGE_SQL), {'radius_tier': radius_tier}).rowcount
+            self.session.commit()
+        except Exception as e:
+            logger.error(f"거리 배치 저장 중 오류 발생 ({len(distances)}건): {str(e)}")
+            self.session.rollback()
+            self._staging_ready = False
+            raise
+
+        self.written_count += written
+        self.skipped_count += len(distances) - written
+        if written < len(distances):
+            logger.warning(f"매물/주소가 없어 저장하지 않은 거리: {len(distances) - written}개")
+        return written
@@ -1,4 +1,8 @@
 import enum
+import json
+import threading
+from collections import Counter
+from functools import lru_cache
 
 class SeoulDistrictCode(enum.Enum):
     """서울시 구별 법정동 코드"""
@@ -348,3 +352,109 @@ class TransactionType(enum.Enum):
     SHORT_TERM_RENT = "30051B3" # 단기임대
     UNKNOWN = "UNKNOWN" #추가
 
+
+class CodeDecoder:
+    """
+    enum 코드 → 이름 변환표
+
+    enum 생성자(HeatingType(code)) 대신 미리 만들어 둔 dict 로 조회하고, 알 수 없는 코드는 예외 없이 세어 둔다.
+    """
+
+    def __init__(self, enum_type, default='UNKNOWN'):
+        self.enum_type = enum_type
+        self.default = default
+        self.table = {member.value: member.name for member in enum_type}
+        self.unknown = Counter()
+        self._lock = threading.Lock()
+
+    def _record_unknown(self, code):
+        with self._lock:
+            self.unknown[code] += 1
+
+    def decode(self, code, required=False):
+        """
+        코드 하나를 이름으로 변환 (빈 값은 default)
+
+        Raises:
+            ValueError: 알 수 없는 코드 (enum 생성자와 같은 동작), required 인데 빈 값
+        """
+        if not code:
+            if required:
+                raise ValueError(f"{code!r} is not a valid {self.enum_type.__name__}")
+            return self.default
+        name = self.table.get(code)
+        if name is None:
+            self._record_unknown(code)
+            raise ValueError(f"{code!r} is not a valid {self.enum_type.__name__}")
+        return name
+
+    def decode_many(self, codes, unknown=None):
+        """
+        코드 목록을 한 번에 변환 (빈 값은 default, 알 수 없는 코드는 unknown 값으로 채우고 집계)
+        """
+        table = self.table
+        default = self.default
+        names = [table.get(code, unknown) if code else default for code in codes]
+        # unknown 이 실제 이름과 같을 수 있으므로 채운 값이 아니라 표에 없는 코드인지로 집계
+        missing = [code for code in codes if code and code not in table]
+        if missing:
+            with self._lock:
+                self.unknown.update(missing)
+        return names
+
+    def decode_list(self, codes):
+        """
+        시설 코드 목록(JSON 문자열 또는 리스트)을 이름 리스트로 변환 (알 수 없는 코드는 제외하고 집계)
+        """
+        if not codes:
+            return []
+        if isinstance(codes, str):
+            codes = _parse_code_list(codes)
+        elif not isinstance(codes, (list, tuple)):
+            codes = (codes,)
+
+        names = []
+        for code in codes:
+            if not code:
+                continue
+            name = self.table.get(code)
+            if name is None:
+                self._record_unknown(code)
+            else:
+                names.append(name)
+        return names
+
+
+@lru_cache(maxsize=4096)
+def _parse_code_list(value):
+    """JSON 문자열 코드 목록 파싱 (같은 문자열이 반복되므로 결과를 캐시)"""
+    try:
+        codes = json.loads(value)
+    except json.JSONDecodeError:
+        return ()
+    return tuple(codes) if isinstance(codes, list) else (codes,)
+
+
+_decoders = {}
+_decoders_lock = threading.Lock()
+
+
+def decoder_for(enum_type) -> CodeDecoder:
+    """enum 타입별 변환표 (처음 요청할 때 한 번만 생성)"""
+    decoder = _decoders.get(enum_type)
+    if decoder is None:
+        with _decoders_lock:
+            decoder = _decoders.setdefault(enum_type, CodeDecoder(enum_type))
+    return decoder
+
+
+def unknown_code_report(reset=False):
+    """enum 별 알 수 없는 코드 집계 {enum 이름: {코드: 횟수}}"""
+    report = {}
+    for enum_type, decoder in list(_decoders.items()):
+        with decoder._lock:
+            if decoder.unknown:
+                report[enum_type.__name__] = dict(decoder.unknown)
+            if reset:
+                decoder.unknown.clear()
+    return report
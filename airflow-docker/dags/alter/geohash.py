@@ -0,0 +1,131 @@
+"""
+좌표 geohash 인코딩과 반경/영역 셀 목록
+
+property_locations.geohash, addresses.geohash 는 GEOHASH_PRECISION(9자리 ≈ 4.8m x 4.8m) 문자열이다.
+컬럼은 COLLATE "C" 의 B-tree 인덱스를 가지므로 `geohash LIKE 'wydm6%'` 같은 접두어 조건이 인덱스 범위 검색이 된다.
+반경/영역 질의는 이 모듈로 영역을 덮는 셀(접두어) 목록을 구해 후보를 좁힌 뒤 실제 거리로 거른다.
+
+사용 예:
+    cells = radius_cells(37.4979, 127.0276, 700)
+    sql = "SELECT property_id FROM realestate.property_locations WHERE " + prefix_condition('geohash', cells)
+"""
+import math
+from typing import List, Optional, Tuple
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+# 반경 질의에서 셀 수가 이보다 많아지지 않는 가장 긴 접두어를 고른다
+MAX_COVER_CELLS = 16
+
+_DECODE = {char: index for index, char in enumerate(BASE32)}
+
+
+def encode(latitude, longitude, precision: int = GEOHASH_PRECISION) -> Optional[str]:
+    """위도/경도 → geohash (좌표가 없거나 범위를 벗어나면 None)"""
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if target >= mid:
+            value = value * 2 + 1
+            value_range[0] = mid
+        else:
+            value = value * 2
+            value_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def decode_bbox(geohash: str) -> Tuple[float, float, float, float]:
+    """geohash 셀 영역 (최소 위도, 최소 경도, 최대 위도, 최대 경도)"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (value >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """precision 자리 셀의 (위도 폭, 경도 폭) (도)"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bbox_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int) -> List[str]:
+    """영역을 덮는 precision 자리 셀 목록 (경도 180° 경계를 넘는 영역은 지원하지 않음)"""
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+    lat_step, lon_step = cell_size(precision)
+    # 셀 경계에 맞춰 시작해야 영역 끝의 셀을 빠뜨리지 않는다
+    lat_start = math.floor((min_lat + 90.0) / lat_step) * lat_step - 90.0
+    lon_start = math.floor((min_lon + 180.0) / lon_step) * lon_step - 180.0
+
+    cells = []
+    lat = lat_start
+    while lat <= max_lat:
+        lon = lon_start
+        while lon <= max_lon:
+            cell = encode(min(lat + lat_step / 2, 90.0), min(lon + lon_step / 2, 180.0), precision)
+            if cell not in cells:
+                cells.append(cell)
+            lon += lon_step
+        lat += lat_step
+    return cells
+
+
+def radius_bbox(latitude: float, longitude: float, radius: float,
+                earth_radius: float = 6371000) -> Tuple[float, float, float, float]:
+    """중심에서 radius(미터) 안의 점을 모두 포함하는 (최소 위도, 최소 경도, 최대 위도, 최대 경도)"""
+    lat_delta = math.degrees(radius / earth_radius)
+    cos_lat = math.cos(math.radians(min(abs(latitude) + lat_delta, 90.0)))
+    lon_delta = 180.0 if cos_lat < 1e-9 else min(math.degrees(radius / (earth_radius * cos_lat)), 180.0)
+    return latitude - lat_delta, longitude - lon_delta, latitude + lat_delta, longitude + lon_delta
+
+
+def covering_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                   max_cells: int = MAX_COVER_CELLS) -> List[str]:
+    """셀 수가 max_cells 이하인 가장 긴 접두어로 영역을 덮는 셀 목록"""
+    cells = bbox_cells(min_lat, min_lon, max_lat, max_lon, 1)
+    for precision in range(2, GEOHASH_PRECISION + 1):
+        candidate = bbox_cells(min_lat, min_lon, max_lat, max_lon, precision)
+        if len(candidate) > max_cells:
+            break
+        cells = candidate
+    return cells
+
+
+def radius_cells(latitude: float, longitude: float, radius: float, max_cells: int = MAX_COVER_CELLS) -> List[str]:
+    """중심에서 radius(미터) 안을 덮는 geohash 접두어 목록"""
+    return covering_cells(*radius_bbox(latitude, longitude, radius), max_cells=max_cells)
+
+
+def prefix_condition(column: str, cells: List[str]) -> str:
+    """셀 목록 → `(column LIKE 'abc%' OR ...)` SQL 조건 (셀은 BASE32 문자만 허용)"""
+    if not cells:
+        return 'FALSE'
+    for cell in cells:
+        if not cell or any(char not in _DECODE for char in cell):
+            raise ValueError(f"잘못된 geohash 셀: {cell!r}")
+    return '(' + ' OR '.join(f"{column} LIKE '{cell}%'" for cell in cells) + ')'
@@ -3,9 +3,11 @@ import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime
 import os
+import time
 from alter.models import Address, CrimeStats
 from alter.db_config import provide_session
 from alter.utils import main_logger as logger
+from alter.run_stats import RunStatsRecorder
 from airflow.models import Variable
 
 # 서울시 OpenAPI 설정
@@ -142,6 +144,7 @@ def get_or_create_address(session, area_name):
 @provide_session
 def import_crime_stats(session=None):
     """범죄 통계 데이터 가져오기"""
+    run_stats = RunStatsRecorder('crime_stats')
     try:
         file_path = "/opt/airflow/dags/data/범죄율/서울시_범죄_통계.csv"
         
@@ -149,7 +152,10 @@ def import_crime_stats(session=None):
             logger.error(f"파일이 존재하지 않습니다: {file_path}")
             return False
             
-        df = pd.read_csv(file_path, encoding='utf-8')
+        with run_stats.stage('read') as stage:
+            df = pd.read_csv(file_path, encoding='utf-8')
+            stage.items = len(df)
+            stage.bytes = os.path.getsize(file_path)
         
         logger.info(f"데이터프레임 컬럼: {df.columns.tolist()}")
         
@@ -176,12 +182,17 @@ def import_crime_stats(session=None):
                 logger.warning(f"구 코드를 찾을 수 없음: {district_name}")
                 continue
             
-            total_population = get_district_population(district_code)
+            with run_stats.stage('fetch', district_name) as stage:
+                total_population = get_district_population(district_code)
+                stage.items = 1 if total_population is not None else 0
+                stage.errors = 0 if total_population is not None else 1
             logger.info(f"{district_name} 인구: {total_population}")
             
             area_name = f"서울특별시 {district_name}"
             address = get_or_create_address(session, area_name)
             
+            district_success, district_errors = success_count, error_count
+            write_start = time.perf_counter()
             for crime_type in starred_crimes:
                 try:
                     crime_rows = df[df['범죄중분류'] == crime_type]
@@ -212,6 +223,9 @@ def import_crime_stats(session=None):
                     logger.error(f"데이터 처리 중 오류: {str(e)}")
                     error_count += 1
                     continue
+            
+            run_stats.add('write', district_name, items=success_count - district_success,
+                          errors=error_count - district_errors, seconds=time.perf_counter() - write_start)
         
         session.commit()
         logger.info(f"범죄 통계 가져오기 완료 - 성공: {success_count}, 실패: {error_count}")
@@ -221,6 +235,8 @@ def import_crime_stats(session=None):
         logger.error(f"범죄 통계 가져오기 실패: {str(e)}")
         session.rollback()
         raise
+    finally:
+        run_stats.flush(session)
 
 if __name__ == "__main__":
     import logging
@@ -1,14 +1,18 @@
 import pandas as pd
 from alter.models import Address, CulturalFacility
 from alter.db_config import provide_session
+from alter.geohash import encode as encode_geohash
 from alter.utils import main_logger as logger
+from alter.run_stats import RunStatsRecorder
 import os
+import time
 import logging
 from datetime import datetime
 
 @provide_session
 def import_cultural_facilities(session=None):
     """문화시설 데이터 가져오기"""
+    run_stats = RunStatsRecorder('cultural_facilities')
     try:
         base_path = "/opt/airflow/dags/data/문화시설"
         
@@ -29,10 +33,15 @@ def import_cultural_facilities(session=None):
                 continue
                 
             try:
-                df = pd.read_csv(file_path)
-                # 서울 데이터만 필터링
-                df = df[df['CTPRVN_NM'].str.contains('서울', na=False)]
+                with run_stats.stage('read', file_name) as stage:
+                    df = pd.read_csv(file_path)
+                    # 서울 데이터만 필터링
+                    df = df[df['CTPRVN_NM'].str.contains('서울', na=False)]
+                    stage.items = len(df)
+                    stage.bytes = os.path.getsize(file_path)
                 
+                file_success, file_errors = success_count, error_count
+                write_start = time.perf_counter()
                 for idx, row in df.iterrows():
                     try:
                         # 주소 처리
@@ -45,6 +54,7 @@ def import_cultural_facilities(session=None):
                                 area_name=area_name,
                                 latitude=row['FCLTY_LA'],
                                 longitude=row['FCLTY_LO'],
+                                geohash=encode_geohash(row['FCLTY_LA'], row['FCLTY_LO']),
                                 created_at=now,
                                 updated_at=now
                             )
@@ -71,8 +81,12 @@ def import_cultural_facilities(session=None):
                         session.rollback()
                         continue
                         
+                run_stats.add('write', file_name, items=success_count - file_success,
+                              errors=error_count - file_errors, seconds=time.perf_counter() - write_start)
+                        
             except Exception as e:
                 logger.error(f"파일 처리 중 오류 ({file_name}): {str(e)}")
+                run_stats.add('write', file_name, errors=1)
                 continue
         
         # 2. 영화관, 전시관
@@ -88,10 +102,15 @@ def import_cultural_facilities(session=None):
                 continue
                 
             try:
-                df = pd.read_csv(file_path)
-                # 서울 데이터만 필터링
-                df = df[df['CTPRVN_NM'].str.contains('서울', na=False)]
+                with run_stats.stage('read', file_name) as stage:
+                    df = pd.read_csv(file_path)
+                    # 서울 데이터만 필터링
+                    df = df[df['CTPRVN_NM'].str.contains('서울', na=False)]
+                    stage.items = len(df)
+                    stage.bytes = os.path.getsize(file_path)
                 
+                file_success, file_errors = success_count, error_count
+                write_start = time.perf_counter()
                 for idx, row in df.iterrows():
                     try:
                         # 도로명주소와 건물번호 합치기
@@ -122,6 +141,8 @@ def import_cultural_facilities(session=None):
                                 area_name=full_address,
                                 latitude=row.get('LC_LA', row.get('FCLTY_LA')),
                                 longitude=row.get('LC_LO', row.get('FCLTY_LO')),
+                                geohash=encode_geohash(row.get('LC_LA', row.get('FCLTY_LA')),
+                                                       row.get('LC_LO', row.get('FCLTY_LO'))),
                                 created_at=now,
                                 updated_at=now
                             )
@@ -148,8 +169,12 @@ def import_cultural_facilities(session=None):
                         session.rollback()
                         continue
                         
+                run_stats.add('write', file_name, items=success_count - file_success,
+                              errors=error_count - file_errors, seconds=time.perf_counter() - write_start)
+                        
             except Exception as e:
                 logger.error(f"파일 처리 중 오류 ({file_name}): {str(e)}")
+                run_stats.add('write', file_name, errors=1)
                 continue
         
         session.commit()
@@ -160,6 +185,8 @@ def import_cultural_facilities(session=None):
         logger.error(f"문화시설 데이터 처리 중 오류: {str(e)}")
         session.rollback()
         raise
+    finally:
+        run_stats.flush(session)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
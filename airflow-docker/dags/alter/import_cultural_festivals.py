@@ -2,12 +2,15 @@ import pandas as pd
 from alter.models import Address, CulturalFestival
 from alter.db_config import provide_session
 from alter.utils import main_logger as logger
+from alter.run_stats import RunStatsRecorder
 import os
+import time
 from datetime import datetime
 
 @provide_session
 def import_cultural_festivals(session=None):
     """문화행사 데이터 가져오기"""
+    run_stats = RunStatsRecorder('cultural_festivals')
     try:
         file_path = "/opt/airflow/dags/data/문화축제/전국 문화축제 데이터.csv"
         
@@ -15,13 +18,17 @@ def import_cultural_festivals(session=None):
             logger.error(f"파일이 존재하지 않습니다: {file_path}")
             return False
             
-        df = pd.read_csv(file_path)
-        
-        # 서울 데이터만 필터링
-        df = df[df['CTPRVN_NM'].str.contains('서울', na=False)]
+        with run_stats.stage('read') as stage:
+            df = pd.read_csv(file_path)
+            
+            # 서울 데이터만 필터링
+            df = df[df['CTPRVN_NM'].str.contains('서울', na=False)]
+            stage.items = len(df)
+            stage.bytes = os.path.getsize(file_path)
         
         success_count = 0
         error_count = 0
+        write_start = time.perf_counter()
         
         for idx, row in df.iterrows():
             try:
@@ -63,13 +70,17 @@ def import_cultural_festivals(session=None):
                 continue
         
         session.commit()
+        run_stats.add('write', items=success_count, errors=error_count, seconds=time.perf_counter() - write_start)
         logger.info(f"문화행사 데이터 처리 완료 - 성공: {success_count}, 실패: {error_count}")
         return True
         
     except Exception as e:
         logger.error(f"문화행사 데이터 처리 중 오류: {str(e)}")
         session.rollback()
+        run_stats.add('write', errors=1)
         raise
+    finally:
+        run_stats.flush(session)
 
 if __name__ == "__main__":
     import logging
@@ -2,28 +2,24 @@ import json
 import asyncio
 import aiohttp
 from aiohttp_socks import ProxyConnector
-from datetime import datetime, timezone
 import logging
 from typing import List
-from tqdm import tqdm
 from stem import Signal
 from stem.control import Controller
 from fake_useragent import UserAgent
 import random
 import time
-from alter.models import PropertyLocation, PropertyInfo, Sale, Rental, LocationDistance
-from alter.db_config import provide_session
+from alter.db_config import provide_session, get_session
+from alter.property_writer import PropertyBulkWriter
+from alter.pipeline import ImportPipeline
+from alter.landing import LandingWriter
+from alter.checkpoint import ImportCheckpointStore
+from alter.run_stats import RunStatsRecorder
 from alter.utils import main_logger as logger
-from .enums import (
-    SeoulDistrictCode, NaverSubCategory, HeatingType, CoolingType,
-    MoveInType, LivingFacilityType, FacilityType, SecurityType,
-    DirectionType, BuildingUseType, PropertyType, LoanAvailability,
-    TransactionType
-)
+from .enums import SeoulDistrictCode
 import os
 import requests
 import socket
-from sqlalchemy import text
 
 class TorController:
     def __init__(self, password='your_password', host='tor', port=9051):
@@ -49,6 +45,11 @@ class PropertyProcessor:
         self.user_agent = UserAgent()
         self.request_count = 0
         self.max_requests_per_ip = 30
+        self.writer = PropertyBulkWriter(session)
+        self.pipeline = None  # 설정되면 저장을 파이프라인 저장 스레드에 맡김
+        self.landing = None  # 설정되면 원본 응답을 landing 파티션에 보관
+        self.checkpoint = None  # 설정되면 구역/페이지 진행 상황과 저장된 매물 ID를 기록
+        self.run_stats = RunStatsRecorder('real_estate')
 
     async def check_ip_rotation(self):
         self.request_count += 1
@@ -59,368 +60,52 @@ class PropertyProcessor:
 
     def process_property(self, item: dict) -> bool:
         """개별 매물 데이터 처리"""
-        property_id = None
-        try:
-            property_id = item.get('seq')
-            if not property_id:
-                logger.error(f"Invalid property data - missing seq: {item}")
-                return False
-
-            # 단일 트랜잭션으로 모든 작업 수행
-            with self.session.begin():
-                try:
-                    # 1. 기존 데이터 삭제 (자식 테이블부터 삭제)
-                    try:
-                        # LocationDistance 테이블이 존재하는지 확인
-                        self.session.execute(text("SELECT 1 FROM information_schema.tables WHERE table_name = 'location_distances'"))
-                        self.session.query(LocationDistance).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"LocationDistance 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(Rental).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"Rental 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(Sale).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"Sale 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(PropertyInfo).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"PropertyInfo 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(PropertyLocation).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"PropertyLocation 삭제 중 오류 (무시됨): {str(e)}")
-
-                    self.session.flush()
-
-                    # 2. Location 정보 저장 (부모 테이블)
-                    legal_dong = item.get('legalDong', {}) or {}
-                    center = item.get('center', {}).get('coordinates', []) if item.get('center') else []
-                    
-                    location = PropertyLocation(
-                        property_id=property_id,
-                        sido=legal_dong.get('sidoName', ''),
-                        sigungu=legal_dong.get('gugunName', ''),
-                        dong=legal_dong.get('dongName', ''),
-                        jibun_main=item.get('jibunMainNumber', ''),
-                        jibun_sub=item.get('jibunSubNumber', ''),
-                        latitude=center[1] if len(center) > 1 else None,
-                        longitude=center[0] if len(center) > 0 else None
-                    )
-                    try:
-                        self.session.add(location)
-                        self.session.flush()
-
-                        # Location이 실제로 저장되었는지 확인
-                        saved_location = self.session.query(PropertyLocation).filter_by(property_id=property_id).first()
-                        if not saved_location:
-                            raise Exception(f"PropertyLocation {property_id}가 저장되지 않았습니다.")
-                    except Exception as e:
-                        logger.error(f"Location 저장 중 오류 발생: {str(e)}")
-                        raise
-
-                    # 3. Property 정보 저장 (중간 테이블)
-                    property_info = PropertyInfo(
-                        property_id=saved_location.property_id,  # PropertyLocation의 ID 값을 사용
-                        property_type=PropertyType(item.get('categoryCode')).name if item.get('categoryCode') else "UNKNOWN",
-                        property_subtype=NaverSubCategory(item.get('subCategoryCode')).name if item.get('subCategoryCode') else "UNKNOWN",
-                        building_name=item.get('buildingName', ''),
-                        detail_address=item.get('detailAddress', ''),
-                        construction_date=item.get('useApproveDay', ''),
-                        total_area=item.get('space1'),
-                        exclusive_area=item.get('space2'),
-                        land_area=item.get('space3'),
-                        on_floor=item.get('onFloorCount'),
-                        under_floor=item.get('underFloorCount'),
-                        room_count=item.get('room'),
-                        bathroom_count=item.get('restroom'),
-                        parking_count=item.get('parkingCount'),
-                        heating_type=HeatingType(item.get('heatTypeCode')).name if item.get('heatTypeCode') else "UNKNOWN",
-                        direction=DirectionType(item.get('directionCode')).name if item.get('directionCode') else "UNKNOWN",
-                        purpose_type=BuildingUseType(item.get('lawUsageCode')).name if item.get('lawUsageCode') else "UNKNOWN",
-                        current_usage=item.get('currentUsage', ''),
-                        recommended_usage=item.get('recommendUsage', ''),
-                        facilities={
-                            'cooling': self.process_facilities(item.get('facilitiesAircon', ''), CoolingType),
-                            'living': self.process_facilities(item.get('facilitiesLife', ''), LivingFacilityType),
-                            'security': self.process_facilities(item.get('facilitiesSecurity', ''), SecurityType),
-                            'etc': self.process_facilities(item.get('facilitiesEtc', ''), FacilityType)
-                        },
-                        description=item.get('description', ''),
-                        photos=process_photos(item.get('photoList')),
-                        move_in_type=MoveInType(item.get('moveInTypeCode')).name if item.get('moveInTypeCode') else "UNKNOWN",
-                        move_in_date=item.get('moveInDate', ''),
-                        loan_availability=LoanAvailability(item.get('loanCode')).name if item.get('loanCode') else "UNKNOWN",
-                        negotiable=item.get('negotiationFlagCode', 'N')[-1],
-                        is_active=True,
-                        last_seen=datetime.now()
-                    )
-                    self.session.add(property_info)
-                    self.session.flush()
-
-                    # PropertyInfo가 실제로 저장되었는지 확인
-                    saved_property = self.session.query(PropertyInfo).filter_by(property_id=property_id).first()
-                    if not saved_property:
-                        raise Exception(f"PropertyInfo {property_id}가 저장되지 않았습니다.")
-
-                    # 4. 거래 정보 저장 (자식 테이블)
-                    trade_type = item.get('tradeTypeCode')
-                    if trade_type == '30051A1':  # 매매
-                        price = int(item.get('price1', 0) or 0) * 10000
-                        if price >= 1000000000000:
-                            logger.warning(f"매물 {property_id}의 가격이 너무 높습니다: {price}")
-                            price = 999999999999
-                        
-                        sale = Sale(
-                            property_id=property_id,  # property_id를 직접 사용
-                            price=price,
-                            end_date=item.get('endDate'),
-                            transaction_date=item.get('transactionDate')
-                        )
-                        self.session.add(sale)
-                    else:  # 임대
-                        deposit = int(item.get('price1', 0) or 0) * 10000
-                        monthly_rent = int(item.get('price2', 0) or 0) * 10000
-                        
-                        if deposit >= 1000000000000:
-                            logger.warning(f"매물 {property_id}의 보증금이 너무 높습니다: {deposit}")
-                            deposit = 999999999999
-                        if monthly_rent >= 1000000000000:
-                            logger.warning(f"매물 {property_id}의 월세가 너무 높습니다: {monthly_rent}")
-                            monthly_rent = 999999999999
-                        
-                        rental = Rental(
-                            property_id=property_id,  # property_id를 직접 사용
-                            rental_type=TransactionType(trade_type).name,
-                            deposit=deposit,
-                            monthly_rent=monthly_rent
-                        )
-                        self.session.add(rental)
-                    self.session.flush()
-
-                    return True
-
-                except Exception as inner_e:
-                    logger.error(f"매물 {property_id} 처리 중 내부 오류 발생: {str(inner_e)}")
-                    raise  # 외부 트랜잭션에서 롤백하도록 예외를 다시 발생시킴
-
-        except Exception as e:
-            logger.error(f"매물 {property_id} 처리 중 오류 발생: {str(e)}")
+        if not item.get('seq'):
+            logger.error(f"Invalid property data - missing seq: {item}")
             return False
+        return self.writer.write_batch([item]) == 1
 
-    def process_batch(self, batch: List[dict]):
-        """배치 처리 메서드"""
-        processed_count = 0
-        
-        # 배치의 모든 property_id 수집
-        property_ids = []
-        items_by_id = {}
+    @staticmethod
+    def _extract_items(batch: List[dict]) -> List[dict]:
+        items = []
         for property_data in batch:
             item = property_data.get('result', {}).get('item', {})
             if item and item.get('seq'):
-                property_id = item.get('seq')
-                property_ids.append(property_id)
-                items_by_id[property_id] = item
+                items.append(item)
+        return items
 
-        if not property_ids:
+    def process_batch(self, batch: List[dict]):
+        """배치 처리 메서드 (PropertyBulkWriter 로 배치 전체를 한 번에 upsert)"""
+        items = self._extract_items(batch)
+        if not items:
             return 0
 
-        # 각 매물을 개별 트랜잭션으로 처리
-        for property_id, item in items_by_id.items():
-            try:
-                with self.session.begin_nested():
-                    # 1. 기존 데이터 삭제
-                    try:
-                        # LocationDistance 테이블이 존재하는지 확인
-                        self.session.execute(text("SELECT 1 FROM information_schema.tables WHERE table_name = 'location_distances'"))
-                        self.session.query(LocationDistance).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"LocationDistance 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(Rental).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"Rental 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(Sale).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"Sale 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(PropertyInfo).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"PropertyInfo 삭제 중 오류 (무시됨): {str(e)}")
-
-                    try:
-                        self.session.query(PropertyLocation).filter_by(property_id=property_id).delete(synchronize_session=False)
-                    except Exception as e:
-                        logger.warning(f"PropertyLocation 삭제 중 오류 (무시됨): {str(e)}")
-
-                    self.session.flush()
-
-                    # 2.1 Location 정보 저장
-                    legal_dong = item.get('legalDong', {}) or {}
-                    center = item.get('center', {}).get('coordinates', []) if item.get('center') else []
-                    
-                    location = PropertyLocation(
-                        property_id=property_id,
-                        sido=legal_dong.get('sidoName', ''),
-                        sigungu=legal_dong.get('gugunName', ''),
-                        dong=legal_dong.get('dongName', ''),
-                        jibun_main=item.get('jibunMainNumber', ''),
-                        jibun_sub=item.get('jibunSubNumber', ''),
-                        latitude=center[1] if len(center) > 1 else None,
-                        longitude=center[0] if len(center) > 0 else None
-                    )
-                    try:
-                        self.session.add(location)
-                        self.session.flush()
-
-                        # Location이 실제로 저장되었는지 확인
-                        saved_location = self.session.query(PropertyLocation).filter_by(property_id=property_id).first()
-                        if not saved_location:
-                            raise Exception(f"PropertyLocation {property_id}가 저장되지 않았습니다.")
-                    except Exception as e:
-                        logger.error(f"Location 저장 중 오류 발생: {str(e)}")
-                        raise
-
-                    # 2.2 Property 정보 저장
-                    property_info = PropertyInfo(
-                        property_id=saved_location.property_id,  # PropertyLocation의 ID 값을 사용
-                        property_type=PropertyType(item.get('categoryCode')).name if item.get('categoryCode') else "UNKNOWN",
-                        property_subtype=NaverSubCategory(item.get('subCategoryCode')).name if item.get('subCategoryCode') else "UNKNOWN",
-                        building_name=item.get('buildingName', ''),
-                        detail_address=item.get('detailAddress', ''),
-                        construction_date=item.get('useApproveDay', ''),
-                        total_area=item.get('space1'),
-                        exclusive_area=item.get('space2'),
-                        land_area=item.get('space3'),
-                        on_floor=item.get('onFloorCount'),
-                        under_floor=item.get('underFloorCount'),
-                        room_count=item.get('room'),
-                        bathroom_count=item.get('restroom'),
-                        parking_count=item.get('parkingCount'),
-                        heating_type=HeatingType(item.get('heatTypeCode')).name if item.get('heatTypeCode') else "UNKNOWN",
-                        direction=DirectionType(item.get('directionCode')).name if item.get('directionCode') else "UNKNOWN",
-                        purpose_type=BuildingUseType(item.get('lawUsageCode')).name if item.get('lawUsageCode') else "UNKNOWN",
-                        current_usage=item.get('currentUsage', ''),
-                        recommended_usage=item.get('recommendUsage', ''),
-                        facilities={
-                            'cooling': self.process_facilities(item.get('facilitiesAircon', ''), CoolingType),
-                            'living': self.process_facilities(item.get('facilitiesLife', ''), LivingFacilityType),
-                            'security': self.process_facilities(item.get('facilitiesSecurity', ''), SecurityType),
-                            'etc': self.process_facilities(item.get('facilitiesEtc', ''), FacilityType)
-                        },
-                        description=item.get('description', ''),
-                        photos=process_photos(item.get('photoList')),
-                        move_in_type=MoveInType(item.get('moveInTypeCode')).name if item.get('moveInTypeCode') else "UNKNOWN",
-                        move_in_date=item.get('moveInDate', ''),
-                        loan_availability=LoanAvailability(item.get('loanCode')).name if item.get('loanCode') else "UNKNOWN",
-                        negotiable=item.get('negotiationFlagCode', 'N')[-1],
-                        is_active=True,
-                        last_seen=datetime.now()
-                    )
-                    self.session.add(property_info)
-                    self.session.flush()
-
-                    # PropertyInfo가 실제로 저장되었는지 확인
-                    saved_property = self.session.query(PropertyInfo).filter_by(property_id=property_id).first()
-                    if not saved_property:
-                        raise Exception(f"PropertyInfo {property_id}가 저장되지 않았습니다.")
-
-                    # 2.3 거래 정보 저장
-                    trade_type = item.get('tradeTypeCode')
-                    if trade_type == '30051A1':  # 매매
-                        price = int(item.get('price1', 0) or 0) * 10000
-                        if price >= 1000000000000:
-                            logger.warning(f"매물 {property_id}의 가격이 너무 높습니다: {price}")
-                            price = 999999999999
-                        
-                        sale = Sale(
-                            property_id=property_id,  # property_id를 직접 사용
-                            price=price,
-                            end_date=item.get('endDate'),
-                            transaction_date=item.get('transactionDate')
-                        )
-                        self.session.add(sale)
-                    else:  # 임대
-                        deposit = int(item.get('price1', 0) or 0) * 10000
-                        monthly_rent = int(item.get('price2', 0) or 0) * 10000
-                        
-                        if deposit >= 1000000000000:
-                            logger.warning(f"매물 {property_id}의 보증금이 너무 높습니다: {deposit}")
-                            deposit = 999999999999
-                        if monthly_rent >= 1000000000000:
-                            logger.warning(f"매물 {property_id}의 월세가 너무 높습니다: {monthly_rent}")
-                            monthly_rent = 999999999999
-                        
-                        rental = Rental(
-                            property_id=property_id,  # property_id를 직접 사용
-                            rental_type=TransactionType(trade_type).name,
-                            deposit=deposit,
-                            monthly_rent=monthly_rent
-                        )
-                        self.session.add(rental)
-                    self.session.flush()
-
-                    processed_count += 1
-                self.session.commit()  # 각 매물의 트랜잭션 커밋
-                    
-            except Exception as e:
-                logger.error(f"매물 {property_id} 처리 중 오류 발생: {str(e)}")
-                self.session.rollback()
-                continue
-        
-        return processed_count
+        with self.run_stats.stage('write') as stage:
+            written = stage.items = self.writer.write_batch(items)
+        if self.checkpoint:
+            self.checkpoint.record_articles(self.session, [item['seq'] for item in items])
+        return written
 
-    def process_facilities(self, facilities_data, facility_type_enum):
-        """시설 정보를 처리하는 함수"""
-        if not facilities_data:
-            return []
-        
-        try:
-            facilities = []
-            # 문자열로 된 리스트를 파싱
-            if isinstance(facilities_data, str):
-                try:
-                    facilities_data = json.loads(facilities_data)
-                except json.JSONDecodeError:
-                    return []
-            
-            # 리스트가 아닌 경우 처리
-            if not isinstance(facilities_data, list):
-                facilities_data = [facilities_data]
-            
-            for facility_code in facilities_data:
-                try:
-                    if facility_code:
-                        facility_type = facility_type_enum(facility_code).name
-                        facilities.append(facility_type)
-                except (ValueError, AttributeError) as e:
-                    logger.warning(f"시설 코드 처리 중 오류: {str(e)}, 코드: {facility_code}")
-                    continue
-            
-            return facilities
-            
-        except Exception as e:
-            logger.error(f"시설 정보 처리 중 오류 발생: {str(e)}")
-            return []
+    async def submit_batch(self, batch: List[dict], district_name: str = None):
+        """파이프라인이 있으면 저장 대기열에 넣고 바로 반환, 없으면 직접 저장"""
+        if self.pipeline is None:
+            return self.process_batch(batch)
 
-async def get_property_detail(session, article_id, headers):
+        items = self._extract_items(batch)
+        await self.pipeline.submit(items, district_name)
+        return len(items)
+
+async def get_property_detail(session, article_id, headers, run_stats=None, district_name=None):
     """개별 매물 상세 정보를 가져오는 함수"""
     try:
         url = f"https://www.rter2.com/hompyArticle/{article_id}"
         
         async with session.get(url, headers=headers) as response:
             if response.status == 200:
-                data = await response.json()
+                body = await response.read()
+                if run_stats:
+                    run_stats.add('fetch_detail', district_name, byte_count=len(body))
+                data = json.loads(body)
                 if data and isinstance(data, dict):
                     data['seq'] = article_id
                 return data
@@ -431,7 +116,7 @@ async def get_property_detail(session, article_id, headers):
         logger.error(f"매물 상세 정보 요청 중 오류 발생 (ID: {article_id}): {str(e)}")
         return None
 
-async def get_property_details_batch(session, items, processor, batch_size=100):
+async def get_property_details_batch(session, items, processor, batch_size=100, district_name=None):
     """매물 상세 정보를 배치로 비동기 수집"""
     tasks = []
     all_details = []
@@ -456,18 +141,25 @@ async def get_property_details_batch(session, items, processor, batch_size=100):
                 'origin': 'https://www.rter2.com'
             }
             
-            task = get_property_detail(session, article_id, detail_headers)
+            task = get_property_detail(session, article_id, detail_headers, processor.run_stats, district_name)
             batch_tasks.append(task)
         
         if batch_tasks:
             logger.info(f"배치 처리 시작: {i+1}~{min(i+batch_size, len(items))}/{len(items)}")
+            fetch_start = time.perf_counter()
             results = await asyncio.gather(*batch_tasks)
             successful_details = [r for r in results if r is not None and r.get('seq')]
+            processor.run_stats.add(
+                'fetch_detail', district_name, items=len(successful_details),
+                errors=len(results) - len(successful_details), seconds=time.perf_counter() - fetch_start
+            )
             
             if successful_details:
                 logger.info(f"성공적으로 가져온 매물 수: {len(successful_details)}")
+                if processor.landing:
+                    processor.landing.write_details(district_name, successful_details)
                 try:
-                    processor.process_batch(successful_details)
+                    await processor.submit_batch(successful_details, district_name)
                     total_processed += len(successful_details)
                     logger.info(f"현재까지 처리된 총 매물 수: {total_processed}")
                 except Exception as e:
@@ -486,7 +178,12 @@ async def get_property_details_batch(session, items, processor, batch_size=100):
     return total_processed
 
 async def get_property_data(processor, district_code):
-    """특정 구역의 부동산 데이터를 가져오는 함수"""
+    """
+    특정 구역의 부동산 데이터를 가져오는 함수
+
+    Returns:
+        (처리한 매물 수, 목록을 끝까지 순회했는지 여부)
+    """
     # 구역 코드로부터 구역 이름 가져오기
     district_name = SeoulDistrictCode(district_code).name
     logger.info(f"구역 {district_name}에 대한 데이터 수집 시작")
@@ -496,6 +193,7 @@ async def get_property_data(processor, district_code):
         timeout = aiohttp.ClientTimeout(total=1800)
         
         total_processed = 0
+        completed = False
         
         async with aiohttp.ClientSession(
             connector=connector,
@@ -513,7 +211,9 @@ async def get_property_data(processor, district_code):
             }
             logger.info(f"요청 헤더 설정: {list_headers}")
 
-            page_no = 1
+            page_no = processor.checkpoint.resume_page(district_name) if processor.checkpoint else 1
+            if page_no > 1:
+                logger.info(f"체크포인트에서 이어서 수집: {district_name} 페이지 {page_no}부터")
             
             while True:
                 try:
@@ -542,6 +242,7 @@ async def get_property_data(processor, district_code):
                     }
                     logger.info(f"요청 페이로드: {payload}")
                     
+                    fetch_start = time.perf_counter()
                     async with session.post(
                         'https://www.rter2.com/hompyArticle/list',
                         data=payload,
@@ -554,39 +255,68 @@ async def get_property_data(processor, district_code):
                                 
                                 data = await response.json()
                                 items = data.get('result', {}).get('list', [])
+                                processor.run_stats.add(
+                                    'fetch_list', district_name, items=len(items),
+                                    byte_count=len(response_text.encode('utf-8')),
+                                    seconds=time.perf_counter() - fetch_start
+                                )
                                 total_count = data.get('result', {}).get('paging', {}).get('totalCount', 0)
                                 
                                 logger.info(f"페이지 {page_no}에서 {len(items)}개의 매물 발견 (전체: {total_count}개)")
                                 
                                 if not items or total_processed >= 10000:
                                     logger.info("매물 수집 완료 또는 최대 개수 도달. 페이지 순회 종료")
+                                    completed = not items
                                     break
+
+                                if processor.landing:
+                                    processor.landing.write_list(district_name, page_no, items)
+
+                                # 상세 조회 실패와 관계없이 목록에 노출된 매물은 본 것으로 표시
+                                processor.writer.mark_seen([item['seq'] for item in items if item.get('seq')])
                                     
+                                # 오늘 이미 저장한 매물은 상세 조회 생략
+                                if processor.checkpoint:
+                                    pending_items = processor.checkpoint.filter_loaded(items)
+                                    if len(pending_items) < len(items):
+                                        logger.info(f"이미 저장된 매물 {len(items) - len(pending_items)}개 상세 조회 생략")
+                                    items = pending_items
+
                                 # 배치로 상세 정보 수집
-                                processed_count = await get_property_details_batch(session, items, processor)
+                                processed_count = await get_property_details_batch(session, items, processor, district_name=district_name)
                                 total_processed += processed_count
+
+                                # 페이지의 매물이 모두 저장된 뒤에 진행 상황 기록
+                                if processor.checkpoint:
+                                    if processor.pipeline:
+                                        await processor.pipeline.drain()
+                                    processor.checkpoint.record_page(district_name, page_no)
                                 
                                 page_no += 1
                                 logger.info(f"다음 페이지로 이동: {page_no}")
                                 
                             except json.JSONDecodeError as e:
                                 logger.error(f"JSON 파싱 오류: {str(e)}, 응답 데이터: {response_text[:500]}")
+                                processor.run_stats.add('fetch_list', district_name, errors=1)
                                 await processor.tor_controller.renew_tor_ip()
                                 await asyncio.sleep(random.uniform(5, 10))
                                 continue
                             except Exception as e:
                                 logger.error(f"데이터 처리 중 예외 발생: {str(e)}")
+                                processor.run_stats.add('fetch_list', district_name, errors=1)
                                 await processor.tor_controller.renew_tor_ip()
                                 await asyncio.sleep(random.uniform(5, 10))
                                 continue
                                 
                         elif response.status == 403:
                             logger.error("접근이 차단됨. IP 변경 시도")
+                            processor.run_stats.add('fetch_list', district_name, errors=1)
                             await processor.tor_controller.renew_tor_ip()
                             await asyncio.sleep(random.uniform(5, 10))
                             continue
                         else:
                             logger.error(f"API 오류 응답: {response.status}")
+                            processor.run_stats.add('fetch_list', district_name, errors=1)
                             await processor.tor_controller.renew_tor_ip()
                             await asyncio.sleep(random.uniform(5, 10))
                             continue
@@ -596,81 +326,166 @@ async def get_property_data(processor, district_code):
                     
                 except Exception as e:
                     logger.error(f"페이지 처리 중 예외 발생: {str(e)}")
+                    processor.run_stats.add('fetch_list', district_name, errors=1)
                     await processor.tor_controller.renew_tor_ip()
                     await asyncio.sleep(random.uniform(5, 10))
                     continue
 
             logger.info(f"구역 코드 {district_code} 데이터 수집 완료. 총 {total_processed}개의 매물 수집")
-            return total_processed
+            return total_processed, completed
                     
     except Exception as e:
         logger.error(f"전체 프로세스 실패: {str(e)}")
-        return 0
-
-def run_import_real_estate():
-    """Airflow task에서 호출할 래퍼 함수"""
+        return 0, False
+
+def district_groups(num_groups: int = None) -> List[dict]:
+    """
+    구역을 num_groups 개 그룹으로 나눈 Airflow 동적 매핑용 op_kwargs 목록
+
+    구역별 매물 수 차이가 크므로 코드 순서대로 번갈아 배정해 그룹 크기를 맞춘다.
+    """
+    num_groups = num_groups or int(os.getenv('IMPORT_DISTRICT_GROUPS', '5'))
+    names = [district.name for district in SeoulDistrictCode]
+    num_groups = max(1, min(num_groups, len(names)))
+    return [{'districts': names[i::num_groups]} for i in range(num_groups)]
+
+def run_import_real_estate(ds=None, districts=None, **context):
+    """
+    Airflow task에서 호출할 래퍼 함수
+
+    Args:
+        ds: 실행 날짜 (체크포인트/landing 파티션 기준)
+        districts: 수집할 구 이름 목록 (동적 매핑된 task 별 구역 그룹, 없으면 전체)
+    """
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(import_real_estate())
+        result = loop.run_until_complete(
+            import_real_estate(run_date=ds, districts=districts, run_id=context.get('run_id'))
+        )
         loop.close()
         return result
     except Exception as e:
         logger.error(f"부동산 데이터 가져오기 실패: {str(e)}")
         raise
 
+async def import_district(processor, district: SeoulDistrictCode) -> int:
+    """한 구역 수집 (체크포인트 확인 → 수집 → 저장 대기 → 비활성화 스윕)"""
+    if processor.checkpoint.is_completed(district.name):
+        logger.info(f"구역 {district.name}은 체크포인트상 이미 완료되어 건너뜁니다.")
+        return 0
+
+    district_started_at = processor.checkpoint.start_district(district.name)
+    with processor.run_stats.stage('total', district.name) as total:
+        property_data, completed = await get_property_data(processor, district.value)
+
+        # 구역 매물이 모두 저장된 뒤에 비활성화 여부를 판단
+        await processor.pipeline.drain()
+        processor.pipeline.log_stats()
+        total.items = property_data or 0
+
+    # 목록을 끝까지 순회한 구역만 이번 실행에서 보이지 않은 매물을 비활성화
+    if completed:
+        deactivated = processor.writer.deactivate_unseen(district.name, district_started_at)
+        logger.info(f"구역 {district.name}: 목록에서 사라진 매물 {deactivated}개 비활성화")
+        processor.checkpoint.complete_district(district.name)
+    else:
+        logger.warning(f"구역 {district.name} 수집이 완료되지 않아 비활성화를 건너뜁니다.")
+    processor.run_stats.flush(processor.session)
+    return property_data or 0
+
 @provide_session
-async def import_real_estate(session=None):
-    """부동산 데이터를 가져와서 DB에 저장하는 함수"""
+async def import_real_estate(run_date=None, districts=None, run_id=None, session=None):
+    """
+    부동산 데이터를 가져와서 DB에 저장하는 함수
+
+    같은 run_date 로 다시 실행하면 체크포인트를 읽어 완료된 구역은 건너뛰고 중단된 곳부터 이어서 수집한다.
+    (IMPORT_RESUME=false 이면 체크포인트를 무시하고 처음부터 수집)
+    """
+    targets = [SeoulDistrictCode[name] for name in districts] if districts else list(SeoulDistrictCode)
     success_count = 0
+    processor = PropertyProcessor(session)
+    processor.run_stats = RunStatsRecorder('real_estate', run_id)
+    processor.checkpoint = ImportCheckpointStore(session, run_date)
+    if os.getenv('IMPORT_RESUME', 'true').lower() == 'true':
+        processor.checkpoint.load()
+    else:
+        processor.checkpoint.reset(districts)
+    # 수집(이벤트 루프)과 저장(스레드)을 분리하여 네트워크 대기와 DB 쓰기가 겹치도록 함
+    processor.pipeline = ImportPipeline(
+        get_session,
+        num_writers=int(os.getenv('IMPORT_WRITER_THREADS', '2')),
+        max_queue_batches=int(os.getenv('IMPORT_QUEUE_BATCHES', '10')),
+        on_written=processor.checkpoint.record_articles,
+        run_stats=processor.run_stats,
+    )
+    # 원본 응답 보관 (변환 오류 시 replay_landing 으로 재수집 없이 재처리)
+    if os.getenv('REAL_ESTATE_LANDING', 'true').lower() == 'true':
+        processor.landing = LandingWriter(run_date=processor.checkpoint.run_date)
     try:
-        processor = PropertyProcessor(session)
-        
-        for district in SeoulDistrictCode:
+        for district in targets:
             try:
                 # SIGTERM 시그널을 받았는지 확인
                 if asyncio.current_task().cancelled():
                     logger.info("작업이 취소되었습니다. 정상적으로 종료합니다.")
                     break
-                    
-                property_data = await get_property_data(processor, district.value)
-                if property_data:
-                    success_count += property_data
+
+                success_count += await import_district(processor, district)
                 await asyncio.sleep(random.uniform(1, 5))
             except Exception as e:
                 logger.error(f"Error processing district {district.name}: {str(e)}")
                 continue
         
-        return {"success": True, "processed_count": success_count}
+        processor.run_stats.flush(session)
+        return {"success": True, "processed_count": success_count, "pipeline": processor.pipeline.close()}
             
     except asyncio.CancelledError:
         logger.info("작업이 취소되었습니다. 정상적으로 종료합니다.")
-        return {"success": True, "processed_count": success_count}
+        return {"success": True, "processed_count": success_count, "pipeline": processor.pipeline.close()}
     except Exception as e:
         logger.error(f"Error in import_real_estate: {str(e)}")
+        processor.pipeline.close()
         return {"success": False, "error": str(e)}
 
-def process_facility_type(facility_list, enum_type):
-    """개별 시설 타입 처리"""
-    print(facility_list)
-    if not facility_list:
-        return []
-    try:
-        # 역슬래시 제거
-        cleaned_list = [item.replace('\\', '') for item in facility_list if item]
-        return [enum_type(item).name for item in cleaned_list]
-    except ValueError:
-        return []
-
-def process_photos(photos_data):
-    if not photos_data:
-        return {}
-    try:
-        if isinstance(photos_data, str):
-            return json.loads(photos_data)
-        return photos_data
-    except:
-        return {}
+@provide_session
+def finalize_import_real_estate(ds=None, ti=None, session=None, **context):
+    """
+    구역 그룹별 수집 task 결과를 합치고 완료되지 않은 구역을 확인하는 task
+
+    최대 수집 개수에 도달했거나 도중에 실패한 구역은 경고로만 남기고 거리 계산은 계속 진행한다.
+    (미완료 구역은 비활성화 스윕만 건너뛴 상태이며, 해당 그룹 task 를 재시도(clear)하면
+    체크포인트에서 이어서 수집한다.)
+    """
+    results = []
+    if ti is not None:
+        results = [result for result in (ti.xcom_pull(task_ids='import_real_estate_data') or []) if result]
+
+    processed = sum(result.get('processed_count', 0) for result in results)
+    pipelines = [result['pipeline'] for result in results if result.get('pipeline')]
+    written = sum(stats['written_items'] for stats in pipelines)
+    unchanged = sum(stats.get('unchanged_items', 0) for stats in pipelines)
+    rejected = sum(stats.get('rejected_items', 0) for stats in pipelines)
+    unknown_codes = {}
+    for stats in pipelines:
+        for enum_name, codes in (stats.get('unknown_codes') or {}).items():
+            merged = unknown_codes.setdefault(enum_name, {})
+            for code, count in codes.items():
+                merged[code] = merged.get(code, 0) + count
+    if unknown_codes:
+        logger.warning(f"알 수 없는 코드 (enums.py 에 추가 필요): {unknown_codes}")
+
+    checkpoint = ImportCheckpointStore(session, ds).load()
+    incomplete = checkpoint.incomplete_districts([district.name for district in SeoulDistrictCode])
+    logger.info(
+        f"부동산 수집 결과 ({checkpoint.run_date}): 그룹 {len(results)}개, 처리 {processed}건 "
+        f"(저장 {written}건, 변경 없음 {unchanged}건, 거부 {rejected}건), "
+        f"미완료 구역 {len(incomplete)}개"
+    )
+    if incomplete:
+        logger.warning(f"수집이 완료되지 않은 구역이 있습니다 (비활성화 생략): {', '.join(incomplete)}")
+    return {"processed_count": processed, "written_count": written,
+            "unchanged_count": unchanged, "rejected_count": rejected, "unknown_codes": unknown_codes,
+            "incomplete_districts": incomplete}
 
 def get_tor_session():
     """Tor 프록시를 사용하는 requests 세션 생성"""
@@ -700,49 +515,6 @@ def renew_tor_ip():
         logger.error(f'Failed to renew Tor IP: {str(e)}')
         return False
 
-def create_property_info(session, property_location, property_data):
-    """매물 정보 생성"""
-    try:
-        property_info = PropertyInfo(
-            property_id=property_data.get('property_id'),  # property_id를 직접 사용
-            property_type=property_data.get('property_type'),
-            property_subtype=property_data.get('property_subtype'),
-            building_name=property_data.get('building_name'),
-            detail_address=property_data.get('detail_address'),
-            construction_date=property_data.get('construction_date', ''),
-            total_area=property_data.get('total_area'),
-            exclusive_area=property_data.get('exclusive_area'),
-            land_area=property_data.get('land_area'),
-            on_floor=property_data.get('on_floor'),
-            under_floor=property_data.get('under_floor'),
-            room_count=property_data.get('room_count'),
-            bathroom_count=property_data.get('bathroom_count'),
-            parking_count=property_data.get('parking_count'),
-            heating_type=property_data.get('heating_type'),
-            direction=property_data.get('direction'),
-            purpose_type=property_data.get('purpose_type'),
-            current_usage=property_data.get('current_usage'),
-            recommended_usage=property_data.get('recommended_usage'),
-            facilities=property_data.get('facilities'),
-            description=property_data.get('description'),
-            move_in_type=property_data.get('move_in_type'),
-            move_in_date=property_data.get('move_in_date'),
-            loan_availability=property_data.get('loan_availability'),
-            negotiable=property_data.get('negotiable', 'N'),
-            photos=property_data.get('photos', '{}'),
-            update_count=property_data.get('update_count', 0),
-            is_active=property_data.get('is_active', True),
-            inactive_reason=property_data.get('inactive_reason'),
-            first_seen=datetime.now(timezone.utc),
-            last_seen=datetime.now(timezone.utc)
-        )
-        session.add(property_info)
-        session.flush()
-        return property_info
-    except Exception as e:
-        logger.error(f"매물 정보 생성 중 오류 발생: {str(e)}")
-        raise
-
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     asyncio.run(import_real_estate()) 
\ No newline at end of file
@@ -1,24 +1,32 @@
 import pandas as pd
 from alter.models import Address, SubwayStation
 from alter.db_config import provide_session
+from alter.geohash import encode as encode_geohash
 from alter.utils import main_logger as logger
+from alter.run_stats import RunStatsRecorder
 import os
+import time
 import logging
 from datetime import datetime
 
 @provide_session
 def import_subway_stations(session=None):
     """지하철역 데이터 가져오기"""
+    run_stats = RunStatsRecorder('subway_stations')
     try:
         file_path = "/opt/airflow/dags/data/지하철/seoul_subway_stations.csv"
         if not os.path.exists(file_path):
             logger.error(f"파일이 존재하지 않습니다: {file_path}")
             return
             
-        df = pd.read_csv(file_path)
+        with run_stats.stage('read') as stage:
+            df = pd.read_csv(file_path)
+            stage.items = len(df)
+            stage.bytes = os.path.getsize(file_path)
         
         success_count = 0
         error_count = 0
+        write_start = time.perf_counter()
         
         for idx, row in df.iterrows():
             try:
@@ -32,6 +40,7 @@ def import_subway_stations(session=None):
                         area_name=area_name,
                         latitude=row['위도'],
                         longitude=row['경도'],
+                        geohash=encode_geohash(row['위도'], row['경도']),
                         created_at=now,
                         updated_at=now
                     )
@@ -58,11 +67,15 @@ def import_subway_stations(session=None):
                 continue
                 
         session.commit()
+        run_stats.add('write', items=success_count, errors=error_count, seconds=time.perf_counter() - write_start)
         logger.info(f"지하철역 데이터 가져오기 완료 - 성공: {success_count}, 실패: {error_count}")
         
     except Exception as e:
         logger.error(f"지하철역 데이터 가져오기 중 오류 발생: {str(e)}")
         session.rollback()
+        run_stats.add('write', errors=1)
+    finally:
+        run_stats.flush(session)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
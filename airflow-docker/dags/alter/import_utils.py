@@ -12,6 +12,7 @@ from alter.models import (
     SubwayStation
 )
 from alter.db_config import get_session, provide_session
+from alter.geohash import encode as encode_geohash
 
 logger = logging.getLogger(__name__)
 
@@ -23,12 +24,14 @@ def get_or_create_address(session, area_name, latitude=None, longitude=None):
             if latitude and longitude and (not address.latitude or not address.longitude):
                 address.latitude = latitude
                 address.longitude = longitude
+                address.geohash = encode_geohash(latitude, longitude)
                 session.flush()
         else:
             address = Address(
                 area_name=area_name,
                 latitude=latitude,
-                longitude=longitude
+                longitude=longitude,
+                geohash=encode_geohash(latitude, longitude)
             )
             session.add(address)
             session.flush()
@@ -0,0 +1,176 @@
+"""
+원본 API 응답 보관(landing) 및 재처리
+
+수집한 목록/상세 응답을 날짜별 파티션에 gzip JSONL 로 그대로 저장한다.
+
+    {LANDING_ROOT}/dt=YYYY-MM-DD/list/{구이름}.jsonl.gz
+    {LANDING_ROOT}/dt=YYYY-MM-DD/detail/{구이름}.jsonl.gz
+
+한 줄은 {"fetched_at": ..., "district": ..., "page": ..., "payload": 원본 응답} 형태이다.
+변환 로직이나 enum 코드가 바뀌었을 때 replay_landing 으로 네트워크 없이 하루치 데이터를 다시 적재할 수 있다.
+"""
+import gzip
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+
+from alter.db_config import provide_session
+from alter.property_writer import PropertyBulkWriter
+from alter.utils import main_logger as logger
+from .enums import unknown_code_report
+
+LANDING_ROOT = os.getenv('REAL_ESTATE_LANDING_DIR', '/opt/airflow/dags/data/landing')
+LANDING_KINDS = ('list', 'detail')
+
+
+def _partition_date(run_date=None) -> str:
+    if run_date is None:
+        return date.today().isoformat()
+    if isinstance(run_date, (date, datetime)):
+        return run_date.strftime('%Y-%m-%d')
+    return str(run_date)
+
+
+def partition_path(run_date, kind: str, district: str, root: str = LANDING_ROOT) -> str:
+    """파티션 파일 경로"""
+    if kind not in LANDING_KINDS:
+        raise ValueError(f"지원하지 않는 landing 종류입니다: {kind}")
+    return os.path.join(root, f'dt={_partition_date(run_date)}', kind, f'{district}.jsonl.gz')
+
+
+class LandingWriter:
+    """
+    수집한 원본 응답을 파티션 파일에 추가 저장
+
+    같은 날 재실행하면 기존 파일 뒤에 gzip 멤버가 추가되므로 이전 기록이 지워지지 않는다.
+    (재처리 시 같은 매물은 마지막 응답을 사용)
+    """
+
+    def __init__(self, root: str = LANDING_ROOT, run_date=None):
+        self.root = root
+        self.run_date = _partition_date(run_date)
+        self.written_lines = 0
+        self._lock = threading.Lock()
+
+    def write(self, kind: str, district: str, payloads: List[dict], page: Optional[int] = None):
+        if not payloads:
+            return
+        path = partition_path(self.run_date, kind, district, self.root)
+        fetched_at = datetime.now().isoformat()
+        lines = ''.join(
+            json.dumps({'fetched_at': fetched_at, 'district': district, 'page': page, 'payload': payload},
+                       ensure_ascii=False) + '\n'
+            for payload in payloads
+        )
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, 'at', encoding='utf-8', compresslevel=5) as f:
+                f.write(lines)
+            self.written_lines += len(payloads)
+
+    def write_list(self, district: str, page: int, items: List[dict]):
+        """목록 API 의 매물 목록 저장"""
+        self.write('list', district, items, page)
+
+    def write_details(self, district: str, details: List[dict]):
+        """상세 API 응답 저장"""
+        self.write('detail', district, details)
+
+
+def list_partition_districts(run_date, kind: str = 'detail', root: str = LANDING_ROOT) -> List[str]:
+    """파티션에 저장된 구 이름 목록"""
+    directory = os.path.dirname(partition_path(run_date, kind, '_', root))
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.jsonl.gz')] for name in os.listdir(directory) if name.endswith('.jsonl.gz'))
+
+
+def iter_landing(run_date, kind: str, district: str, root: str = LANDING_ROOT) -> Iterator[dict]:
+    """파티션 파일의 레코드를 순서대로 읽음 (마지막 줄이 잘린 파일은 거기까지만 사용)"""
+    path = partition_path(run_date, kind, district, root)
+    if not os.path.exists(path):
+        return
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"손상된 landing 레코드를 건너뜁니다: {path}")
+    except (EOFError, OSError) as e:
+        # 수집 도중 중단되어 마지막 gzip 멤버가 완결되지 않은 경우
+        logger.warning(f"landing 파일 끝이 손상되어 읽기를 중단합니다: {path} ({str(e)})")
+
+
+def replay_district(writer: PropertyBulkWriter, run_date, district: str,
+                    batch_size: int = 500, root: str = LANDING_ROOT) -> int:
+    """한 구역의 landing 파티션을 다시 변환/적재"""
+    # 목록 노출 기록 복원 (페이지 단위로 수집 당시 시각을 last_seen 에 기록)
+    seen = {}
+    for record in iter_landing(run_date, 'list', district, root):
+        seq = record['payload'].get('seq')
+        if seq:
+            seen.setdefault(record['fetched_at'], []).append(seq)
+    for fetched_at, property_ids in seen.items():
+        writer.mark_seen(property_ids, datetime.fromisoformat(fetched_at))
+
+    processed = 0
+    batch = []
+    batch_fetched_at = None
+    for record in iter_landing(run_date, 'detail', district, root):
+        item = record['payload'].get('result', {}).get('item', {})
+        if not item or not item.get('seq'):
+            continue
+        batch.append(item)
+        batch_fetched_at = datetime.fromisoformat(record['fetched_at'])
+        if len(batch) >= batch_size:
+            processed += writer.write_batch(batch, now=batch_fetched_at)
+            batch = []
+    if batch:
+        processed += writer.write_batch(batch, now=batch_fetched_at)
+    return processed
+
+
+@provide_session
+def replay_landing(run_date=None, districts: Optional[List[str]] = None,
+                   batch_size: int = 500, root: str = LANDING_ROOT, session=None):
+    """
+    landing 파티션을 네트워크 없이 다시 적재하는 Airflow task
+
+    Args:
+        run_date: 파티션 날짜 (YYYY-MM-DD, 없으면 오늘)
+        districts: 재처리할 구 이름 목록 (없으면 파티션 전체)
+
+    구역 비활성화 스윕은 수집 시점의 목록 완결 여부를 알 수 없으므로 재처리하지 않는다.
+    """
+    run_date = _partition_date(run_date)
+    districts = districts or list_partition_districts(run_date, 'detail', root)
+    if not districts:
+        logger.warning(f"재처리할 landing 파티션이 없습니다: dt={run_date}")
+        return {"success": True, "processed_count": 0}
+
+    writer = PropertyBulkWriter(session)
+    started_at = datetime.now()
+    total = 0
+    for district in districts:
+        processed = replay_district(writer, run_date, district, batch_size, root)
+        total += processed
+        logger.info(f"landing 재처리 dt={run_date} {district}: {processed}건")
+
+    unknown_codes = unknown_code_report()
+    if unknown_codes:
+        logger.warning(f"landing 재처리 중 알 수 없는 코드: {unknown_codes}")
+    elapsed = (datetime.now() - started_at).total_seconds()
+    logger.info(
+        f"landing 재처리 완료 dt={run_date}: {total}건, {elapsed:.1f}초 "
+        f"(변경 없음 {writer.unchanged_count}건, 거부 {writer.rejected_count}건)"
+    )
+    return {
+        "success": True,
+        "processed_count": total,
+        "unchanged_count": writer.unchanged_count,
+        "rejected_count": writer.rejected_count,
+        "unknown_codes": unknown_codes,
+    }
@@ -8,14 +8,21 @@ import json
 
 Base = declarative_base()
 
+# geohash 는 바이트 순서로 비교해야 접두어 LIKE 가 B-tree 범위 검색이 된다 (SQLite 기본 BINARY 도 같은 순서)
+GEOHASH_TYPE = String(12).with_variant(String(12, collation='C'), 'postgresql')
+
 class Address(Base):
     __tablename__ = 'addresses'
-    __table_args__ = {'schema': 'realestate'}
+    __table_args__ = (
+        Index('idx_addresses_geohash', 'geohash'),
+        {'schema': 'realestate'}
+    )
     
     id = Column(Integer, primary_key=True)
     area_name = Column(String(100))
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
+    geohash = Column(GEOHASH_TYPE)  # alter.geohash 9자리, 좌표와 함께 갱신
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
     updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'), onupdate=text('CURRENT_TIMESTAMP'))
     
@@ -78,7 +85,12 @@ class CrimeStats(Base):
 
 class PropertyLocation(Base):
     __tablename__ = 'property_locations'
-    __table_args__ = {'schema': 'realestate'}
+    __table_args__ = (
+        Index('idx_property_locations_sigungu', 'sigungu'),
+        Index('idx_property_locations_geohash', 'geohash'),
+        Index('idx_property_locations_lat_lon', 'latitude', 'longitude'),
+        {'schema': 'realestate'}
+    )
     
     property_id = Column(Integer, primary_key=True)
     sido = Column(String(20), nullable=False)
@@ -88,6 +100,7 @@ class PropertyLocation(Base):
     jibun_sub = Column(String(20))
     latitude = Column(Float)
     longitude = Column(Float)
+    geohash = Column(GEOHASH_TYPE)  # alter.geohash 9자리, 좌표와 함께 갱신
     
     property = relationship("PropertyInfo", back_populates="location", uselist=False)
     distances = relationship("LocationDistance", back_populates="property_location")
@@ -95,6 +108,7 @@ class PropertyLocation(Base):
 class JSONType(TypeDecorator):
     """JSON 타입을 처리하는 커스텀 타입"""
     impl = String
+    cache_ok = True
     
     def process_bind_param(self, value, dialect):
         if value is not None:
@@ -115,7 +129,16 @@ class JSONType(TypeDecorator):
 
 class PropertyInfo(Base):
     __tablename__ = 'property_info'
-    __table_args__ = {'schema': 'realestate'}
+    __table_args__ = (
+        # 게시 중인 매물만 대상으로 하는 부분 인덱스 (조회 쿼리는 항상 is_active 조건 포함)
+        Index('idx_property_info_active', 'property_id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+        Index('idx_property_info_active_type', 'property_type',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+        Index('idx_property_info_active_last_seen', 'last_seen',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+        {'schema': 'realestate'}
+    )
     
     id = Column(Integer, primary_key=True)
     property_id = Column(Integer, ForeignKey('realestate.property_locations.property_id'), unique=True, nullable=False)
@@ -149,6 +172,7 @@ class PropertyInfo(Base):
     inactive_reason = Column(String(200))
     first_seen = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     last_seen = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    content_hash = Column(String(64))  # 정규화된 매물 데이터의 sha256 (변경 감지용)
     
     location = relationship("PropertyLocation", back_populates="property")
     rentals = relationship("Rental", back_populates="property", uselist=False)
@@ -189,7 +213,110 @@ class LocationDistance(Base):
     property_id = Column(Integer, ForeignKey('realestate.property_locations.property_id'), nullable=False)
     address_id = Column(Integer, ForeignKey('realestate.addresses.id'), nullable=False)
     distance = Column(Float, nullable=False)  # 미터 단위
+    radius_tier = Column(Integer, nullable=False, server_default=text('1000'))  # 계산에 사용한 주소 반경 (미터)
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
     
     property_location = relationship("PropertyLocation", back_populates="distances")
-    address = relationship("Address", back_populates="distances")
\ No newline at end of file
+    address = relationship("Address", back_populates="distances")
+class ImportReject(Base):
+    """변환/저장에 실패한 매물 원본 기록"""
+    __tablename__ = 'import_rejects'
+    __table_args__ = (
+        Index('idx_import_rejects_property', 'property_id'),
+        {'schema': 'realestate'}
+    )
+
+    id = Column(Integer, primary_key=True)
+    property_id = Column(Integer)
+    stage = Column(String(20), nullable=False)  # transform | write
+    error = Column(Text)
+    payload = Column(JSON)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+class DistanceRefreshQueue(Base):
+    """신규/변경 매물의 거리 재계산 대기열"""
+    __tablename__ = 'distance_refresh_queue'
+    __table_args__ = {'schema': 'realestate'}
+
+    property_id = Column(Integer, primary_key=True)
+    queued_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+class ImportCheckpoint(Base):
+    """일별 매물 수집의 구역/페이지 진행 상황 (재시도 시 이어서 수집)"""
+    __tablename__ = 'import_checkpoints'
+    __table_args__ = {'schema': 'realestate'}
+
+    run_date = Column(Date, primary_key=True)
+    district = Column(String(50), primary_key=True)
+    last_page = Column(Integer, nullable=False, default=0)  # 상세까지 저장이 끝난 마지막 목록 페이지
+    completed = Column(Boolean, nullable=False, default=False)
+    started_at = Column(TIMESTAMP(timezone=True), nullable=False)  # 구역 첫 수집 시작 시각 (비활성화 기준)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+class ImportCheckpointArticle(Base):
+    """일별 매물 수집에서 상세 정보까지 저장된 매물 ID"""
+    __tablename__ = 'import_checkpoint_articles'
+    __table_args__ = {'schema': 'realestate'}
+
+    run_date = Column(Date, primary_key=True)
+    property_id = Column(Integer, primary_key=True)
+    loaded_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+class ImportRunStat(Base):
+    """수집 작업의 단계별 처리 통계 (실행/구역/단계 단위)"""
+    __tablename__ = 'import_run_stats'
+    __table_args__ = (
+        Index('idx_import_run_stats_importer_run', 'importer', 'started_at'),
+        {'schema': 'realestate'}
+    )
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(String(250), nullable=False)  # Airflow run_id (동적 매핑된 task 는 같은 run_id 공유)
+    importer = Column(String(50), nullable=False)  # real_estate | crime_stats | cultural_facilities | ...
+    district = Column(String(50), nullable=False, default='')  # 구역 구분이 없는 단계는 빈 문자열
+    stage = Column(String(30), nullable=False)  # fetch_list | fetch_detail | transform | write | read | total
+    item_count = Column(Integer, nullable=False, default=0)
+    byte_count = Column(BigInteger, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Float, nullable=False, default=0)
+    started_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+class DistanceSnapshot(Base):
+    """거리 계산에 사용한 매물/주소 좌표 (다음 실행에서 신규/이동/삭제 판별)"""
+    __tablename__ = 'distance_snapshots'
+    __table_args__ = {'schema': 'realestate'}
+
+    kind = Column(String(10), primary_key=True)  # property | address
+    entity_id = Column(BigInteger, primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    radius = Column(Integer)  # 주소의 거리 계산 반경 (미터, 매물은 NULL, 반경 설정 전 행은 1000 으로 간주)
+    computed_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+
+class PropertyPoiFeature(Base):
+    """매물별 카테고리 최근접 POI/반경 내 POI 수 (calculate_distances 가 증분 갱신)"""
+    __tablename__ = 'property_poi_features'
+    __table_args__ = (
+        Index('idx_property_poi_features_subway', 'nearest_subway_distance'),
+        {'schema': 'realestate'}
+    )
+
+    property_id = Column(BigInteger, primary_key=True)
+    nearest_subway_address_id = Column(Integer)
+    nearest_subway_name = Column(String(255))
+    nearest_subway_distance = Column(Float)  # 미터 단위
+    subway_count_500m = Column(Integer, nullable=False, default=0)
+    subway_count_1km = Column(Integer, nullable=False, default=0)
+    nearest_cultural_facility_address_id = Column(Integer)
+    nearest_cultural_facility_name = Column(String(255))
+    nearest_cultural_facility_distance = Column(Float)
+    cultural_facility_count_500m = Column(Integer, nullable=False, default=0)
+    cultural_facility_count_1km = Column(Integer, nullable=False, default=0)
+    nearest_festival_address_id = Column(Integer)
+    nearest_festival_name = Column(String(255))
+    nearest_festival_distance = Column(Float)
+    festival_count_500m = Column(Integer, nullable=False, default=0)
+    festival_count_1km = Column(Integer, nullable=False, default=0)
+    poi_version = Column(String(32), nullable=False)  # 계산에 사용한 POI 목록 해시 (바뀌면 전체 매물 갱신)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
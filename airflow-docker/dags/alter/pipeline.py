@@ -0,0 +1,182 @@
+import asyncio
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from alter.property_writer import PropertyBulkWriter, transform_items
+from .enums import unknown_code_report
+from alter.utils import main_logger as logger
+
+_STOP = object()
+
+
+class PipelineStats:
+    """단계별 처리량과 대기열 상태 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.fetched_items = 0
+        self.written_items = 0
+        self.written_batches = 0
+        self.write_seconds = 0.0
+        self.put_wait_seconds = 0.0   # 대기열이 가득 차서 수집 단계가 기다린 시간 (저장 단계가 병목)
+        self.get_wait_seconds = 0.0   # 대기열이 비어 저장 단계가 기다린 시간 (수집 단계가 병목)
+        self.max_queue_depth = 0
+        self._depth_sum = 0
+        self._depth_samples = 0
+
+    def record_put(self, items: int, waited: float, depth: int):
+        with self._lock:
+            self.fetched_items += items
+            self.put_wait_seconds += waited
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self._depth_sum += depth
+            self._depth_samples += 1
+
+    def record_write(self, items: int, waited: float, elapsed: float):
+        with self._lock:
+            self.written_items += items
+            self.written_batches += 1
+            self.get_wait_seconds += waited
+            self.write_seconds += elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = max(time.perf_counter() - self.started_at, 1e-9)
+            return {
+                'elapsed_seconds': round(elapsed, 2),
+                'fetched_items': self.fetched_items,
+                'written_items': self.written_items,
+                'written_batches': self.written_batches,
+                'fetch_rate': round(self.fetched_items / elapsed, 1),
+                'write_rate': round(self.written_items / max(self.write_seconds, 1e-9), 1),
+                'avg_queue_depth': round(self._depth_sum / max(self._depth_samples, 1), 2),
+                'max_queue_depth': self.max_queue_depth,
+                'producer_blocked_seconds': round(self.put_wait_seconds, 2),
+                'writer_idle_seconds': round(self.get_wait_seconds, 2),
+            }
+
+
+class ImportPipeline:
+    """
+    수집(async)과 저장(스레드)을 분리하는 생산자/소비자 파이프라인
+
+    이벤트 루프의 수집 코드는 submit() 으로 배치를 제한된 크기의 대기열에 넣고 바로
+    다음 요청을 보낸다. 대기열에는 원본 JSON 대신 변환된 ListingRecord 를 넣는다. 저장 스레드는 각자 세션을 가지고 대기열을 비우며 PropertyBulkWriter 로
+    upsert 한다. 대기열이 가득 차면 submit() 이 기다리므로 메모리 사용량이 제한된다.
+
+    사용 예:
+        pipeline = ImportPipeline(get_session, num_writers=2)
+        await pipeline.submit(items)
+        await pipeline.drain()   # 지금까지 넣은 배치가 모두 저장될 때까지 대기
+        pipeline.close()
+
+    on_written(session, property_ids) 가 주어지면 배치 저장이 끝난 뒤 저장 스레드의 세션으로 호출한다.
+    (체크포인트에 저장된 매물 ID 기록 등, 변환/저장에 실패한 매물 ID 포함)
+    """
+
+    def __init__(self, session_factory: Callable, num_writers: int = 2, max_queue_batches: int = 10,
+                 on_written: Optional[Callable] = None, run_stats=None):
+        self.session_factory = session_factory
+        self.on_written = on_written
+        self.run_stats = run_stats  # RunStatsRecorder (구역별 transform/write 단계 통계)
+        self.num_writers = num_writers
+        self.queue = queue.Queue(maxsize=max_queue_batches)
+        self.stats = PipelineStats()
+        self.writers: List[PropertyBulkWriter] = []
+        self._threads = [
+            threading.Thread(target=self._writer_loop, name=f'import-writer-{i}', daemon=True)
+            for i in range(num_writers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _writer_loop(self):
+        session = self.session_factory()
+        writer = PropertyBulkWriter(session)
+        self.writers.append(writer)
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                batch = self.queue.get()
+                waited = time.perf_counter() - wait_start
+                if batch is _STOP:
+                    self.queue.task_done()
+                    break
+
+                district, records, rejects = batch
+                write_start = time.perf_counter()
+                rejected_before = writer.rejected_count
+                written = write_errors = 0
+                try:
+                    written = writer.write_records(records, rejects)
+                    write_errors = max(writer.rejected_count - rejected_before - len(rejects), 0)
+                    if self.on_written:
+                        self.on_written(session, [record.property_id for record in records]
+                                        + [reject['property_id'] for reject in rejects])
+                except Exception as e:
+                    logger.error(f"저장 스레드 배치 처리 중 오류 발생 ({len(records)}건): {str(e)}")
+                    session.rollback()
+                    written = 0
+                    write_errors = len(records)
+                finally:
+                    # drain() 이 반환되기 전에 통계가 반영되도록 task_done 은 마지막에 호출
+                    elapsed = time.perf_counter() - write_start
+                    self.stats.record_write(written, waited, elapsed)
+                    if self.run_stats:
+                        self.run_stats.add('write', district, items=written, errors=write_errors, seconds=elapsed)
+                    self.queue.task_done()
+        finally:
+            session.close()
+
+    async def submit(self, items: List[dict], district: Optional[str] = None):
+        """
+        상세 item 배치를 변환하여 대기열에 넣음 (가득 차 있으면 이벤트 루프를 막지 않고 대기)
+
+        변환 실패 매물은 거부 목록으로 함께 넘겨 저장 스레드가 import_rejects 에 기록한다.
+        """
+        if not items:
+            return
+        transform_start = time.perf_counter()
+        records, rejects = transform_items(items)
+        if self.run_stats:
+            self.run_stats.add('transform', district, items=len(records), errors=len(rejects),
+                               seconds=time.perf_counter() - transform_start)
+        batch = (district, records, rejects)
+        loop = asyncio.get_running_loop()
+        wait_start = time.perf_counter()
+        try:
+            self.queue.put_nowait(batch)
+        except queue.Full:
+            await loop.run_in_executor(None, self.queue.put, batch)
+        self.stats.record_put(len(items), time.perf_counter() - wait_start, self.queue.qsize())
+
+    async def drain(self):
+        """지금까지 넣은 배치가 모두 저장될 때까지 대기"""
+        await asyncio.get_running_loop().run_in_executor(None, self.queue.join)
+
+    def close(self) -> dict:
+        """저장 스레드를 종료하고 최종 통계를 반환"""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        stats = self.stats.snapshot()
+        stats['rejected_items'] = sum(writer.rejected_count for writer in self.writers)
+        stats['unchanged_items'] = sum(writer.unchanged_count for writer in self.writers)
+        stats['unknown_codes'] = unknown_code_report()
+        self.log_stats(stats)
+        if stats['unknown_codes']:
+            logger.warning(f"알 수 없는 코드: {stats['unknown_codes']}")
+        return stats
+
+    def log_stats(self, stats: dict = None):
+        stats = stats or self.stats.snapshot()
+        logger.info(
+            f"파이프라인 통계: 수집 {stats['fetched_items']}건 ({stats['fetch_rate']}/s), "
+            f"저장 {stats['written_items']}건 ({stats['write_rate']}/s, 스레드 {self.num_writers}개), "
+            f"대기열 평균 {stats['avg_queue_depth']} / 최대 {stats['max_queue_depth']}, "
+            f"수집 대기 {stats['producer_blocked_seconds']}초, 저장 유휴 {stats['writer_idle_seconds']}초"
+        )
@@ -0,0 +1,172 @@
+"""
+매물별 POI 요약 피처 (property_poi_features)
+
+카테고리(지하철역, 문화시설, 문화축제)마다 가장 가까운 POI 와 반경 500m/1km 안의 POI 수를
+매물 한 행에 모아 둔다. 서비스 쿼리는 location_distances 를 매번 JOIN/집계하지 않고
+property_id 로 한 행만 조회하면 된다.
+
+POI 좌표는 카테고리별로 메모리의 AddressIndex 로 만들고 (최근접은 반경 제한 없음),
+calculate_distances 가 매물 배치마다 신규/이동 매물과 POI 목록이 바뀐 뒤 아직 갱신되지 않은 매물만 다시 계산한다.
+POI 목록이 바뀌었는지는 카테고리 목록 전체의 해시(poi_version)로 판단한다.
+"""
+import hashlib
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import delete, func, select, text
+
+from alter.models import PropertyPoiFeature
+from alter.property_writer import dialect_insert
+from alter.spatial_index import EARTH_RADIUS, AddressIndex, CoordinateArrays, prepare_points
+from alter.utils import main_logger as logger
+
+# 반경 내 POI 수를 세는 거리 (미터): {접미어: 반경}
+COUNT_RADII = {'500m': 500, '1km': 1000}
+
+# 카테고리별 POI 좌표 (주소 id, 위도, 경도, POI 수, 대표 이름). 같은 주소의 POI 는 한 점으로 묶는다.
+POI_CATEGORY_SQL = {
+    # 지하철역은 호선별로 행이 나뉘므로 주소(역) 하나를 1개로 센다
+    'subway': """
+        SELECT a.id, a.latitude, a.longitude, 1, MIN(a.area_name)
+        FROM realestate.subway_stations s
+        JOIN realestate.addresses a ON a.id = s.address_id
+        WHERE a.latitude IS NOT NULL AND a.longitude IS NOT NULL
+        GROUP BY a.id, a.latitude, a.longitude
+    """,
+    'cultural_facility': """
+        SELECT a.id, a.latitude, a.longitude, COUNT(*), MIN(f.facility_name)
+        FROM realestate.cultural_facilities f
+        JOIN realestate.addresses a ON a.id = f.address_id
+        WHERE a.latitude IS NOT NULL AND a.longitude IS NOT NULL
+        GROUP BY a.id, a.latitude, a.longitude
+    """,
+    'festival': """
+        SELECT a.id, a.latitude, a.longitude, COUNT(*), MIN(f.festival_name)
+        FROM realestate.cultural_festivals f
+        JOIN realestate.addresses a ON a.id = f.address_id
+        WHERE a.latitude IS NOT NULL AND a.longitude IS NOT NULL
+        GROUP BY a.id, a.latitude, a.longitude
+    """,
+}
+
+
+class PoiCategory:
+    """한 카테고리의 POI 인덱스와 주소별 POI 수/이름"""
+
+    def __init__(self, name: str, rows: List[tuple], earth_radius: float = EARTH_RADIUS):
+        self.name = name
+        points = prepare_points([(row[0], row[1], row[2]) for row in rows])
+        self.index = AddressIndex(points, earth_radius, workers=1) if len(points) else None
+        self.names = {int(row[0]): row[4] for row in rows}
+        # 인덱스 좌표 순서(위도순)와 무관하게 찾을 수 있도록 주소 id 정렬 배열로 POI 수를 보관
+        weights = {int(row[0]): int(row[3]) for row in rows}
+        self.sorted_ids = np.array(sorted(weights), dtype=np.int64)
+        self.sorted_weights = np.array([weights[i] for i in self.sorted_ids.tolist()], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.index) if self.index is not None else 0
+
+    def weights_of(self, address_ids: np.ndarray) -> np.ndarray:
+        return self.sorted_weights[np.searchsorted(self.sorted_ids, address_ids)]
+
+    def features(self, origins: CoordinateArrays) -> Dict[str, list]:
+        """origins 순서의 피처 컬럼 {컬럼명: 값 목록}"""
+        size = len(origins)
+        columns = {
+            f'nearest_{self.name}_address_id': [None] * size,
+            f'nearest_{self.name}_name': [None] * size,
+            f'nearest_{self.name}_distance': [None] * size,
+        }
+        for suffix in COUNT_RADII:
+            columns[f'{self.name}_count_{suffix}'] = [0] * size
+        if self.index is None or not size:
+            return columns
+
+        nearest_ids, nearest_distances = self.index.nearest(origins)
+        columns[f'nearest_{self.name}_address_id'] = nearest_ids.tolist()
+        columns[f'nearest_{self.name}_name'] = [self.names.get(i) for i in nearest_ids.tolist()]
+        columns[f'nearest_{self.name}_distance'] = nearest_distances.tolist()
+
+        origin_ids, address_ids, distances = self.index.query_radius(origins, max(COUNT_RADII.values()))
+        if len(distances):
+            order = np.argsort(origins.ids, kind='stable')
+            positions = order[np.searchsorted(origins.ids[order], origin_ids)]
+            weights = self.weights_of(address_ids)
+            for suffix, radius in COUNT_RADII.items():
+                within = distances <= radius
+                columns[f'{self.name}_count_{suffix}'] = np.bincount(
+                    positions[within], weights=weights[within], minlength=size
+                ).astype(np.int64).tolist()
+        return columns
+
+
+class PoiFeatureBuilder:
+    """
+    POI 피처 계산/저장
+
+    생성 시 카테고리별 POI 를 읽어 인덱스를 만들고, refresh() 로 받은 매물 행의 피처를 upsert 한다.
+    """
+
+    def __init__(self, session, earth_radius: float = EARTH_RADIUS):
+        self.session = session
+        self.categories = []
+        digest = hashlib.md5()
+        for name, sql in POI_CATEGORY_SQL.items():
+            rows = sorted(tuple(row) for row in session.execute(text(sql)).fetchall())
+            digest.update(f"{name}:{rows!r};".encode('utf-8'))
+            self.categories.append(PoiCategory(name, rows, earth_radius))
+        self.version = digest.hexdigest()
+        logger.info(
+            "POI 피처 인덱스 생성: "
+            + ", ".join(f"{category.name} {len(category)}개" for category in self.categories)
+            + f" (poi_version {self.version[:8]})"
+        )
+
+    def fresh_property_ids(self) -> Set[int]:
+        """현재 POI 목록으로 이미 계산된 매물 id (POI 가 바뀌지 않았다면 좌표가 같은 매물은 다시 계산할 필요 없음)"""
+        features = PropertyPoiFeature.__table__
+        return {int(property_id) for property_id in self.session.execute(
+            select(features.c.property_id).where(features.c.poi_version == self.version)
+        ).scalars()}
+
+    def compute(self, rows: List[tuple]) -> List[dict]:
+        """(매물 id, 위도, 경도) 목록 → property_poi_features 행 목록"""
+        origins = prepare_points(rows)
+        records = [{'property_id': property_id, 'poi_version': self.version}
+                   for property_id in origins.ids.tolist()]
+        for category in self.categories:
+            for column, values in category.features(origins).items():
+                for record, value in zip(records, values):
+                    record[column] = value
+        return records
+
+    def refresh(self, rows: List[tuple], chunk_size: int = 5000) -> int:
+        """매물 행의 피처를 계산해 upsert 하고 저장한 행 수 반환"""
+        if not rows:
+            return 0
+        records = self.compute(rows)
+        stmt = dialect_insert(self.session, PropertyPoiFeature)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['property_id'],
+            set_={**{column: stmt.excluded[column] for column in records[0] if column != 'property_id'},
+                  'updated_at': func.now()},
+        )
+        for i in range(0, len(records), chunk_size):
+            self.session.execute(stmt, records[i:i + chunk_size])
+        self.session.commit()
+        return len(records)
+
+    def delete(self, property_ids: Optional[List[int]] = None, chunk_size: int = 5000) -> int:
+        """매물 피처 삭제 (property_ids 가 없으면 전체)"""
+        features = PropertyPoiFeature.__table__
+        if property_ids is None:
+            deleted = self.session.execute(delete(features)).rowcount
+        else:
+            deleted = 0
+            property_ids = list(property_ids)
+            for i in range(0, len(property_ids), chunk_size):
+                deleted += self.session.execute(
+                    delete(features).where(features.c.property_id.in_(property_ids[i:i + chunk_size]))
+                ).rowcount
+        self.session.commit()
+        return deleted
@@ -0,0 +1,540 @@
+import hashlib
+import json
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, null, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from alter import geohash
+from alter.models import (
+    PropertyLocation, PropertyInfo, Sale, Rental, ImportReject, DistanceRefreshQueue
+)
+from alter.utils import main_logger as logger
+from .enums import (
+    NaverSubCategory, HeatingType, CoolingType, MoveInType, LivingFacilityType,
+    FacilityType, SecurityType, DirectionType, BuildingUseType, PropertyType,
+    LoanAvailability, TransactionType, decoder_for
+)
+
+MAX_PRICE = 999999999999
+
+# 코드 → 이름 변환표 (모듈 로드 시 한 번 생성)
+PROPERTY_TYPES = decoder_for(PropertyType)
+SUB_CATEGORIES = decoder_for(NaverSubCategory)
+HEATING_TYPES = decoder_for(HeatingType)
+DIRECTIONS = decoder_for(DirectionType)
+BUILDING_USES = decoder_for(BuildingUseType)
+MOVE_IN_TYPES = decoder_for(MoveInType)
+LOAN_TYPES = decoder_for(LoanAvailability)
+TRANSACTION_TYPES = decoder_for(TransactionType)
+COOLING_TYPES = decoder_for(CoolingType)
+LIVING_FACILITIES = decoder_for(LivingFacilityType)
+SECURITY_TYPES = decoder_for(SecurityType)
+FACILITY_TYPES = decoder_for(FacilityType)
+
+
+
+def dialect_insert(session, model):
+    """세션의 DB에 맞는 INSERT 구문 (on_conflict_* 사용을 위해 PostgreSQL/SQLite 전용)"""
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return pg_insert(model.__table__)
+    if dialect == 'sqlite':
+        return sqlite_insert(model.__table__)
+    raise NotImplementedError(f"지원하지 않는 DB입니다: {dialect}")
+
+
+def latest_of(session, column, value):
+    """column 과 value 중 늦은 시각 (column 이 NULL 이면 value). PostgreSQL 은 GREATEST, SQLite 는 MAX"""
+    greatest = func.greatest if session.get_bind().dialect.name == 'postgresql' else func.max
+    return greatest(func.coalesce(column, value), value)
+
+
+def earliest_of(session, column, value):
+    """column 과 value 중 이른 시각 (column 이 NULL 이면 value). PostgreSQL 은 LEAST, SQLite 는 MIN"""
+    least = func.least if session.get_bind().dialect.name == 'postgresql' else func.min
+    return least(func.coalesce(column, value), value)
+
+
+def process_facilities(facilities_data, facility_type_enum):
+    """시설 코드 목록(JSON 문자열 또는 리스트)을 enum 이름 리스트로 변환 (알 수 없는 코드는 제외)"""
+    return decoder_for(facility_type_enum).decode_list(facilities_data)
+
+
+def process_photos(photos_data):
+    if not photos_data:
+        return {}
+    try:
+        if isinstance(photos_data, str):
+            return json.loads(photos_data)
+        return photos_data
+    except:
+        return {}
+
+
+def _cap_price(property_id, value, label):
+    if value >= 1000000000000:
+        logger.warning(f"매물 {property_id}의 {label}이 너무 높습니다: {value}")
+        return MAX_PRICE
+    return value
+
+
+class ListingRecord(NamedTuple):
+    """
+    정규화된 매물 한 건 (변환 결과)
+
+    테이블별 dict 4개 대신 하나의 튜플로 보관하여 수집~저장 사이 대기열의 메모리를 줄이고,
+    저장 시에는 *_row() 로 INSERT 파라미터만 만든다 (ORM 객체를 만들지 않음).
+    """
+    property_id: int
+    # property_locations
+    sido: str
+    sigungu: str
+    dong: str
+    jibun_main: str
+    jibun_sub: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    # property_info
+    property_type: str
+    property_subtype: str
+    building_name: str
+    detail_address: str
+    construction_date: str
+    total_area: Optional[float]
+    exclusive_area: Optional[float]
+    land_area: Optional[float]
+    on_floor: Optional[int]
+    under_floor: Optional[int]
+    room_count: Optional[int]
+    bathroom_count: Optional[int]
+    parking_count: Optional[int]
+    heating_type: str
+    direction: str
+    purpose_type: str
+    current_usage: str
+    recommended_usage: str
+    facilities: dict
+    description: str
+    photos: dict
+    move_in_type: str
+    move_in_date: str
+    loan_availability: str
+    negotiable: str
+    # sales (is_sale) / rentals
+    is_sale: bool
+    price: Optional[int]
+    end_date: Optional[str]
+    transaction_date: Optional[str]
+    rental_type: Optional[str]
+    deposit: Optional[int]
+    monthly_rent: Optional[int]
+    # 적재 정보
+    seen_at: Optional[datetime] = None
+    content_hash: str = ''
+
+    def location_row(self) -> dict:
+        row = dict(zip(LOCATION_COLUMNS, _location_values(self)))
+        row['geohash'] = geohash.encode(self.latitude, self.longitude)
+        return row
+
+    def info_row(self) -> dict:
+        row = dict(zip(INFO_COLUMNS, _info_values(self)))
+        row.update(
+            update_count=0, is_active=True, inactive_reason=None,
+            first_seen=self.seen_at, last_seen=self.seen_at, content_hash=self.content_hash,
+        )
+        return row
+
+    def sale_row(self) -> Optional[dict]:
+        return dict(zip(SALE_COLUMNS, _sale_values(self))) if self.is_sale else None
+
+    def rental_row(self) -> Optional[dict]:
+        return None if self.is_sale else dict(zip(RENTAL_COLUMNS, _rental_values(self)))
+
+    def as_rows(self) -> Dict[str, Optional[dict]]:
+        """테이블별 행 {'location', 'info', 'sale', 'rental'} (거부 기록/디버깅용)"""
+        return {'location': self.location_row(), 'info': self.info_row(),
+                'sale': self.sale_row(), 'rental': self.rental_row()}
+
+
+LOCATION_COLUMNS = ('property_id', 'sido', 'sigungu', 'dong', 'jibun_main', 'jibun_sub', 'latitude', 'longitude')
+INFO_COLUMNS = (
+    'property_id', 'property_type', 'property_subtype', 'building_name', 'detail_address', 'construction_date',
+    'total_area', 'exclusive_area', 'land_area', 'on_floor', 'under_floor', 'room_count', 'bathroom_count',
+    'parking_count', 'heating_type', 'direction', 'purpose_type', 'current_usage', 'recommended_usage',
+    'facilities', 'description', 'photos', 'move_in_type', 'move_in_date', 'loan_availability', 'negotiable',
+)
+SALE_COLUMNS = ('property_id', 'price', 'end_date', 'transaction_date')
+RENTAL_COLUMNS = ('property_id', 'rental_type', 'deposit', 'monthly_rent')
+
+_location_values = attrgetter(*LOCATION_COLUMNS)
+_info_values = attrgetter(*INFO_COLUMNS)
+_sale_values = attrgetter(*SALE_COLUMNS)
+_rental_values = attrgetter(*RENTAL_COLUMNS)
+
+
+def transform_listing(item: dict, now: datetime) -> ListingRecord:
+    """
+    상세 API 응답(item)을 ListingRecord 로 변환
+
+    Raises:
+        ValueError: 알 수 없는 코드 값 등 변환할 수 없는 매물
+    """
+    property_id = item.get('seq')
+    if not property_id:
+        raise ValueError("seq 누락")
+
+    legal_dong = item.get('legalDong', {}) or {}
+    center = item.get('center', {}).get('coordinates', []) if item.get('center') else []
+
+    trade_type = item.get('tradeTypeCode')
+    is_sale = trade_type == '30051A1'  # 매매, 그 외는 임대
+    price1 = int(item.get('price1', 0) or 0) * 10000
+
+    record = ListingRecord(
+        property_id=property_id,
+        sido=legal_dong.get('sidoName', ''),
+        sigungu=legal_dong.get('gugunName', ''),
+        dong=legal_dong.get('dongName', ''),
+        jibun_main=item.get('jibunMainNumber', ''),
+        jibun_sub=item.get('jibunSubNumber', ''),
+        latitude=center[1] if len(center) > 1 else None,
+        longitude=center[0] if len(center) > 0 else None,
+        property_type=PROPERTY_TYPES.decode(item.get('categoryCode')),
+        property_subtype=SUB_CATEGORIES.decode(item.get('subCategoryCode')),
+        building_name=item.get('buildingName', ''),
+        detail_address=item.get('detailAddress', ''),
+        construction_date=item.get('useApproveDay', ''),
+        total_area=item.get('space1'),
+        exclusive_area=item.get('space2'),
+        land_area=item.get('space3'),
+        on_floor=item.get('onFloorCount'),
+        under_floor=item.get('underFloorCount'),
+        room_count=item.get('room'),
+        bathroom_count=item.get('restroom'),
+        parking_count=item.get('parkingCount'),
+        heating_type=HEATING_TYPES.decode(item.get('heatTypeCode')),
+        direction=DIRECTIONS.decode(item.get('directionCode')),
+        purpose_type=BUILDING_USES.decode(item.get('lawUsageCode')),
+        current_usage=item.get('currentUsage', ''),
+        recommended_usage=item.get('recommendUsage', ''),
+        facilities={
+            'cooling': COOLING_TYPES.decode_list(item.get('facilitiesAircon', '')),
+            'living': LIVING_FACILITIES.decode_list(item.get('facilitiesLife', '')),
+            'security': SECURITY_TYPES.decode_list(item.get('facilitiesSecurity', '')),
+            'etc': FACILITY_TYPES.decode_list(item.get('facilitiesEtc', ''))
+        },
+        description=item.get('description', ''),
+        photos=process_photos(item.get('photoList')),
+        move_in_type=MOVE_IN_TYPES.decode(item.get('moveInTypeCode')),
+        move_in_date=item.get('moveInDate', ''),
+        loan_availability=LOAN_TYPES.decode(item.get('loanCode')),
+        negotiable=(item.get('negotiationFlagCode') or 'N')[-1],
+        is_sale=is_sale,
+        price=_cap_price(property_id, price1, '가격') if is_sale else None,
+        end_date=item.get('endDate') if is_sale else None,
+        transaction_date=item.get('transactionDate') if is_sale else None,
+        rental_type=None if is_sale else TRANSACTION_TYPES.decode(trade_type, required=True),
+        deposit=None if is_sale else _cap_price(property_id, price1, '보증금'),
+        monthly_rent=None if is_sale else _cap_price(
+            property_id, int(item.get('price2', 0) or 0) * 10000, '월세'),
+        seen_at=now,
+    )
+    return record._replace(content_hash=listing_fingerprint(record))
+
+
+def listing_fingerprint(record: ListingRecord) -> str:
+    """
+    변환된 매물의 내용 해시(sha256)
+
+    원본 JSON 대신 정규화된 행으로 계산하므로 API 응답의 키 순서나
+    저장하지 않는 필드가 바뀌어도 해시는 그대로 유지된다.
+    """
+    normalized = {
+        'location': dict(zip(LOCATION_COLUMNS, _location_values(record))),  # geohash 는 좌표에서 파생되므로 제외
+        'info': dict(zip(INFO_COLUMNS, _info_values(record))),  # 적재 시점/수명주기 컬럼은 제외
+        'sale': record.sale_row(),
+        'rental': record.rental_row(),
+    }
+    encoded = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def make_reject(payload, stage: str, error: Exception) -> dict:
+    """import_rejects 행 (payload 는 원본 item 또는 ListingRecord)"""
+    if isinstance(payload, ListingRecord):
+        property_id = payload.property_id
+        payload = payload.as_rows()
+    else:
+        property_id = payload.get('seq')
+    logger.error(f"매물 {property_id} 처리 중 오류 발생 ({stage}): {str(error)}")
+    return {
+        'property_id': property_id,
+        'stage': stage,
+        'error': str(error)[:2000],
+        'payload': json.loads(json.dumps(payload, ensure_ascii=False, default=str)),
+    }
+
+
+def transform_items(items: Iterable[dict], now: Optional[datetime] = None) -> Tuple[List[ListingRecord], List[dict]]:
+    """
+    상세 item 목록 변환. (변환된 매물, 거부 목록)을 반환하며 같은 매물은 마지막 값만 사용
+
+    수집 단계에서 바로 호출하면 원본 JSON 을 대기열에 쌓아두지 않아도 된다.
+    """
+    now = now or datetime.now()
+    records = {}
+    rejects = []
+    for item in items:
+        try:
+            record = transform_listing(item, now)
+            records[record.property_id] = record
+        except Exception as e:
+            rejects.append(make_reject(item, 'transform', e))
+    return list(records.values()), rejects
+
+
+class PropertyBulkWriter:
+    """
+    매물 배치를 집합 단위로 저장하는 클래스
+
+    배치 전체를 파이썬에서 행으로 변환한 뒤 테이블마다 한 번의
+    INSERT ... ON CONFLICT DO UPDATE 로 저장한다 (매물당 ~12회 → 배치당 ~7회 왕복).
+    내용 해시가 이전과 같은 매물은 last_seen 만 갱신하고, 신규/변경 매물만 저장한 뒤
+    distance_refresh_queue 에 넣어 거리 재계산 대상으로 표시한다.
+    배치 저장이 실패하면 매물 단위 savepoint 로 다시 시도하고, 변환/저장에 실패한 매물은
+    import_rejects 테이블에 원본과 함께 기록한다.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.rejected_count = 0
+        self.unchanged_count = 0
+        self.written_count = 0
+
+    def _insert(self, model):
+        return dialect_insert(self.session, model)
+
+    def _upsert(self, model, rows: List[dict], conflict_column='property_id',
+                keep_columns=(), set_overrides=None):
+        """
+        충돌 컬럼 기준 다건 upsert (행이 없으면 생략)
+
+        keep_columns 는 기존 값을 유지할 컬럼, set_overrides 는 excluded 를 받아 갱신 시 사용할 식을 돌려주는 함수
+        """
+        if not rows:
+            return
+        stmt = self._insert(model)
+        set_ = {
+            column: stmt.excluded[column]
+            for column in rows[0] if column != conflict_column and column not in keep_columns
+        }
+        if set_overrides is not None:
+            set_.update(set_overrides(stmt.excluded))
+        stmt = stmt.on_conflict_do_update(index_elements=[conflict_column], set_=set_)
+        self.session.execute(stmt, rows)
+
+    def transform_batch(self, items: List[dict], now: Optional[datetime] = None) -> Tuple[List[ListingRecord], List[dict]]:
+        """배치 변환. (변환된 매물, 거부 목록)을 반환하며 같은 매물은 마지막 값만 사용"""
+        return transform_items(items, now)
+
+    def _skip_unchanged(self, records: List[ListingRecord], now: datetime) -> List[ListingRecord]:
+        """내용 해시가 같은 매물은 last_seen 만 갱신하고, 신규/변경 매물만 반환"""
+        property_ids = [record.property_id for record in records]
+        stored_hashes = dict(self.session.execute(
+            select(PropertyInfo.property_id, PropertyInfo.content_hash)
+            .where(PropertyInfo.property_id.in_(property_ids))
+        ).all())
+
+        changed = []
+        unchanged_ids = []
+        for record in records:
+            if stored_hashes.get(record.property_id) == record.content_hash:
+                unchanged_ids.append(record.property_id)
+            else:
+                changed.append(record)
+
+        if unchanged_ids:
+            info = PropertyInfo.__table__
+            self.session.execute(
+                update(info)
+                .where(info.c.property_id.in_(unchanged_ids))
+                .values(self._seen_values(now))
+            )
+        return changed
+
+    def _seen_values(self, seen_at) -> dict:
+        """
+        본 시각 갱신 식: first_seen 은 뒤로, last_seen 은 앞으로만 움직이고,
+        기존 last_seen 보다 새로 본 경우에만 다시 활성화
+
+        landing 재처리는 과거 수집 시각을 넘기므로 그 사이 비활성화되었거나 더 최근에 본 매물을 되돌리지 않는다.
+        seen_at 은 시각 값 또는 upsert 의 excluded.last_seen 이다.
+        """
+        info = PropertyInfo.__table__
+        newer = or_(info.c.last_seen.is_(None), info.c.last_seen < seen_at)
+        return {
+            'first_seen': earliest_of(self.session, info.c.first_seen, seen_at),
+            'last_seen': latest_of(self.session, info.c.last_seen, seen_at),
+            'is_active': case((newer, True), else_=info.c.is_active),
+            'inactive_reason': case((newer, null()), else_=info.c.inactive_reason),
+        }
+
+    def mark_seen(self, property_ids: List[int], now: Optional[datetime] = None) -> int:
+        """
+        목록 API에 노출된 매물의 last_seen 갱신
+
+        상세 조회가 실패한 매물이 비활성화 스윕에서 내려가지 않도록
+        목록 단계에서 먼저 본 것으로 표시한다.
+        """
+        if not property_ids:
+            return 0
+        info = PropertyInfo.__table__
+        result = self.session.execute(
+            update(info)
+            .where(info.c.property_id.in_(property_ids))
+            .values(last_seen=latest_of(self.session, info.c.last_seen, now or datetime.now()))
+        )
+        self.session.commit()
+        return result.rowcount
+
+    def deactivate_unseen(self, sigungu: str, seen_before: datetime,
+                          reason: str = '수집 목록에서 사라짐') -> int:
+        """
+        구역 수집이 끝난 뒤 이번 실행에서 보이지 않은 매물을 한 번의 UPDATE 로 비활성화
+
+        Args:
+            sigungu: 구 이름 (property_locations.sigungu)
+            seen_before: 구역 수집 시작 시각. last_seen 이 이보다 이전이면 미노출로 본다.
+        """
+        info = PropertyInfo.__table__
+        locations = PropertyLocation.__table__
+        result = self.session.execute(
+            update(info)
+            .where(info.c.is_active == True)  # noqa: E712
+            .where(info.c.last_seen < seen_before)
+            .where(info.c.property_id.in_(
+                select(locations.c.property_id).where(locations.c.sigungu == sigungu)
+            ))
+            .values(is_active=False, inactive_reason=reason)
+        )
+        self.session.commit()
+        return result.rowcount
+
+    def _queue_distance_refresh(self, property_ids: List[int]):
+        stmt = self._insert(DistanceRefreshQueue).on_conflict_do_nothing(index_elements=['property_id'])
+        self.session.execute(stmt, [{'property_id': property_id} for property_id in property_ids])
+
+    def _write_listings(self, records: List[ListingRecord]):
+        """변환된 매물을 테이블별로 한 번씩 저장"""
+        if not records:
+            return
+        property_ids = [record.property_id for record in records]
+        sales = [record.sale_row() for record in records if record.is_sale]
+        rentals = [record.rental_row() for record in records if not record.is_sale]
+
+        # 1. 거래 유형이 바뀐 매물의 반대쪽 거래 정보 삭제
+        # (거리 정보는 calculate_distances 가 좌표 스냅샷과 재계산 대기열을 보고 교체)
+        if rentals:
+            self.session.execute(
+                delete(Sale.__table__).where(Sale.property_id.in_([r['property_id'] for r in rentals]))
+            )
+        if sales:
+            self.session.execute(
+                delete(Rental.__table__).where(Rental.property_id.in_([s['property_id'] for s in sales]))
+            )
+
+        # 2. 부모 테이블부터 upsert
+        self._upsert(PropertyLocation, [record.location_row() for record in records])
+        # first_seen/last_seen/활성 상태는 _seen_values 규칙으로 갱신하고, 내용이 바뀔 때마다 update_count 증가
+        self._upsert(
+            PropertyInfo, [record.info_row() for record in records],
+            keep_columns=('update_count',),
+            set_overrides=lambda excluded: {
+                **self._seen_values(excluded.last_seen),
+                'update_count': func.coalesce(PropertyInfo.__table__.c.update_count, 0) + 1,
+            },
+        )
+        self._upsert(Sale, sales)
+        self._upsert(Rental, rentals)
+
+        # 3. 위치/내용이 바뀐 매물만 거리 재계산 대상으로 등록
+        self._queue_distance_refresh(property_ids)
+
+    def write_batch(self, items: List[dict], now: Optional[datetime] = None) -> int:
+        """
+        매물 배치 저장
+
+        Args:
+            items: 상세 API 응답의 item 목록
+            now: first_seen/last_seen 에 기록할 시각 (landing 재처리 시 수집 시각, 없으면 현재)
+
+        Returns:
+            처리된 매물 수 (변경이 없어 last_seen 만 갱신된 매물 포함)
+        """
+        records, rejects = self.transform_batch(items, now)
+        return self.write_records(records, rejects)
+
+    def write_records(self, records: List[ListingRecord], rejects: Optional[List[dict]] = None) -> int:
+        """
+        변환된 매물 저장 (transform_items 결과를 그대로 받음)
+
+        Returns:
+            처리된 매물 수 (변경이 없어 last_seen 만 갱신된 매물 포함)
+        """
+        rejects = list(rejects or [])
+        saved_count = 0
+
+        if records:
+            try:
+                changed = self._skip_unchanged(records, records[0].seen_at or datetime.now())
+                self._write_listings(changed)
+                self.session.commit()
+                saved_count = len(records)
+                self.unchanged_count += len(records) - len(changed)
+                self.written_count += len(changed)
+            except SQLAlchemyError as e:
+                self.session.rollback()
+                logger.warning(f"배치 저장 실패, 매물 단위로 재시도합니다 ({len(records)}건): {str(e)}")
+                saved_count, row_rejects = self._write_one_by_one(records)
+                rejects.extend(row_rejects)
+
+        self._save_rejects(rejects)
+        return saved_count
+
+    def _write_one_by_one(self, records: List[ListingRecord]) -> Tuple[int, List[dict]]:
+        """
+        매물 단위 savepoint 로 저장하여 실패한 매물만 골라냄
+
+        배치 경로와 같이 내용 해시가 같은 매물은 last_seen 만 갱신하고 다시 쓰지 않는다.
+        """
+        saved_count = 0
+        rejects = []
+        for record in records:
+            try:
+                with self.session.begin_nested():
+                    changed = self._skip_unchanged([record], record.seen_at or datetime.now())
+                    self._write_listings(changed)
+                saved_count += 1
+                self.unchanged_count += 1 - len(changed)
+                self.written_count += len(changed)
+            except SQLAlchemyError as e:
+                rejects.append(make_reject(record, 'write', e))
+        self.session.commit()
+        return saved_count, rejects
+
+    def _save_rejects(self, rejects: List[dict]):
+        if not rejects:
+            return
+        self.rejected_count += len(rejects)
+        try:
+            self.session.execute(insert(ImportReject.__table__), rejects)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"거부 매물 기록 실패 ({len(rejects)}건): {str(e)}")
@@ -0,0 +1,233 @@
+"""
+수집 작업 단계별 처리 통계
+
+각 수집 작업의 단계(목록/상세 수집, 변환, 저장 등)별 건수, 바이트, 소요 시간, 오류 수를
+구역 단위로 모아 import_run_stats 테이블에 기록한다.
+
+사용 예:
+    run_stats = RunStatsRecorder('subway_stations')
+    with run_stats.stage('read') as stage:
+        df = pd.read_csv(file_path)
+        stage.items = len(df)
+    run_stats.flush(session)
+
+실행 비교 (airflow 컨테이너의 dags 디렉토리에서):
+    python -m alter.run_stats --importer real_estate --runs 5
+    python -m alter.run_stats --importer real_estate --by-district
+"""
+import argparse
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Generator, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from alter.models import ImportRunStat
+from alter.utils import main_logger as logger
+
+
+class StageStats:
+    """한 (구역, 단계)의 누적 통계"""
+
+    __slots__ = ('items', 'bytes', 'errors', 'seconds', 'started_at', 'finished_at')
+
+    def __init__(self):
+        self.items = 0
+        self.bytes = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+
+class RunStatsRecorder:
+    """
+    수집 작업 한 번의 단계별 통계 수집기
+
+    같은 (구역, 단계)에 여러 번 기록하면 값이 누적된다 (페이지/배치마다 호출).
+    저장 스레드에서도 호출할 수 있도록 기록은 잠금으로 보호한다.
+    """
+
+    def __init__(self, importer: str, run_id: Optional[str] = None):
+        self.importer = importer
+        self.run_id = run_id or f"manual__{datetime.now().isoformat(timespec='seconds')}"
+        self._stages: Dict[Tuple[str, str], StageStats] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, district: Optional[str] = None, items: int = 0, byte_count: int = 0,
+            errors: int = 0, seconds: float = 0.0, started_at: Optional[datetime] = None):
+        """단계 통계 누적"""
+        now = datetime.now()
+        with self._lock:
+            stats = self._stages.setdefault((district or '', stage), StageStats())
+            stats.items += items
+            stats.bytes += byte_count
+            stats.errors += errors
+            stats.seconds += seconds
+            stats.started_at = min(stats.started_at or now, started_at or now)
+            stats.finished_at = now
+
+    @contextmanager
+    def stage(self, stage: str, district: Optional[str] = None) -> Generator[StageStats, Any, None]:
+        """
+        단계 시간 측정 컨텍스트 매니저 (timing_context 와 같은 방식)
+
+        블록 안에서 반환된 객체의 items/bytes/errors 를 채우면 소요 시간과 함께 누적된다.
+        블록에서 예외가 나면 오류 1건으로 기록하고 예외는 그대로 전달한다.
+        """
+        current = StageStats()
+        started_at = datetime.now()
+        start_time = time.perf_counter()
+        try:
+            yield current
+        except Exception:
+            current.errors += 1
+            raise
+        finally:
+            self.add(stage, district, current.items, current.bytes, current.errors,
+                     time.perf_counter() - start_time, started_at)
+
+    def rows(self):
+        with self._lock:
+            return [
+                {
+                    'run_id': self.run_id,
+                    'importer': self.importer,
+                    'district': district,
+                    'stage': stage,
+                    'item_count': stats.items,
+                    'byte_count': stats.bytes,
+                    'error_count': stats.errors,
+                    'duration_seconds': round(stats.seconds, 3),
+                    'started_at': stats.started_at,
+                    'finished_at': stats.finished_at,
+                }
+                for (district, stage), stats in self._stages.items()
+            ]
+
+    def flush(self, session) -> int:
+        """
+        누적된 통계를 import_run_stats 에 저장하고 비움
+
+        통계 저장 실패가 수집 작업을 실패시키지 않도록 오류는 로그만 남긴다.
+        """
+        rows = self.rows()
+        if not rows:
+            return 0
+        try:
+            session.execute(insert(ImportRunStat.__table__), rows)
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"수집 통계 저장 실패 ({self.importer}, {len(rows)}건): {str(e)}")
+            return 0
+
+        with self._lock:
+            self._stages.clear()
+        for row in rows:
+            seconds = row['duration_seconds']
+            rate = f", {row['item_count'] / seconds:.1f}건/s" if seconds else ''
+            logger.info(
+                f"[{self.importer}] {row['district'] or '-'} {row['stage']}: {row['item_count']}건, "
+                f"{row['byte_count'] / 1024:.0f}KB, 오류 {row['error_count']}건, {seconds:.2f}초{rate}"
+            )
+        return len(rows)
+
+
+def load_run_summary(session, importer: str, runs: int = 5, by_district: bool = False):
+    """
+    최근 실행별 단계 통계 집계
+
+    Returns:
+        [(run_id, 시작 시각, [{'district', 'stage', 'items', 'bytes', 'errors', 'seconds'}, ...]), ...]
+        최근 실행이 앞에 온다.
+    """
+    table = ImportRunStat.__table__
+    recent = session.execute(
+        select(table.c.run_id, func.min(table.c.started_at).label('started_at'))
+        .where(table.c.importer == importer)
+        .group_by(table.c.run_id)
+        .order_by(func.min(table.c.started_at).desc())
+        .limit(runs)
+    ).all()
+
+    group_columns = [table.c.stage] + ([table.c.district] if by_district else [])
+    summary = []
+    for run_id, started_at in recent:
+        rows = session.execute(
+            select(
+                *group_columns,
+                func.sum(table.c.item_count), func.sum(table.c.byte_count),
+                func.sum(table.c.error_count), func.sum(table.c.duration_seconds),
+            )
+            .where(table.c.importer == importer, table.c.run_id == run_id)
+            .group_by(*group_columns)
+            .order_by(*group_columns)
+        ).all()
+        stages = []
+        for row in rows:
+            stage, district = row[0], (row[1] if by_district else '')
+            items, bytes_, errors, seconds = row[-4:]
+            stages.append({'district': district, 'stage': stage, 'items': items or 0,
+                           'bytes': bytes_ or 0, 'errors': errors or 0, 'seconds': seconds or 0.0})
+        summary.append((run_id, started_at, stages))
+    return summary
+
+
+def _delta(current, previous):
+    if not previous:
+        return ''
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+
+def print_run_comparison(summary):
+    """실행별 단계 통계와 직전 실행 대비 변화율 출력"""
+    if not summary:
+        print("기록된 실행이 없습니다.")
+        return
+
+    for index, (run_id, started_at, stages) in enumerate(summary):
+        previous = {}
+        if index + 1 < len(summary):
+            previous = {(s['district'], s['stage']): s for s in summary[index + 1][2]}
+
+        print(f"\n{run_id} ({started_at})")
+        print(f"{'district':<10} {'stage':<14} {'items':>9} {'MB':>8} {'errors':>7} {'seconds':>9} "
+              f"{'items/s':>9} {'Δtime':>7} {'Δrate':>7}")
+        for s in stages:
+            rate = s['items'] / s['seconds'] if s['seconds'] else 0.0
+            prev = previous.get((s['district'], s['stage']))
+            prev_rate = prev['items'] / prev['seconds'] if prev and prev['seconds'] else 0.0
+            print(
+                f"{s['district'] or '-':<10} {s['stage']:<14} {s['items']:>9} {s['bytes'] / 1024 / 1024:>8.1f} "
+                f"{s['errors']:>7} {s['seconds']:>9.1f} {rate:>9.1f} "
+                f"{_delta(s['seconds'], prev['seconds'] if prev else 0):>7} {_delta(rate, prev_rate):>7}"
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='수집 작업 실행별 단계 통계 비교')
+    parser.add_argument('--importer', default='real_estate',
+                        help='real_estate | crime_stats | cultural_facilities | cultural_festivals | '
+                             'subway_stations | distances')
+    parser.add_argument('--runs', type=int, default=5, help='비교할 최근 실행 수')
+    parser.add_argument('--by-district', action='store_true', help='구역별로 나눠서 출력')
+    parser.add_argument('--db-url', default=None, help='DB URL (없으면 Airflow Variable 의 데이터 DB)')
+    args = parser.parse_args()
+
+    if args.db_url:
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        engine = create_engine(args.db_url, connect_args={'options': '-c search_path=realestate,public'})
+        cli_session = sessionmaker(bind=engine)()
+    else:
+        from alter.db_config import get_session
+        cli_session = get_session()
+
+    try:
+        print_run_comparison(load_run_summary(cli_session, args.importer, args.runs, args.by_district))
+    finally:
+        cli_session.close()
@@ -0,0 +1,257 @@
+"""
+주소 좌표 공간 인덱스 (매물 → 반경 안 주소 일괄 조회)
+
+위도/경도를 지구 중심 기준 3차원 단위 벡터로 바꿔 scipy cKDTree 에 넣는다.
+구면 거리 d 는 단위 구의 현 길이 2·sin(d / 2R) 와 단조 관계이므로 반경 질의를 현 길이 질의로 바꿔
+후보를 찾고, 후보 쌍만 haversine 으로 다시 계산해 반경 밖 쌍을 걸러낸다.
+scipy 가 없으면 위도 구간 + 벡터 haversine 방식(band)으로 같은 결과를 계산한다.
+
+사용 예:
+    addresses = AddressIndex(prepare_points(address_rows))
+    property_ids, address_ids, distances = addresses.query_radius(prepare_points(property_rows), 1000)
+"""
+from typing import Iterator, NamedTuple, Tuple
+
+import numpy as np
+
+from alter.utils import main_logger as logger
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy 가 없는 환경에서는 band 방식 사용
+    cKDTree = None
+
+EARTH_RADIUS = 6371000
+
+PairArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class CoordinateArrays(NamedTuple):
+    """
+    벡터 거리 계산용 좌표 배열 (prepare_points 로 생성)
+
+    위도/경도는 라디안으로 한 번만 변환해 두고, 위도 순으로 정렬되어 있어
+    반경 안의 위도 구간을 searchsorted 로 잘라낼 수 있다.
+    """
+    ids: np.ndarray
+    lat: np.ndarray      # 라디안
+    lon: np.ndarray      # 라디안
+    cos_lat: np.ndarray
+
+    def __len__(self):
+        return len(self.ids)
+
+    def slice(self, start, stop):
+        return CoordinateArrays(self.ids[start:stop], self.lat[start:stop],
+                                self.lon[start:stop], self.cos_lat[start:stop])
+
+    def take(self, indices):
+        return CoordinateArrays(self.ids[indices], self.lat[indices], self.lon[indices], self.cos_lat[indices])
+
+
+def prepare_points(rows) -> CoordinateArrays:
+    """
+    (id, 위도, 경도) 목록을 라디안 좌표 배열로 변환
+
+    좌표가 없거나 범위를 벗어난 행은 제외하고 위도 순으로 정렬한다.
+    """
+    if len(rows) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return CoordinateArrays(np.empty(0, dtype=np.int64), empty, empty, empty)
+
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    coords = np.array([(row[1], row[2]) for row in rows], dtype=np.float64)
+    lat, lon = coords[:, 0], coords[:, 1]
+    valid = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    if not valid.all():
+        logger.warning(f"유효하지 않은 좌표 {int((~valid).sum())}개 제외")
+
+    order = np.argsort(lat[valid], kind='stable')
+    lat_rad = np.radians(lat[valid][order])
+    return CoordinateArrays(ids[valid][order], lat_rad, np.radians(lon[valid][order]), np.cos(lat_rad))
+
+
+def haversine(lat1, lon1, cos_lat1, lat2, lon2, cos_lat2, earth_radius=EARTH_RADIUS):
+    """
+    라디안 좌표 배열 간 haversine 거리 (미터, 배열 모양은 브로드캐스팅 규칙을 따름)
+
+    행렬 계산과 후보 쌍 계산이 같은 식을 쓰도록 거리 계산은 모두 이 함수를 거친다.
+    """
+    sin_dlat = np.sin((lat2 - lat1) * 0.5)
+    sin_dlon = np.sin((lon2 - lon1) * 0.5)
+    a = sin_dlat * sin_dlat + cos_lat1 * cos_lat2 * sin_dlon * sin_dlon
+    np.clip(a, 0.0, 1.0, out=a)
+    return 2 * earth_radius * np.arcsin(np.sqrt(a))
+
+
+def haversine_matrix(origins: CoordinateArrays, targets: CoordinateArrays,
+                     earth_radius=EARTH_RADIUS) -> np.ndarray:
+    """origins x targets 거리 행렬 (미터, shape=(len(origins), len(targets)))"""
+    return haversine(origins.lat[:, np.newaxis], origins.lon[:, np.newaxis], origins.cos_lat[:, np.newaxis],
+                     targets.lat[np.newaxis, :], targets.lon[np.newaxis, :], targets.cos_lat[np.newaxis, :],
+                     earth_radius)
+
+
+def _empty_pairs() -> PairArrays:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+
+def _concat_pairs(parts) -> PairArrays:
+    parts = list(parts)
+    if not parts:
+        return _empty_pairs()
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def iter_band_pairs(origins: CoordinateArrays, targets: CoordinateArrays, max_distance: float,
+                    chunk_size: int = 256, earth_radius=EARTH_RADIUS) -> Iterator[PairArrays]:
+    """
+    반경 안의 (origin id, target id, 거리) 배열을 origin 청크 단위로 생성 (band 방식)
+
+    origin 청크의 위도 범위 ± 반경에 해당하는 target 구간만 잘라 거리 행렬을 계산하므로
+    메모리는 chunk_size x 구간 크기로 제한된다. origins/targets 는 위도 순으로 정렬되어 있어야 한다.
+    """
+    lat_margin = max_distance / earth_radius
+    for start in range(0, len(origins), chunk_size):
+        chunk = origins.slice(start, start + chunk_size)
+        lo = np.searchsorted(targets.lat, chunk.lat[0] - lat_margin, side='left')
+        hi = np.searchsorted(targets.lat, chunk.lat[-1] + lat_margin, side='right')
+        if lo >= hi:
+            continue
+        band = targets.slice(lo, hi)
+        distances = haversine_matrix(chunk, band, earth_radius)
+        rows, cols = np.nonzero(distances <= max_distance)
+        if len(rows):
+            yield chunk.ids[rows], band.ids[cols], distances[rows, cols]
+
+
+def brute_force_pairs(origins: CoordinateArrays, targets: CoordinateArrays, max_distance: float,
+                      chunk_size: int = 256, earth_radius=EARTH_RADIUS) -> PairArrays:
+    """모든 쌍의 거리 행렬을 계산해 반경 안 쌍을 찾는 기준 구현 (검증용)"""
+    parts = []
+    for start in range(0, len(origins), chunk_size):
+        chunk = origins.slice(start, start + chunk_size)
+        distances = haversine_matrix(chunk, targets, earth_radius)
+        rows, cols = np.nonzero(distances <= max_distance)
+        parts.append((chunk.ids[rows], targets.ids[cols], distances[rows, cols]))
+    return _concat_pairs(parts)
+
+
+def to_unit_vectors(points: CoordinateArrays) -> np.ndarray:
+    """라디안 좌표 → 지구 중심 기준 단위 벡터 (n, 3)"""
+    return np.column_stack((
+        points.cos_lat * np.cos(points.lon),
+        points.cos_lat * np.sin(points.lon),
+        np.sin(points.lat),
+    ))
+
+
+class AddressIndex:
+    """
+    주소 좌표 반경 질의 인덱스
+
+    생성 시 한 번 트리를 만들고, query_radius 로 여러 매물의 반경 질의를 한 번에 처리한다.
+    backend 는 'kdtree' (scipy cKDTree) 또는 'band' (scipy 가 없을 때).
+    workers 는 cKDTree 질의 스레드 수 (-1 은 전체 코어, 프로세스 풀 작업자에서는 1).
+    """
+
+    def __init__(self, points: CoordinateArrays, earth_radius=EARTH_RADIUS, backend=None, leafsize=32,
+                 workers=-1):
+        self.points = points
+        self.earth_radius = earth_radius
+        self.workers = workers
+        self.backend = backend or ('kdtree' if cKDTree is not None else 'band')
+        self.tree = None
+        if self.backend == 'kdtree':
+            if cKDTree is None:
+                raise ImportError("kdtree 백엔드에는 scipy 가 필요합니다.")
+            self.tree = cKDTree(to_unit_vectors(points), leafsize=leafsize)
+        elif self.backend != 'band':
+            raise ValueError(f"지원하지 않는 공간 인덱스 백엔드입니다: {self.backend}")
+
+    def __len__(self):
+        return len(self.points)
+
+    def _chord_radius(self, max_distance: float) -> float:
+        """구면 거리 반경에 해당하는 단위 구 현 길이 (경계 쌍이 빠지지 않도록 약간 여유를 둠)"""
+        angle = min(max_distance / self.earth_radius, np.pi)
+        return 2 * np.sin(angle / 2) * (1 + 1e-9) + 1e-12
+
+    def iter_query_radius(self, origins: CoordinateArrays, max_distance: float,
+                          chunk_size: int = 20000) -> Iterator[PairArrays]:
+        """반경 안의 (origin id, 주소 id, 거리) 배열을 origin 청크 단위로 생성"""
+        if not len(origins) or not len(self.points):
+            return
+        if self.backend == 'band':
+            if np.any(np.diff(origins.lat) < 0):
+                origins = origins.take(np.argsort(origins.lat, kind='stable'))
+            yield from iter_band_pairs(origins, self.points, max_distance, earth_radius=self.earth_radius)
+            return
+
+        radius = self._chord_radius(max_distance)
+        for start in range(0, len(origins), chunk_size):
+            chunk = origins.slice(start, start + chunk_size)
+            neighbours = self.tree.query_ball_point(to_unit_vectors(chunk), radius, workers=self.workers,
+                                                    return_sorted=False)
+            counts = np.fromiter((len(found) for found in neighbours), dtype=np.int64, count=len(neighbours))
+            if not counts.any():
+                continue
+            origin_idx = np.repeat(np.arange(len(chunk)), counts)
+            target_idx = np.fromiter((i for found in neighbours for i in found), dtype=np.int64,
+                                     count=int(counts.sum()))
+            distances = haversine(chunk.lat[origin_idx], chunk.lon[origin_idx], chunk.cos_lat[origin_idx],
+                                  self.points.lat[target_idx], self.points.lon[target_idx],
+                                  self.points.cos_lat[target_idx], self.earth_radius)
+            within = distances <= max_distance
+            yield chunk.ids[origin_idx[within]], self.points.ids[target_idx[within]], distances[within]
+
+    def query_radius(self, origins: CoordinateArrays, max_distance: float) -> PairArrays:
+        """반경 안의 모든 쌍을 (origin ids, 주소 ids, 거리) 배열로 반환"""
+        return _concat_pairs(self.iter_query_radius(origins, max_distance))
+
+    def nearest(self, origins: CoordinateArrays, chunk_size: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        origin 마다 가장 가까운 주소 (주소 ids, 거리) 배열 (origins 순서, 반경 제한 없음)
+
+        현 길이가 가장 짧은 점이 구면 거리도 가장 짧으므로 cKDTree 최근접 질의 후 거리만 haversine 으로 다시 계산한다.
+        """
+        if not len(origins) or not len(self.points):
+            return np.full(len(origins), -1, dtype=np.int64), np.full(len(origins), np.nan)
+        if self.backend == 'kdtree':
+            _, target_idx = self.tree.query(to_unit_vectors(origins), k=1, workers=self.workers)
+        else:
+            target_idx = np.concatenate([
+                haversine_matrix(origins.slice(start, start + chunk_size), self.points, self.earth_radius).argmin(axis=1)
+                for start in range(0, len(origins), chunk_size)
+            ])
+        distances = haversine(origins.lat, origins.lon, origins.cos_lat, self.points.lat[target_idx],
+                              self.points.lon[target_idx], self.points.cos_lat[target_idx], self.earth_radius)
+        return self.points.ids[target_idx], distances
+
+
+def _sorted_pairs(pairs: PairArrays) -> PairArrays:
+    order = np.lexsort((pairs[1], pairs[0]))
+    return pairs[0][order], pairs[1][order], pairs[2][order]
+
+
+def verify_against_brute_force(index: AddressIndex, origins: CoordinateArrays, max_distance: float) -> dict:
+    """
+    인덱스 질의 결과가 전체 쌍 계산 결과와 정확히 같은지 확인
+
+    쌍 집합과 거리 값이 모두 같아야 하며, 다르면 AssertionError 를 발생시킨다.
+    """
+    found = _sorted_pairs(index.query_radius(origins, max_distance))
+    expected = _sorted_pairs(brute_force_pairs(origins, index.points, max_distance,
+                                               earth_radius=index.earth_radius))
+    if len(found[0]) != len(expected[0]) or not (
+        np.array_equal(found[0], expected[0]) and np.array_equal(found[1], expected[1])
+    ):
+        raise AssertionError(
+            f"공간 인덱스({index.backend}) 결과가 전체 계산과 다릅니다: {len(found[0])}쌍 / {len(expected[0])}쌍"
+        )
+    if not np.array_equal(found[2], expected[2]):
+        raise AssertionError(
+            f"공간 인덱스({index.backend}) 거리 값이 전체 계산과 다릅니다: "
+            f"최대 차이 {np.abs(found[2] - expected[2]).max():.3e}m"
+        )
+    return {'backend': index.backend, 'origins': len(origins), 'pairs': len(found[0])}
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from alter.db_config import provide_session
-from alter.models import Address
+from alter.models import Address, PropertyLocation
+from alter.geohash import encode as encode_geohash
 from alter.utils import (retry_on_failure, get_api_key, 
                         main_logger as logger)
 import requests
@@ -13,6 +14,7 @@ from alter.exceptions import APIError
 from alter.utils import timing_context, BatchProcessor
 from airflow.models import Variable
 from sqlalchemy.sql import text
+from sqlalchemy import bindparam, select, update
 
 
 KAKAO_API_KEY = Variable.get("KAKAO_API_KEY")
@@ -82,12 +84,14 @@ def update_address_coordinates(session=None, batch_size=100):
                                 UPDATE realestate.addresses 
                                 SET latitude = :lat, 
                                     longitude = :lon,
+                                    geohash = :geohash,
                                     updated_at = NOW()
                                 WHERE id = :addr_id
                             """),
                             {
                                 'lat': coords['latitude'],
                                 'lon': coords['longitude'],
+                                'geohash': encode_geohash(coords['latitude'], coords['longitude']),
                                 'addr_id': address.id
                             }
                         )
@@ -148,6 +152,7 @@ class AddressCoordinateUpdater:
         if coords:
             address.latitude = coords['latitude']
             address.longitude = coords['longitude']
+            address.geohash = encode_geohash(coords['latitude'], coords['longitude'])
             session.add(address)
             self.stats['success'] += 1
             return True
@@ -249,13 +254,15 @@ def update_missing_property_coordinates(session=None, batch_size=100):
                             text("""
                                 UPDATE realestate.property_locations
                                 SET latitude = :lat,
-                                    longitude = :lon
+                                    longitude = :lon,
+                                    geohash = :geohash
                                 WHERE property_id = :prop_id
                             """),
                             {
                                 'prop_id': row[0],
                                 'lat': coords['latitude'],
-                                'lon': coords['longitude']
+                                'lon': coords['longitude'],
+                                'geohash': encode_geohash(coords['latitude'], coords['longitude'])
                             }
                         )
                         session.commit()  # 각 업데이트마다 커밋
@@ -292,13 +299,45 @@ def update_missing_property_coordinates(session=None, batch_size=100):
         session.rollback()
         raise
 
+@provide_session
+def sync_geohashes(session=None, batch_size=5000):
+    """
+    주소/매물 좌표와 geohash 컬럼 동기화
+
+    수집 코드 밖에서 좌표가 바뀌었거나 geohash 컬럼 추가 전에 저장된 행을 찾아 geohash 를 다시 기록한다.
+    (좌표가 없는 행은 NULL)
+    """
+    try:
+        updated = {}
+        for model, key in ((Address, 'id'), (PropertyLocation, 'property_id')):
+            table = model.__table__
+            rows = session.execute(
+                select(table.c[key], table.c.latitude, table.c.longitude, table.c.geohash)
+            ).fetchall()
+            changes = []
+            for entity_id, lat, lon, current in rows:
+                expected = encode_geohash(lat, lon)
+                if expected != current:
+                    changes.append({'entity_id': entity_id, 'new_geohash': expected})
+            stmt = update(table).where(table.c[key] == bindparam('entity_id')).values(geohash=bindparam('new_geohash'))
+            for i in range(0, len(changes), batch_size):
+                session.execute(stmt, changes[i:i + batch_size])
+                session.commit()
+            updated[table.name] = len(changes)
+        logger.info(f"geohash 동기화 완료: {updated}")
+        return True
+    except Exception as e:
+        logger.error(f"geohash 동기화 중 오류 발생: {str(e)}")
+        session.rollback()
+        raise
+
 def update_all_coordinates():
     """주소와 매물의 모든 누락된 좌표 업데이트"""
     try:
         # 먼저 주소 좌표 업데이트
         if update_missing_address_coordinates():
             # 그 다음 매물 좌표 업데이트
-            return update_missing_property_coordinates()
+            return update_missing_property_coordinates() and sync_geohashes()
         return False
     except Exception as e:
         logger.error(f"좌표 업데이트 중 오류 발생: {str(e)}")
@@ -313,6 +352,9 @@ if __name__ == "__main__":
         # 2. 그 다음 매물 좌표 업데이트
         logger.info("2. 매물 좌표 업데이트 시작")
         update_missing_property_coordinates()
+
+        # 3. geohash 동기화
+        sync_geohashes()
         
         logger.info("모든 좌표 업데이트 완료")
     except Exception as e:
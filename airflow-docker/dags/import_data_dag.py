@@ -1,3 +1,4 @@
+import os
 from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
@@ -6,9 +7,10 @@ from alter.import_subway_stations import import_subway_stations
 from alter.import_cultural_facilities import import_cultural_facilities
 from alter.import_cultural_festivals import import_cultural_festivals
 from alter.import_crime_stats import import_crime_stats
-from alter.import_real_estate import run_import_real_estate
+from alter.import_real_estate import run_import_real_estate, finalize_import_real_estate, district_groups
+from alter.landing import replay_landing
 from alter.calculate_distances import calculate_distances
-from alter.update_address_coordinates import update_address_coordinates, update_missing_property_coordinates
+from alter.update_address_coordinates import update_address_coordinates, update_missing_property_coordinates, sync_geohashes
 
 # DAG 기본 인수 설정
 default_args = {
@@ -32,9 +34,20 @@ dag_daily = DAG(
     tags=['real_estate'],
 )
 
-import_real_estate_data = PythonOperator(
+# 구역 그룹마다 task 를 동적으로 매핑하여 워커 슬롯 수만큼 병렬 수집 (그룹별로 세션/파이프라인을 따로 사용)
+# 모든 그룹이 같은 Tor 프록시를 쓰므로 동시 실행 수는 IMPORT_MAX_PARALLEL 로 제한
+import_real_estate_data = PythonOperator.partial(
     task_id='import_real_estate_data',
     python_callable=run_import_real_estate,
+    max_active_tis_per_dag=int(os.getenv('IMPORT_MAX_PARALLEL', '3')),
+    dag=dag_daily,
+).expand(op_kwargs=district_groups())
+
+# 그룹 결과 집계 및 미완료 구역 기록 (일부 그룹이 실패해도 실행하고, 미완료 구역이 있어도 거리 계산은 진행)
+finalize_import_real_estate_task = PythonOperator(
+    task_id='finalize_import_real_estate',
+    python_callable=finalize_import_real_estate,
+    trigger_rule='all_done',
     dag=dag_daily,
 )
 
@@ -44,7 +57,7 @@ calculate_distances_task = PythonOperator(
     dag=dag_daily,
 )
 
-import_real_estate_data >> calculate_distances_task
+import_real_estate_data >> finalize_import_real_estate_task >> calculate_distances_task
 
 # 주소 좌표 업데이트 DAG
 dag_address = DAG(
@@ -68,9 +81,44 @@ t2 = PythonOperator(
     dag=dag_address,
 )
 
-t1 >> t2
+t3 = PythonOperator(
+    task_id='sync_geohashes',
+    python_callable=sync_geohashes,
+    dag=dag_address,
+)
+
+t1 >> t2 >> t3
+
+# 수동 실행 DAG (landing 재처리)
+# 예: airflow dags trigger replay_real_estate_landing --conf '{"dt": "2024-01-01", "districts": ["강남구"]}'
+with DAG(
+    'replay_real_estate_landing',
+    default_args=default_args,
+    description='보관된 원본 응답으로 매물 데이터 재적재',
+    schedule_interval=None,  # 수동 실행
+    start_date=pendulum.datetime(2024, 1, 1, tz='Asia/Seoul'),
+    catchup=False,
+    render_template_as_native_obj=True,
+    tags=['real_estate'],
+) as dag_replay_landing:
+    replay_landing_task = PythonOperator(
+        task_id='replay_landing',
+        python_callable=replay_landing,
+        op_kwargs={
+            'run_date': "{{ dag_run.conf.get('dt', ds) }}",
+            'districts': "{{ dag_run.conf.get('districts') }}",
+        },
+    )
+
+    replay_calculate_distances = PythonOperator(
+        task_id='calculate_distances',
+        python_callable=calculate_distances,
+    )
+
+    replay_landing_task >> replay_calculate_distances
 
 # 수동 실행 DAG (거리 계산)
+# 전체 재계산: airflow dags trigger calculate_distances_manual --conf '{"full_refresh": true}'
 with DAG(
     'calculate_distances_manual',
     default_args=default_args,
@@ -78,10 +126,12 @@ with DAG(
     schedule_interval=None,  # 수동 실행
     start_date=pendulum.datetime(2024, 1, 1, tz='Asia/Seoul'),
     catchup=False,
+    render_template_as_native_obj=True,
 ) as dag_distances_manual:
     calculate_distances_manual = PythonOperator(
         task_id='calculate_distances_manual',
         python_callable=calculate_distances,
+        op_kwargs={'full_refresh': "{{ dag_run.conf.get('full_refresh', False) }}"},
     )
 
 # 분기별 실행되는 DAG (범죄 통계)
@@ -134,6 +184,7 @@ with DAG(
 # 전역 범위에서 DAG 객체들을 노출
 globals()['import_real_estate_daily'] = dag_daily
 globals()['update_address_coordinates_daily'] = dag_address
+globals()['replay_real_estate_landing'] = dag_replay_landing
 globals()['calculate_distances_manual'] = dag_distances_manual
 globals()['import_crime_stats_quarterly'] = dag_quarterly
 globals()['import_cultural_yearly'] = dag_yearly
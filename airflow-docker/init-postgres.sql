@@ -10,9 +10,11 @@ CREATE TABLE IF NOT EXISTS realestate.addresses (
     area_name VARCHAR(100) NOT NULL,
     latitude FLOAT,
     longitude FLOAT,
+    geohash VARCHAR(12) COLLATE "C",  -- 좌표 geohash 9자리 (접두어 LIKE 로 반경/영역 후보 검색)
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 CREATE INDEX IF NOT EXISTS idx_area_name ON realestate.addresses(area_name);
+CREATE INDEX IF NOT EXISTS idx_addresses_geohash ON realestate.addresses(geohash);
 
 -- property_locations 테이블 생성
 CREATE TABLE IF NOT EXISTS realestate.property_locations (
@@ -24,8 +26,12 @@ CREATE TABLE IF NOT EXISTS realestate.property_locations (
     jibun_main VARCHAR(20),
     jibun_sub VARCHAR(20),
     latitude FLOAT,
-    longitude FLOAT
+    longitude FLOAT,
+    geohash VARCHAR(12) COLLATE "C"  -- 좌표 geohash 9자리
 );
+CREATE INDEX IF NOT EXISTS idx_property_locations_sigungu ON realestate.property_locations(sigungu);
+CREATE INDEX IF NOT EXISTS idx_property_locations_geohash ON realestate.property_locations(geohash);
+CREATE INDEX IF NOT EXISTS idx_property_locations_lat_lon ON realestate.property_locations(latitude, longitude);
 
 -- property_info 테이블 생성
 CREATE TABLE IF NOT EXISTS realestate.property_info (
@@ -60,8 +66,16 @@ CREATE TABLE IF NOT EXISTS realestate.property_info (
     is_active BOOLEAN DEFAULT TRUE,
     inactive_reason VARCHAR(200),
     first_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    last_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    last_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    content_hash VARCHAR(64)
 );
+-- 기존 DB 업그레이드용
+ALTER TABLE realestate.property_info ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- 게시 중인 매물만 대상으로 하는 부분 인덱스
+CREATE INDEX IF NOT EXISTS idx_property_info_active ON realestate.property_info(property_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_property_info_active_type ON realestate.property_info(property_type) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_property_info_active_last_seen ON realestate.property_info(last_seen) WHERE is_active;
 
 -- rentals 테이블 생성
 CREATE TABLE IF NOT EXISTS realestate.rentals (
@@ -125,6 +139,7 @@ CREATE TABLE IF NOT EXISTS realestate.location_distances (
     property_id INTEGER REFERENCES realestate.property_locations(property_id) NOT NULL,
     address_id INTEGER REFERENCES realestate.addresses(id) NOT NULL,
     distance FLOAT NOT NULL,  -- 미터 단위
+    radius_tier INTEGER NOT NULL DEFAULT 1000,  -- 계산에 사용한 주소 반경 (미터)
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT uq_property_address UNIQUE (property_id, address_id)
 );
@@ -133,6 +148,99 @@ CREATE TABLE IF NOT EXISTS realestate.location_distances (
 CREATE INDEX IF NOT EXISTS idx_location_distances_property ON realestate.location_distances(property_id);
 CREATE INDEX IF NOT EXISTS idx_location_distances_address ON realestate.location_distances(address_id);
 
+-- import_rejects 테이블 생성 (변환/저장에 실패한 매물 원본)
+CREATE TABLE IF NOT EXISTS realestate.import_rejects (
+    id SERIAL PRIMARY KEY,
+    property_id INTEGER,
+    stage VARCHAR(20) NOT NULL,  -- transform | write
+    error TEXT,
+    payload JSON,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_import_rejects_property ON realestate.import_rejects(property_id);
+
+-- distance_refresh_queue 테이블 생성 (신규/변경 매물의 거리 재계산 대기열)
+CREATE TABLE IF NOT EXISTS realestate.distance_refresh_queue (
+    property_id INTEGER PRIMARY KEY,
+    queued_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- import_checkpoints 테이블 생성 (일별 수집의 구역/페이지 진행 상황)
+CREATE TABLE IF NOT EXISTS realestate.import_checkpoints (
+    run_date DATE NOT NULL,
+    district VARCHAR(50) NOT NULL,
+    last_page INTEGER NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_date, district)
+);
+
+-- import_checkpoint_articles 테이블 생성 (일별 수집에서 저장이 끝난 매물 ID)
+CREATE TABLE IF NOT EXISTS realestate.import_checkpoint_articles (
+    run_date DATE NOT NULL,
+    property_id INTEGER NOT NULL,
+    loaded_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_date, property_id)
+);
+
+-- import_run_stats 테이블 생성 (수집 작업의 단계별 처리 통계)
+CREATE TABLE IF NOT EXISTS realestate.import_run_stats (
+    id SERIAL PRIMARY KEY,
+    run_id VARCHAR(250) NOT NULL,
+    importer VARCHAR(50) NOT NULL,
+    district VARCHAR(50) NOT NULL DEFAULT '',
+    stage VARCHAR(30) NOT NULL,  -- fetch_list | fetch_detail | transform | write | read | total
+    item_count INTEGER NOT NULL DEFAULT 0,
+    byte_count BIGINT NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    duration_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    finished_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_import_run_stats_importer_run ON realestate.import_run_stats(importer, started_at);
+
+-- distance_snapshots 테이블 생성 (거리 계산에 사용한 매물/주소 좌표, 증분 계산 기준)
+CREATE TABLE IF NOT EXISTS realestate.distance_snapshots (
+    kind VARCHAR(10) NOT NULL,  -- property | address
+    entity_id BIGINT NOT NULL,
+    latitude FLOAT NOT NULL,
+    longitude FLOAT NOT NULL,
+    radius INTEGER,  -- 주소의 거리 계산 반경 (미터, 매물은 NULL)
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (kind, entity_id)
+);
+
+-- location_distances_staging 테이블 생성 (거리 COPY 적재용 스테이징, WAL 기록 없음)
+CREATE UNLOGGED TABLE IF NOT EXISTS realestate.location_distances_staging (
+    property_id BIGINT NOT NULL,
+    address_id INTEGER NOT NULL,
+    distance DOUBLE PRECISION NOT NULL
+);
+
+-- property_poi_features 테이블 생성 (매물별 최근접 POI/반경 내 POI 수, 거리 계산 시 증분 갱신)
+CREATE TABLE IF NOT EXISTS realestate.property_poi_features (
+    property_id BIGINT PRIMARY KEY,
+    nearest_subway_address_id INTEGER,
+    nearest_subway_name VARCHAR(255),
+    nearest_subway_distance FLOAT,  -- 미터 단위
+    subway_count_500m INTEGER NOT NULL DEFAULT 0,
+    subway_count_1km INTEGER NOT NULL DEFAULT 0,
+    nearest_cultural_facility_address_id INTEGER,
+    nearest_cultural_facility_name VARCHAR(255),
+    nearest_cultural_facility_distance FLOAT,
+    cultural_facility_count_500m INTEGER NOT NULL DEFAULT 0,
+    cultural_facility_count_1km INTEGER NOT NULL DEFAULT 0,
+    nearest_festival_address_id INTEGER,
+    nearest_festival_name VARCHAR(255),
+    nearest_festival_distance FLOAT,
+    festival_count_500m INTEGER NOT NULL DEFAULT 0,
+    festival_count_1km INTEGER NOT NULL DEFAULT 0,
+    poi_version VARCHAR(32) NOT NULL,  -- 계산에 사용한 POI 목록 해시
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_property_poi_features_subway ON realestate.property_poi_features(nearest_subway_distance);
+
 -- 권한 설정
 GRANT ALL PRIVILEGES ON DATABASE realestate TO realestate;
 GRANT ALL PRIVILEGES ON SCHEMA realestate TO realestate;
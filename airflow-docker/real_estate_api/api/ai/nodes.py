@@ -205,6 +205,7 @@ def generate_query(state: RealEstateState) -> RealEstateState:
         "property_info",
         "property_locations",
         "location_distances",
+        "property_poi_features",
         "cultural_facilities",
     ])
 
@@ -0,0 +1,119 @@
+"""
+geohash 기반 반경/영역 검색 도우미
+
+addresses.geohash, property_locations.geohash 는 Airflow 수집 코드(alter/geohash.py)가 좌표와 함께 기록하는
+9자리 geohash 이고 COLLATE "C" B-tree 인덱스가 있다. 영역을 덮는 셀 접두어로 `geohash__startswith`
+조건을 만들면 인덱스 범위 검색으로 후보를 좁힐 수 있고, 실제 거리는 후보에 대해서만 계산한다.
+
+Django 이미지는 dags 코드를 포함하지 않으므로 alter/geohash.py 의 인코딩/셀 계산을 복사해 두었다.
+한쪽을 고치면 다른 쪽도 함께 고치고, api/tests.py (GeohashParityTest) 로 두 구현이 같은지 확인한다.
+"""
+import math
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+MAX_COVER_CELLS = 16
+EARTH_RADIUS = 6371000
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """위도/경도 → geohash (alter/geohash.py 와 같은 인코딩)"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if target >= mid:
+            value = value * 2 + 1
+            value_range[0] = mid
+        else:
+            value = value * 2
+            value_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def _cell_size(precision):
+    return 180.0 / (1 << (5 * precision // 2)), 360.0 / (1 << ((5 * precision + 1) // 2))
+
+
+def bbox_cells(min_lat, min_lon, max_lat, max_lon, precision):
+    """영역을 덮는 precision 자리 셀 목록"""
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+    lat_step, lon_step = _cell_size(precision)
+    cells = []
+    lat = math.floor((min_lat + 90.0) / lat_step) * lat_step - 90.0
+    while lat <= max_lat:
+        lon = math.floor((min_lon + 180.0) / lon_step) * lon_step - 180.0
+        while lon <= max_lon:
+            cell = encode(min(lat + lat_step / 2, 90.0), min(lon + lon_step / 2, 180.0), precision)
+            if cell not in cells:
+                cells.append(cell)
+            lon += lon_step
+        lat += lat_step
+    return cells
+
+
+def covering_cells(min_lat, min_lon, max_lat, max_lon, max_cells=MAX_COVER_CELLS):
+    """셀 수가 max_cells 이하인 가장 긴 접두어로 영역을 덮는 셀 목록"""
+    cells = bbox_cells(min_lat, min_lon, max_lat, max_lon, 1)
+    for precision in range(2, GEOHASH_PRECISION + 1):
+        candidate = bbox_cells(min_lat, min_lon, max_lat, max_lon, precision)
+        if len(candidate) > max_cells:
+            break
+        cells = candidate
+    return cells
+
+
+def radius_bbox(latitude, longitude, radius):
+    """중심에서 radius(미터) 안의 점을 모두 포함하는 (최소 위도, 최소 경도, 최대 위도, 최대 경도)"""
+    lat_delta = math.degrees(radius / EARTH_RADIUS)
+    cos_lat = math.cos(math.radians(min(abs(latitude) + lat_delta, 90.0)))
+    lon_delta = 180.0 if cos_lat < 1e-9 else min(math.degrees(radius / (EARTH_RADIUS * cos_lat)), 180.0)
+    return latitude - lat_delta, longitude - lon_delta, latitude + lat_delta, longitude + lon_delta
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """두 지점 사이 거리 (미터)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin(math.radians(lat2 - lat1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash_q(cells, field='geohash'):
+    """셀 접두어 목록 → `field LIKE 'abc%' OR ...` Q 객체"""
+    return reduce(or_, (Q(**{f'{field}__startswith': cell}) for cell in cells), Q(pk__in=[]))
+
+
+def within_radius(queryset, latitude, longitude, radius):
+    """
+    queryset 에서 중심으로부터 radius(미터) 안의 행을 [(거리, 행)] 로 반환 (가까운 순)
+
+    geohash 셀로 후보를 고른 뒤 위도/경도로 실제 거리를 계산한다.
+    """
+    cells = covering_cells(*radius_bbox(latitude, longitude, radius))
+    results = []
+    for row in queryset.filter(geohash_q(cells)):
+        distance = haversine(latitude, longitude, float(row.latitude), float(row.longitude))
+        if distance <= radius:
+            results.append((distance, row))
+    results.sort(key=lambda item: item[0])
+    return results
+
+
+def within_bbox(queryset, min_lat, min_lon, max_lat, max_lon):
+    """queryset 에서 영역 안의 행 (geohash 셀로 후보를 고른 뒤 위도/경도 범위로 거름)"""
+    cells = covering_cells(min_lat, min_lon, max_lat, max_lon)
+    return queryset.filter(geohash_q(cells)).filter(
+        latitude__gte=min_lat, latitude__lte=max_lat, longitude__gte=min_lon, longitude__lte=max_lon
+    )
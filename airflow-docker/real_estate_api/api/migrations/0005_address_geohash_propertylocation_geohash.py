@@ -0,0 +1,35 @@
+# Generated by Django 4.2.18 on 2026-10-19 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_rename_content_feedback_feedback_text_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='geohash',
+            field=models.CharField(db_collation='C', max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='propertylocation',
+            name='geohash',
+            field=models.CharField(db_collation='C', max_length=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['geohash'], name='idx_addresses_geohash'),
+        ),
+        migrations.AddIndex(
+            model_name='propertylocation',
+            index=models.Index(fields=['geohash'], name='idx_property_locations_geohash'),
+        ),
+        migrations.AddIndex(
+            model_name='propertylocation',
+            index=models.Index(fields=['latitude', 'longitude'], name='idx_property_locations_lat_lon'),
+        ),
+    ]
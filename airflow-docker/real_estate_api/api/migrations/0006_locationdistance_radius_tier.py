@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-19 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_address_geohash_propertylocation_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationdistance',
+            name='radius_tier',
+            field=models.IntegerField(default=1000),
+        ),
+    ]
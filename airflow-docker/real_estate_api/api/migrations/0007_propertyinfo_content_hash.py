@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-19 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_locationdistance_radius_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyinfo',
+            name='content_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+    ]
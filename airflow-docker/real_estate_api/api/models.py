@@ -9,12 +9,14 @@ class Address(models.Model):
     area_name = models.CharField(max_length=100)
     latitude = models.FloatField(null=True)
     longitude = models.FloatField(null=True)
+    geohash = models.CharField(max_length=12, null=True, db_collation='C')  # 좌표 geohash (수집 시 기록)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'addresses'
         managed = True
+        indexes = [models.Index(fields=['geohash'], name='idx_addresses_geohash')]
 
 class CulturalFacility(models.Model):
     id = models.AutoField(primary_key=True)
@@ -48,10 +50,15 @@ class PropertyLocation(models.Model):
     jibun_sub = models.CharField(max_length=20, null=True)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True)
+    geohash = models.CharField(max_length=12, null=True, db_collation='C')  # 좌표 geohash (수집 시 기록)
 
     class Meta:
         db_table = 'property_locations'
         managed = True
+        indexes = [
+            models.Index(fields=['geohash'], name='idx_property_locations_geohash'),
+            models.Index(fields=['latitude', 'longitude'], name='idx_property_locations_lat_lon'),
+        ]
 
 class PropertyInfo(models.Model):
     id = models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')
@@ -86,6 +93,7 @@ class PropertyInfo(models.Model):
     inactive_reason = models.CharField(max_length=200, null=True, blank=True)
     first_seen = models.DateTimeField(auto_now_add=True)
     last_seen = models.DateTimeField(auto_now=True)
+    content_hash = models.CharField(max_length=64, null=True)  # 정규화된 매물 데이터의 sha256 (Airflow 수집 시 변경 감지용)
 
     class Meta:
         db_table = 'property_info'
@@ -230,6 +238,7 @@ class LocationDistance(models.Model):
     property = models.ForeignKey(PropertyLocation, on_delete=models.CASCADE, db_column='property_id')
     address = models.ForeignKey(Address, on_delete=models.CASCADE, db_column='address_id')
     distance = models.FloatField()
+    radius_tier = models.IntegerField(default=1000)  # 계산에 사용한 주소 반경 (미터)
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
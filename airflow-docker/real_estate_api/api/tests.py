@@ -1,3 +1,58 @@
-from django.test import TestCase
+import importlib.util
+import random
+import unittest
+from pathlib import Path
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import geo
+
+# Airflow 수집 코드의 geohash 모듈 (Django 이미지에는 포함되지 않으므로 저장소에서 실행할 때만 비교)
+ALTER_GEOHASH = Path(__file__).resolve().parents[2] / 'dags' / 'alter' / 'geohash.py'
+
+
+def load_alter_geohash():
+    spec = importlib.util.spec_from_file_location('alter_geohash', ALTER_GEOHASH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class GeohashParityTest(SimpleTestCase):
+    """api/geo.py 는 alter/geohash.py 의 사본이므로 두 구현이 같은 셀을 만드는지 확인"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if not ALTER_GEOHASH.exists():
+            raise unittest.SkipTest(f'{ALTER_GEOHASH} 없음')
+        cls.alter = load_alter_geohash()
+
+    def setUp(self):
+        self.random = random.Random(42)
+
+    def random_point(self):
+        # 서울 주변 + 전 세계 임의 좌표
+        if self.random.random() < 0.5:
+            return self.random.uniform(37.4, 37.7), self.random.uniform(126.7, 127.2)
+        return self.random.uniform(-89.9, 89.9), self.random.uniform(-179.9, 179.9)
+
+    def test_constants(self):
+        self.assertEqual(geo.BASE32, self.alter.BASE32)
+        self.assertEqual(geo.GEOHASH_PRECISION, self.alter.GEOHASH_PRECISION)
+        self.assertEqual(geo.MAX_COVER_CELLS, self.alter.MAX_COVER_CELLS)
+
+    def test_encode(self):
+        for _ in range(2000):
+            latitude, longitude = self.random_point()
+            for precision in (1, 5, geo.GEOHASH_PRECISION):
+                self.assertEqual(geo.encode(latitude, longitude, precision),
+                                 self.alter.encode(latitude, longitude, precision))
+
+    def test_radius_cover(self):
+        for _ in range(200):
+            latitude, longitude = self.random_point()
+            radius = self.random.choice([50, 300, 700, 1500, 5000])
+            bbox = geo.radius_bbox(latitude, longitude, radius)
+            self.assertEqual(bbox, self.alter.radius_bbox(latitude, longitude, radius))
+            self.assertEqual(geo.covering_cells(*bbox), self.alter.covering_cells(*bbox))
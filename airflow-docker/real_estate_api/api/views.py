@@ -22,6 +22,7 @@ from .serializers import (
     AddressDetailSerializer, UserRegistrationSerializer
 )
 from django.db import models
+from .geo import within_bbox, within_radius
 
 # Create your views here.
 
@@ -62,6 +63,61 @@ class PropertyLocationViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
         except PropertyLocation.DoesNotExist:
             return Response({"error": "Property not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """
+        반경 검색: ?lat=37.49&lon=127.02&radius=700 또는 ?address_id=1&radius=700 (미터, 최대 5000)
+
+        geohash 인덱스로 후보를 고른 뒤 실제 거리로 걸러 가까운 순으로 반환한다.
+        """
+        try:
+            radius = float(request.query_params.get('radius', 1000))
+            address_id = request.query_params.get('address_id')
+            if address_id:
+                address = get_object_or_404(Address, id=address_id)
+                latitude, longitude = address.latitude, address.longitude
+            else:
+                latitude = float(request.query_params['lat'])
+                longitude = float(request.query_params['lon'])
+        except (KeyError, ValueError):
+            return Response({"error": "lat, lon (or address_id) and numeric radius are required"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if latitude is None or longitude is None:
+            return Response({"error": "Address has no coordinates"}, status=status.HTTP_404_NOT_FOUND)
+        if not 0 < radius <= 5000:
+            return Response({"error": "radius must be between 0 and 5000"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = within_radius(self.queryset.exclude(geohash__isnull=True), latitude, longitude, radius)
+        return Response([
+            {
+                'property_id': location.property_id,
+                'sido': location.sido,
+                'sigungu': location.sigungu,
+                'dong': location.dong,
+                'latitude': location.latitude,
+                'longitude': location.longitude,
+                'distance': round(distance, 1),
+            }
+            for distance, location in rows
+        ])
+
+    @action(detail=False, methods=['get'])
+    def in_bbox(self, request):
+        """영역 검색: ?min_lat=&min_lon=&max_lat=&max_lon= (지도 화면 영역, 최대 5000건)"""
+        try:
+            bounds = [float(request.query_params[key]) for key in ('min_lat', 'min_lon', 'max_lat', 'max_lon')]
+        except (KeyError, ValueError):
+            return Response({"error": "min_lat, min_lon, max_lat and max_lon are required"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if bounds[0] > bounds[2] or bounds[1] > bounds[3]:
+            return Response({"error": "min values must not exceed max values"}, status=status.HTTP_400_BAD_REQUEST)
+
+        locations = within_bbox(self.queryset, *bounds).values(
+            'property_id', 'sido', 'sigungu', 'dong', 'latitude', 'longitude'
+        )[:5000]
+        return Response(list(locations))
+
 class PropertyInfoViewSet(viewsets.ModelViewSet):
     queryset = PropertyInfo.objects.all()
     serializer_class = PropertyInfoSerializer
@@ -0,0 +1,201 @@
+"""
+요청 허용 제어(Admission Control) 모듈.
+
+동시에 실행되는 그래프 수를 전역 세마포어로 제한하고, 세션(또는 IP)별 토큰 버킷으로
+한 사용자가 요청을 몰아 보내지 못하게 한다. 실행 슬롯이 없으면 제한된 길이의 대기열에서
+잠시 기다리고, 대기열이 가득 차거나 대기 시간이 초과되면 즉시 429/503으로 거절한다.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+
+from config import ADMISSION_CONFIG
+
+
+class AdmissionRejected(Exception):
+    """요청이 허용되지 않았을 때 발생하는 예외 (HTTP 상태 코드와 Retry-After 포함)."""
+
+    def __init__(self, status_code, retry_after, reason):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 토큰이 채워지고 최대 capacity개까지 쌓이는 토큰 버킷.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self):
+        """
+        토큰 하나를 소비하는 함수.
+
+        Returns:
+            tuple: (성공 여부, 토큰이 다시 생길 때까지 남은 초)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class AdmissionSlot:
+    """
+    acquire()로 얻은 실행 슬롯.
+
+    스트리밍 제너레이터와 응답 처리 양쪽에서 반환을 시도하므로 release()는 여러 번 불러도 한 번만 반환한다.
+    """
+
+    def __init__(self, controller):
+        self._controller = controller
+        self.released = False
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        self._controller.release()
+
+
+class AdmissionController:
+    """
+    전역 동시 실행 제한 + 사용자별 토큰 버킷 + 제한된 대기열.
+
+    사용 예:
+        slot = await admission.acquire(client_key)   # 거절 시 AdmissionRejected 발생
+        try:
+            ...
+        finally:
+            slot.release()
+    """
+
+    def __init__(self, max_concurrency=8, max_queue=32, queue_timeout=10.0,
+                 rate=0.5, burst=5, max_clients=10000):
+        if rate < 0:
+            raise ValueError(f"rate는 0 이상이어야 합니다: {rate}")
+        if rate > 0 and burst < 1:
+            raise ValueError(f"burst는 1 이상이어야 합니다: {burst}")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+
+        self._semaphore = None
+        self._buckets = OrderedDict()
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.admitted_total = 0
+        self.rejected_total = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+
+    @property
+    def semaphore(self):
+        # 🔹 이벤트 루프가 생성된 뒤에 세마포어를 만들도록 지연 생성
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _bucket(self, client_key):
+        bucket = self._buckets.get(client_key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[client_key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)  # 가장 오래된 사용자 버킷부터 제거
+        else:
+            self._buckets.move_to_end(client_key)
+        return bucket
+
+    def _reject(self, status_code, retry_after, reason):
+        self.rejected_total[reason] += 1
+        return AdmissionRejected(status_code, max(1, math.ceil(retry_after)), reason)
+
+    async def acquire(self, client_key):
+        """
+        실행 슬롯을 얻을 때까지 기다리는 함수.
+
+        Args:
+            client_key (str): 세션 ID 또는 클라이언트 IP
+
+        Returns:
+            AdmissionSlot: 한 번만 반환되는 실행 슬롯
+
+        Raises:
+            AdmissionRejected: 사용자별 한도 초과(429), 대기열 초과/대기 시간 초과(503)
+        """
+        # 🔹 rate=0 이면 사용자별 한도 없이 전역 동시 실행 제한만 적용
+        if self.rate > 0:
+            allowed, retry_after = self._bucket(client_key).try_acquire()
+            if not allowed:
+                raise self._reject(429, retry_after, "rate_limited")
+
+        semaphore = self.semaphore
+        if semaphore.locked():
+            if self.queue_depth >= self.max_queue:
+                raise self._reject(503, self.queue_timeout, "queue_full")
+
+            self.queue_depth += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject(503, self.queue_timeout, "queue_timeout")
+            finally:
+                self.queue_depth -= 1
+        else:
+            await semaphore.acquire()
+
+        self.in_flight += 1
+        self.admitted_total += 1
+        return AdmissionSlot(self)
+
+    def release(self):
+        """실행 슬롯을 반환하는 함수. (AdmissionSlot.release()를 통해 호출)"""
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def metrics(self):
+        """
+        Prometheus 텍스트 형식의 지표를 반환하는 함수.
+        """
+        lines = [
+            "# HELP real_estate_admission_queue_depth Requests waiting for an execution slot.",
+            "# TYPE real_estate_admission_queue_depth gauge",
+            f"real_estate_admission_queue_depth {self.queue_depth}",
+            "# HELP real_estate_admission_in_flight Graph runs currently executing.",
+            "# TYPE real_estate_admission_in_flight gauge",
+            f"real_estate_admission_in_flight {self.in_flight}",
+            "# HELP real_estate_admission_max_concurrency Configured execution slots.",
+            "# TYPE real_estate_admission_max_concurrency gauge",
+            f"real_estate_admission_max_concurrency {self.max_concurrency}",
+            "# HELP real_estate_admission_admitted_total Requests admitted.",
+            "# TYPE real_estate_admission_admitted_total counter",
+            f"real_estate_admission_admitted_total {self.admitted_total}",
+            "# HELP real_estate_admission_rejected_total Requests rejected by reason.",
+            "# TYPE real_estate_admission_rejected_total counter",
+        ]
+        for reason, count in self.rejected_total.items():
+            lines.append(f'real_estate_admission_rejected_total{{reason="{reason}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# ✅ 프로세스 전역 허용 제어기 (워커마다 하나씩, 전체 한도 = 워커 수 × max_concurrency)
+admission = AdmissionController(
+    max_concurrency=ADMISSION_CONFIG["max_concurrency"],
+    max_queue=ADMISSION_CONFIG["max_queue"],
+    queue_timeout=ADMISSION_CONFIG["queue_timeout"],
+    rate=ADMISSION_CONFIG["rate"],
+    burst=ADMISSION_CONFIG["burst"],
+)
@@ -0,0 +1,203 @@
+"""
+검색기(Retriever) 백엔드 벤치마크 스크립트.
+
+NumPy / Chroma 백엔드의 시작 시간, 질의 지연시간, 메모리 사용량을 비교한다.
+각 백엔드는 별도 프로세스에서 측정하여 임포트 비용과 메모리가 섞이지 않도록 한다.
+--eval-recall 옵션으로 벡터/BM25/하이브리드 검색의 recall@5를 held-out 분할에서 비교한다.
+
+사용법:
+    python benchmark_retrievers.py                      # 전체 백엔드 비교
+    python benchmark_retrievers.py --backends numpy     # 특정 백엔드만 측정
+    python benchmark_retrievers.py --eval-recall        # recall@5 평가
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import time
+
+BACKENDS = ["numpy", "chroma"]
+
+
+def current_rss_mb():
+    """현재 프로세스의 RSS(MB)를 반환한다 (리눅스가 아니면 최대 RSS 사용)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, q):
+    """정렬된 값에서 q 분위수를 반환한다."""
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[idx]
+
+
+def run_child(backend, repeat, build_only):
+    """자식 프로세스: 하나의 백엔드를 초기화하고 측정 결과를 JSON으로 출력한다."""
+    from embedding import encode_questions
+    from retrievers import load_qa_records
+    from config import RETRIEVER_CONFIG
+
+    if build_only:
+        from retrievers import create_retriever
+        create_retriever(backend, hybrid=False)
+        return
+
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    from retrievers import create_retriever
+    retriever = create_retriever(backend, hybrid=False)
+    startup_ms = (time.perf_counter() - start) * 1000
+    rss_after = current_rss_mb()
+
+    # ✅ 임베딩 시간은 두 백엔드가 동일하므로 미리 계산해두고 검색 시간만 측정
+    questions = [r["question"] for r in load_qa_records(RETRIEVER_CONFIG["qa_file"])]
+    query_embeddings = encode_questions(questions)
+
+    latencies = []
+    for _ in range(repeat):
+        for embedding in query_embeddings:
+            t0 = time.perf_counter()
+            retriever.search_by_embedding(
+                embedding,
+                top_k=RETRIEVER_CONFIG["top_k"],
+                threshold=RETRIEVER_CONFIG["threshold"],
+            )
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    print(json.dumps({
+        "backend": backend,
+        "startup_ms": startup_ms,
+        "rss_delta_mb": rss_after - rss_before,
+        "queries": len(latencies),
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "mean_ms": sum(latencies) / len(latencies),
+    }))
+
+
+def run_parent(backends, repeat):
+    """부모 프로세스: 백엔드별로 인덱스를 준비한 뒤 새 프로세스에서 측정한다."""
+    script = os.path.abspath(__file__)
+    rows = []
+
+    for backend in backends:
+        # 🔹 1. 인덱스 생성 (측정 대상 아님)
+        subprocess.run([sys.executable, script, "--child", backend, "--build-only"], check=True)
+
+        # 🔹 2. 이미 생성된 인덱스를 로드하는 새 프로세스에서 측정
+        output = subprocess.run(
+            [sys.executable, script, "--child", backend, "--repeat", str(repeat)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"\n{'backend':<8} {'startup(ms)':>12} {'rss(MB)':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'mean(ms)':>9}")
+    for row in rows:
+        print(
+            f"{row['backend']:<8} {row['startup_ms']:>12.1f} {row['rss_delta_mb']:>9.1f} "
+            f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['mean_ms']:>9.3f}"
+        )
+
+
+def sql_signature(sql):
+    """
+    SQL의 구조 시그니처를 반환하는 함수.
+
+    거래 테이블(sales/rentals)과 WHERE 절에서 조건으로 쓰인 컬럼 집합이 같으면
+    리터럴(지역명, 가격 등)이 달라도 같은 few-shot 예시로 쓸 수 있다고 본다.
+    """
+    sql = sql.lower()
+    where = sql.split(" where ", 1)[1] if " where " in sql else ""
+    where = re.split(r"\border by\b|\blimit\b|\bgroup by\b", where)[0]
+    columns = frozenset(re.findall(
+        r"([a-z_]+\.[a-z_]+)\s*(?:like\b|between\b|in\b|<=|>=|<>|!=|=|<|>)", where
+    ))
+    tables = frozenset(t for t in ("sales", "rentals") if re.search(rf"\b{t}\b", sql))
+    return tables, columns
+
+
+def evaluate_recall(holdout_ratio, seed, top_k=5):
+    """
+    held-out 질문으로 벡터/BM25/하이브리드 검색의 recall@k를 비교하는 함수.
+
+    held-out 질문과 SQL 시그니처가 같은 학습 예시를 정답으로 보고,
+    recall@k = |정답 ∩ 상위 k| / min(|정답|, k)를 평균한다.
+    """
+    import numpy as np
+    from config import RETRIEVER_CONFIG
+    from embedding import encode_questions
+    from retrievers import HybridRetriever, NumpyRetriever, load_qa_records
+
+    records = load_qa_records(RETRIEVER_CONFIG["qa_file"])
+    indices = list(range(len(records)))
+    random.Random(seed).shuffle(indices)
+    split = int(len(indices) * holdout_ratio)
+    holdout = [records[i] for i in indices[:split]]
+    train = [records[i] for i in indices[split:]]
+
+    hybrid = HybridRetriever(NumpyRetriever(), lexical_weight=RETRIEVER_CONFIG["lexical_weight"])
+    hybrid.build(train, encode_questions([r["question"] for r in train]))
+    holdout_embeddings = encode_questions([r["question"] for r in holdout])
+
+    train_signatures = [sql_signature(r["sql"]) for r in train]
+    rankers = {
+        "dense": lambda q, e: hybrid.dense.score_all(e),
+        "bm25": lambda q, e: hybrid.lexical.score(q),
+        "hybrid": lambda q, e: hybrid.fuse(hybrid.dense.score_all(e), hybrid.lexical.score(q)),
+    }
+    recalls = {name: [] for name in rankers}
+    lexical_ms = []
+
+    for record, embedding in zip(holdout, holdout_embeddings):
+        signature = sql_signature(record["sql"])
+        relevant = {i for i, sig in enumerate(train_signatures) if sig == signature}
+        if not relevant:
+            continue
+
+        for name, ranker in rankers.items():
+            scores = ranker(record["question"], embedding)
+            top = set(np.argsort(-scores)[:top_k].tolist())
+            recalls[name].append(len(top & relevant) / min(len(relevant), top_k))
+
+        t0 = time.perf_counter()
+        hybrid.lexical.score(record["question"])
+        lexical_ms.append((time.perf_counter() - t0) * 1000)
+
+    evaluated = len(recalls["dense"])
+    print(f"\n학습 {len(train)}개 / held-out {len(holdout)}개 (정답이 있는 질문 {evaluated}개, seed={seed})")
+    for name, values in recalls.items():
+        score = sum(values) / len(values) if values else 0.0
+        print(f"{name:<8} recall@{top_k}: {score:.3f}")
+    if lexical_ms:
+        print(f"BM25 질의 추가 비용: p50 {percentile(lexical_ms, 0.5):.3f}ms / p95 {percentile(lexical_ms, 0.95):.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="검색기 백엔드 벤치마크")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=20, help="QA 질문 전체를 반복 질의할 횟수")
+    parser.add_argument("--eval-recall", action="store_true", help="held-out 분할에서 recall@5 평가")
+    parser.add_argument("--holdout-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--build-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.eval_recall:
+        evaluate_recall(args.holdout_ratio, args.seed)
+    elif args.child:
+        run_child(args.child, args.repeat, args.build_only)
+    else:
+        run_parent(args.backends, args.repeat)
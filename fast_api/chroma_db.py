@@ -5,34 +5,55 @@ KoSBERT 모델을 사용하여 질문을 벡터화하고,
 ChromaDB에 저장하는 기능을 포함한다.
 """
 
+import hashlib
 import json  
 import chromadb  
-from sentence_transformers import SentenceTransformer 
+from embedding import model  # ✅ 1️. KoSBERT 모델 (embedding 모듈에서 한 번만 로드)
 
-# ✅ 1️. KoSBERT 모델 로드 (한 번만 로드하여 재사용)
-model = SentenceTransformer("snunlp/KR-SBERT-V40K-klueNLI-augSTS")
+COLLECTION_NAME = "qa_vector_db"
 
 # ✅ 2️. ChromaDB 클라이언트 및 컬렉션 생성 (데이터 영구 저장)
 chroma_client = chromadb.PersistentClient(path="./chroma_db")
 collection = chroma_client.get_or_create_collection(
-    name="qa_vector_db", metadata={"hnsw:space": "cosine"}
+    name=COLLECTION_NAME, metadata={"hnsw:space": "cosine"}
 )
 
 
+def qa_digest(jsonl_file):
+    """QA JSONL 파일 내용의 sha256 (컬렉션이 어떤 예시로 만들어졌는지 기록)"""
+    with open(jsonl_file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
 def initialize_vector_db(jsonl_file="./data/QA.jsonl"):
     """
-    ChromaDB가 비어 있는 경우, JSONL 데이터를 로드하여 벡터 DB에 삽입하는 함수.
+    ChromaDB가 비어 있거나 QA 데이터가 바뀐 경우, JSONL 데이터를 로드하여 벡터 DB에 삽입하는 함수.
+
+    컬렉션 메타데이터의 qa_sha256 이 현재 QA 파일과 다르면 (예시 SQL 이 수정된 경우)
+    컬렉션을 지우고 다시 만든다. 파일 수정 시각은 체크아웃/ChromaDB 저장 시 바뀌므로 내용 해시로 비교한다.
 
     Args:
         jsonl_file (str): JSONL 데이터 파일 경로 (기본값: "./data/QA.jsonl")
+
+    Returns:
+        Collection: 사용할 컬렉션 (다시 만든 경우 새 컬렉션)
     """
+    global collection
+    digest = qa_digest(jsonl_file)
     existing_count = collection.count()
 
-    if existing_count > 0:
+    if existing_count > 0 and (collection.metadata or {}).get("qa_sha256") == digest:
         print(f"🔹 기존에 {existing_count}개의 벡터 데이터가 존재합니다. 삽입을 건너뜁니다.")
-        return
+        return collection
 
-    print("🔹 벡터 DB(Chroma)가 비어 있습니다. 데이터를 삽입합니다...")
+    if existing_count > 0:
+        print("🔹 QA 데이터가 바뀌어 벡터 DB(Chroma)를 다시 생성합니다...")
+    else:
+        print("🔹 벡터 DB(Chroma)가 비어 있습니다. 데이터를 삽입합니다...")
+    chroma_client.delete_collection(COLLECTION_NAME)
+    collection = chroma_client.create_collection(
+        name=COLLECTION_NAME, metadata={"hnsw:space": "cosine", "qa_sha256": digest}
+    )
 
     # ✅ 3. JSONL 파일 로드
     with open(jsonl_file, "r", encoding="utf-8") as f:
@@ -56,3 +77,4 @@ def initialize_vector_db(jsonl_file="./data/QA.jsonl"):
 
     print("✅ 벡터 DB 데이터 삽입 완료!")
     print(f"✅ 총 {len(questions)}개의 벡터 데이터가 ChromaDB에 저장되었습니다.")
+    return collection
@@ -4,6 +4,7 @@
 .env 파일을 사용하여 PostgreSQL 데이터베이스 설정을 불러온다.
 """
 
+import json
 import os  # OS 환경 변수 로드
 from dotenv import load_dotenv  # .env 파일 로드
 
@@ -19,3 +20,69 @@ DB_CONFIG = {
     "database": os.getenv("POSTGRES_DB", "realestate") # 기본값: "real_estate"
 }
 
+
+# ✅ 유사 질문 검색기(Retriever) 설정
+RETRIEVER_CONFIG = {
+    "backend": os.getenv("RETRIEVER_BACKEND", "numpy"),            # numpy | chroma
+    "qa_file": os.getenv("RETRIEVER_QA_FILE", "./data/QA.jsonl"),  # QA 예시 데이터
+    "index_dir": os.getenv("RETRIEVER_INDEX_DIR", "./vector_index"),  # numpy 인덱스 저장 경로
+    "top_k": int(os.getenv("RETRIEVER_TOP_K", "5")),               # 검색할 유사 질문 개수
+    "threshold": float(os.getenv("RETRIEVER_THRESHOLD", "0.7")),   # 코사인 유사도 기준
+    "hybrid": os.getenv("RETRIEVER_HYBRID", "true").lower() == "true",  # BM25 하이브리드 검색 사용
+    "lexical_weight": float(os.getenv("RETRIEVER_LEXICAL_WEIGHT", "0.4")),  # BM25 점수 결합 가중치
+}
+
+# ✅ 공유 상태 설정 (멀티 워커/레플리카 배포용)
+STATE_CONFIG = {
+    "backend": os.getenv("STATE_BACKEND", "memory"),                  # memory | sqlite | redis
+    "checkpoint_backend": os.getenv("CHECKPOINT_BACKEND", "memory"),  # memory | sqlite | postgres
+    "sqlite_path": os.getenv("STATE_SQLITE_PATH", "./state/state.sqlite3"),
+    "checkpoint_sqlite_path": os.getenv("CHECKPOINT_SQLITE_PATH", "./state/checkpoints.sqlite3"),
+    "redis_url": os.getenv("STATE_REDIS_URL", "redis://localhost:6379/0"),
+    "checkpoint_postgres_url": os.getenv(
+        "CHECKPOINT_POSTGRES_URL",
+        f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
+    ),
+    "default_session_id": os.getenv("DEFAULT_SESSION_ID", "1"),       # 세션 ID가 없을 때 사용할 스레드 ID
+}
+
+# ✅ 요청 허용 제어 설정 (워커 프로세스당 값)
+ADMISSION_CONFIG = {
+    "max_concurrency": int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8")),   # 동시에 실행할 그래프 수
+    "max_queue": int(os.getenv("ADMISSION_MAX_QUEUE", "32")),              # 실행 대기열 최대 길이
+    "queue_timeout": float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10")),    # 대기열 최대 대기 시간(초)
+    "rate": float(os.getenv("ADMISSION_RATE", "0.5")),                     # 사용자별 초당 허용 요청 수 (0이면 제한 없음)
+    "burst": int(os.getenv("ADMISSION_BURST", "5")),                       # 사용자별 순간 허용 요청 수
+}
+
+# ✅ LLM 클라이언트 설정
+LLM_CONFIG = {
+    "backend": os.getenv("LLM_BACKEND", "openai"),                         # openai | fake (네트워크 없이 실행)
+    "model": os.getenv("LLM_MODEL", "gpt-4o-mini"),
+    "temperature": float(os.getenv("LLM_TEMPERATURE", "1")),
+    "http2": os.getenv("LLM_HTTP2", "true").lower() == "true",             # h2 패키지가 있을 때만 적용
+    "max_connections": int(os.getenv("LLM_MAX_CONNECTIONS", "50")),        # 커넥션 풀 최대 연결 수
+    "max_keepalive_connections": int(os.getenv("LLM_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60")),    # 유휴 연결 유지 시간(초)
+    "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+    "default_timeout": float(os.getenv("LLM_TIMEOUT", "30")),              # 노드별 설정이 없을 때 타임아웃(초)
+    "node_timeouts": {                                                     # 노드별 타임아웃(초)
+        "Filter Question": 10,
+        "Summary": 20,
+        "Re_Questions": 10,
+        "Extract_keywords_based_on_db": 15,
+        "Generate_Query": 30,
+        "No_Result_Answer": 20,
+        "Clean_results": 45,
+        "Generate_Response": 60,
+        **json.loads(os.getenv("LLM_NODE_TIMEOUTS", "{}")),                # 예: '{"Generate_Query": 20}'
+    },
+    "max_retries": int(os.getenv("LLM_MAX_RETRIES", "2")),
+    "retry_base_delay": float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),   # 재시도 기본 대기(초)
+    "retry_max_delay": float(os.getenv("LLM_RETRY_MAX_DELAY", "8")),       # 재시도 최대 대기(초)
+    "hedge": os.getenv("LLM_HEDGE", "false").lower() == "true",            # 느린 요청 중복 전송 사용
+    "hedge_percentile": float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),  # 이 분위수를 넘기면 헤지 요청
+    "hedge_min_samples": int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),    # 헤징을 시작할 최소 표본 수
+    "hedge_workers": int(os.getenv("LLM_HEDGE_WORKERS", "16")),
+    "fake_responses_file": os.getenv("LLM_FAKE_RESPONSES_FILE", ""),       # 가짜 응답 덮어쓰기(JSON)
+}
@@ -0,0 +1,33 @@
+"""
+문장 임베딩 모델 모듈.
+
+KoSBERT 모델을 한 번만 로드하여 모든 검색기(Retriever)가 공유한다.
+"""
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# ✅ KoSBERT 모델 로드 (한 번만 로드하여 재사용)
+model = SentenceTransformer("snunlp/KR-SBERT-V40K-klueNLI-augSTS")
+
+
+def encode_questions(questions, batch_size=32, show_progress_bar=False):
+    """
+    질문 리스트를 L2 정규화된 임베딩 행렬로 변환하는 함수.
+
+    Args:
+        questions (list[str]): 벡터화할 질문 리스트
+        batch_size (int): 인코딩 배치 크기 (기본값: 32)
+        show_progress_bar (bool): 진행률 표시 여부
+
+    Returns:
+        np.ndarray: (질문 수, 임베딩 차원) 형태의 float32 행렬
+    """
+    embeddings = model.encode(
+        questions,
+        batch_size=batch_size,
+        show_progress_bar=show_progress_bar,
+        convert_to_numpy=True,
+        normalize_embeddings=True,  # 🔹 정규화해두면 내적 = 코사인 유사도
+    )
+    return np.asarray(embeddings, dtype=np.float32)
@@ -0,0 +1,104 @@
+"""
+문자 n-gram BM25 어휘 검색 모듈.
+
+SBERT 임베딩은 의미가 비슷한 질문을 잘 찾지만, '은평구', '노량진'처럼
+정확히 같은 지역명을 공유하는 예시를 놓치는 경우가 있다.
+띄어쓰기/조사 변화에 강한 문자 n-gram 단위로 BM25 인덱스를 만들어 이를 보완한다.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[0-9a-zA-Z가-힣]+")
+
+
+def char_ngrams(text, ngram_range=(2, 3)):
+    """
+    텍스트를 단어 단위로 나눈 뒤 문자 n-gram 리스트로 변환하는 함수.
+
+    Args:
+        text (str): 입력 텍스트
+        ngram_range (tuple): (최소 n, 최대 n)
+
+    Returns:
+        list[str]: 문자 n-gram 리스트 (n보다 짧은 단어는 단어 그대로 포함)
+    """
+    min_n, max_n = ngram_range
+    grams = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if len(word) < min_n:
+            grams.append(word)
+            continue
+        for n in range(min_n, max_n + 1):
+            grams.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+class CharNgramBM25:
+    """
+    문자 n-gram BM25 인덱스.
+
+    (n-gram, 문서)별 BM25 가중치를 생성 시점에 모두 계산해두고,
+    질의 시에는 질문의 n-gram별 포스팅 배열을 점수 벡터에 더하기만 한다.
+    """
+
+    def __init__(self, documents, ngram_range=(2, 3), k1=1.2, b=0.75):
+        self.ngram_range = ngram_range
+        self.num_docs = len(documents)
+
+        doc_grams = [Counter(char_ngrams(doc, ngram_range)) for doc in documents]
+        doc_lengths = np.array([sum(c.values()) for c in doc_grams], dtype=np.float32)
+        avg_length = float(doc_lengths.mean()) if self.num_docs else 0.0
+
+        postings = defaultdict(list)
+        for doc_idx, grams in enumerate(doc_grams):
+            for gram, tf in grams.items():
+                postings[gram].append((doc_idx, tf))
+
+        self.idf = {}
+        self.postings = {}
+        for gram, entries in postings.items():
+            idf = self._idf(len(entries))
+            doc_ids = np.array([doc_idx for doc_idx, _ in entries], dtype=np.int32)
+            tfs = np.array([tf for _, tf in entries], dtype=np.float32)
+            norm = k1 * (1 - b + b * doc_lengths[doc_ids] / max(avg_length, 1e-9))
+            self.idf[gram] = idf
+            self.postings[gram] = (doc_ids, idf * tfs * (k1 + 1) / (tfs + norm))
+
+    def _idf(self, df):
+        return math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+    def score(self, query):
+        """
+        질문과 모든 문서의 정규화된 BM25 점수를 계산하는 함수.
+
+        점수는 질문 n-gram들의 idf 합(평균 길이 문서에 한 번씩 등장할 때의 점수)으로
+        나누어 0~1 범위로 맞춘다. 인덱스에 없는 n-gram도 분모에 포함되므로
+        처음 보는 단어가 많은 질문일수록 점수가 낮아진다.
+
+        Args:
+            query (str): 사용자 질문
+
+        Returns:
+            np.ndarray: 문서 수 길이의 float32 점수 벡터
+        """
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        grams = set(char_ngrams(query, self.ngram_range))
+        if not grams or not self.num_docs:
+            return scores
+
+        unseen_idf = self._idf(0)
+        max_score = 0.0
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                max_score += unseen_idf
+                continue
+            doc_ids, weights = posting
+            scores[doc_ids] += weights
+            max_score += self.idf[gram]
+
+        return np.clip(scores / max_score, 0.0, 1.0)
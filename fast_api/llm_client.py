@@ -0,0 +1,304 @@
+"""
+LLM 클라이언트 모듈.
+
+그래프 노드별로 타임아웃/재시도/헤징 정책을 적용한 LLM 클라이언트를 제공한다.
+
+- 모든 노드가 하나의 httpx 커넥션 풀(가능하면 HTTP/2)을 공유하여 TLS 연결을 재사용
+- 노드별 타임아웃과 지터(jitter)를 준 지수 백오프 재시도
+- (선택) 스트리밍하지 않는 노드는 최근 지연시간의 상위 분위수를 넘기면 같은 요청을 한 번 더 보내
+  먼저 도착한 응답을 사용 (헤징)
+- LLM_BACKEND=fake 로 설정하면 네트워크 없이 노드별로 고정된 응답을 돌려주는 가짜 모델 사용
+  (부하 테스트 / CI에서 전체 그래프 실행용)
+
+사용 예:
+    from llm_client import get_llm
+    response = get_llm("Generate_Query").invoke([...])
+"""
+
+import ast
+import contextvars
+import importlib.util
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from config import LLM_CONFIG
+
+# ✅ 응답을 사용자에게 토큰 단위로 스트리밍하는 노드 (중복 요청 시 토큰이 섞이므로 헤징 제외)
+STREAMED_NODES = {"Re_Questions", "No_Result_Answer", "Generate_Response"}
+
+
+class LatencyTracker:
+    """
+    노드별 최근 LLM 응답 시간(초)을 보관하고 분위수를 계산하는 클래스.
+    """
+
+    def __init__(self, window=200):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, node, seconds):
+        with self._lock:
+            self._samples[node].append(seconds)
+
+    def percentile(self, node, q, min_samples):
+        """
+        최근 응답 시간의 q 분위수를 반환하는 함수 (표본이 min_samples 미만이면 None).
+        """
+        with self._lock:
+            samples = sorted(self._samples[node])
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+latency_tracker = LatencyTracker()
+
+
+def _retryable_errors():
+    """재시도할 예외 타입 (타임아웃, 연결 오류, 429, 5xx)."""
+    errors = [TimeoutError, ConnectionError]
+    try:
+        import httpx
+        errors += [httpx.TimeoutException, httpx.TransportError]
+    except ImportError:
+        pass
+    try:
+        import openai
+        errors += [openai.APITimeoutError, openai.APIConnectionError,
+                   openai.RateLimitError, openai.InternalServerError]
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+class NodeLLM:
+    """
+    하나의 그래프 노드에서 사용하는 LLM 클라이언트.
+
+    기존 ChatOpenAI 와 같은 invoke 인터페이스를 제공하므로 노드 코드는 그대로 사용할 수 있다.
+    재시도는 요청이 실패했을 때만 수행하므로, 스트리밍 노드에서 토큰 일부를 받은 뒤
+    실패하면 앞서 받은 토큰이 다시 전송될 수 있다.
+    """
+
+    def __init__(self, node, model, max_retries, retry_base_delay, retry_max_delay, hedge):
+        self.node = node
+        self.model = model
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.hedge = hedge and node not in STREAMED_NODES
+        self.retryable = _retryable_errors()
+
+    def invoke(self, messages, **kwargs):
+        if self.hedge:
+            return self._hedged_invoke(messages, **kwargs)
+        return self._invoke_with_retry(messages, **kwargs)
+
+    def _invoke_with_retry(self, messages, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.model.invoke(messages, **kwargs)
+            except self.retryable as e:
+                if attempt == self.max_retries:
+                    print(f"❌ [{self.node}] LLM 호출 실패 ({attempt + 1}회 시도): {e}")
+                    raise
+                # 🔹 full jitter: 0 ~ min(최대 대기, 기본 대기 × 2^시도) 사이에서 무작위 대기
+                delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+                print(f"🔹 [{self.node}] LLM 호출 재시도 {attempt + 1}/{self.max_retries} ({delay:.2f}초 후): {e}")
+                time.sleep(delay)
+                continue
+            latency_tracker.record(self.node, time.perf_counter() - start)
+            return response
+
+    def _hedged_invoke(self, messages, **kwargs):
+        hedge_after = latency_tracker.percentile(
+            self.node, LLM_CONFIG["hedge_percentile"], LLM_CONFIG["hedge_min_samples"]
+        )
+        if hedge_after is None:
+            return self._invoke_with_retry(messages, **kwargs)
+
+        # 🔹 LangGraph/LangSmith 콜백이 이어지도록 현재 컨텍스트를 복사해서 실행
+        primary = _hedge_executor.submit(
+            contextvars.copy_context().run, self._invoke_with_retry, messages, **kwargs
+        )
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        print(f"🔹 [{self.node}] 응답이 {hedge_after:.2f}초를 넘어 헤지 요청을 보냅니다.")
+        hedge = _hedge_executor.submit(
+            contextvars.copy_context().run, self._invoke_with_retry, messages, **kwargs
+        )
+        done, pending = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first = done.pop()
+        if first.exception() is not None and pending:
+            return pending.pop().result()
+        for future in pending:
+            future.cancel()
+        return first.result()
+
+
+_hedge_executor = ThreadPoolExecutor(max_workers=LLM_CONFIG["hedge_workers"], thread_name_prefix="llm-hedge")
+
+
+# ✅ 가짜 백엔드 (네트워크 없이 전체 그래프 실행용)
+FAKE_RESPONSES = {
+    "default": "OK",
+    "Filter Question": "Pass",
+    "Summary": "사용자는 서울 지역의 부동산 매물을 찾고 있습니다.",
+    "Re_Questions": "❌부동산 관련 질문을 다시 입력해주세요!🏠",
+    "Extract_keywords_based_on_db": json.dumps({
+        "Location": "없음",
+        "Property Type": "없음",
+        "Price": "없음",
+        "Transaction Type": "전세",
+        "Property Features": "없음",
+        "User Preferences": "없음",
+        "Cultural/Facilities": "없음",
+        "Safety and Crime Data": "없음",
+    }, ensure_ascii=False),
+    "Generate_Query": (
+        "SELECT pi.property_id, pi.description, r.deposit, pl.latitude, pl.longitude "
+        "FROM property_info pi JOIN rentals r ON pi.property_id = r.property_id "
+        "JOIN property_locations pl ON pi.property_id = pl.property_id "
+        "ORDER BY pi.property_id LIMIT 5;"
+    ),
+    "No_Result_Answer": "조건에 맞는 매물을 찾지 못했습니다. 조건을 바꿔서 다시 질문해주세요.",
+    "Generate_Response": "요청하신 조건에 맞는 매물을 찾았습니다. 지도에서 위치를 확인해보세요.",
+}
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    노드별로 정해진 응답을 돌려주는 결정적(deterministic) 가짜 채팅 모델.
+
+    Clean_results 노드는 SQL 결과 문자열에서 매물 ID와 좌표를 뽑아 JSON으로 돌려주므로,
+    데이터베이스만 있으면 지도 표시까지 전체 흐름을 확인할 수 있다.
+    """
+
+    node: str = "default"
+    responses: dict = {}
+
+    @property
+    def _llm_type(self):
+        return "fake-real-estate"
+
+    def _respond(self, messages):
+        if self.node == "Clean_results":
+            return self._clean_results(messages[-1].content)
+        return self.responses.get(self.node, self.responses.get("default", "OK"))
+
+    @staticmethod
+    def _clean_results(results):
+        try:
+            rows = ast.literal_eval(re.sub(r"Decimal\('([^']*)'\)", r"\1", results))
+        except (ValueError, SyntaxError):
+            return "[]"
+        return json.dumps([
+            {"property_id": row[0], "latitude": row[-2], "longitude": row[-1]}
+            for row in rows if isinstance(row, tuple) and len(row) >= 3
+        ], ensure_ascii=False)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = AIMessage(content=self._respond(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # 🔹 실제 모델처럼 단어 단위로 나눠 보내 스트리밍 경로도 함께 검증
+        for token in re.findall(r"\S+\s*", self._respond(messages)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def load_fake_responses():
+    """기본 가짜 응답에 LLM_FAKE_RESPONSES_FILE(JSON, 노드명 → 응답)을 덮어쓴 결과를 반환한다."""
+    responses = dict(FAKE_RESPONSES)
+    if LLM_CONFIG["fake_responses_file"]:
+        with open(LLM_CONFIG["fake_responses_file"], "r", encoding="utf-8") as f:
+            responses.update(json.load(f))
+    return responses
+
+
+def create_http_client():
+    """
+    모든 노드가 공유하는 httpx 클라이언트를 생성하는 함수.
+
+    h2 패키지가 설치되어 있으면 HTTP/2로 하나의 연결에서 여러 요청을 다중화한다.
+    """
+    import httpx
+
+    http2 = LLM_CONFIG["http2"] and importlib.util.find_spec("h2") is not None
+    if LLM_CONFIG["http2"] and not http2:
+        print("🔹 h2 패키지가 없어 HTTP/1.1 커넥션 풀을 사용합니다.")
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=LLM_CONFIG["max_connections"],
+            max_keepalive_connections=LLM_CONFIG["max_keepalive_connections"],
+            keepalive_expiry=LLM_CONFIG["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(LLM_CONFIG["default_timeout"], connect=LLM_CONFIG["connect_timeout"]),
+    )
+
+
+_http_client = None
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _create_model(node):
+    global _http_client
+
+    if LLM_CONFIG["backend"] == "fake":
+        return FakeChatModel(node=node, responses=load_fake_responses())
+    if LLM_CONFIG["backend"] != "openai":
+        raise ValueError(f"지원하지 않는 LLM 백엔드입니다: {LLM_CONFIG['backend']} (선택 가능: openai, fake)")
+
+    from langchain_openai.chat_models.base import ChatOpenAI
+
+    if _http_client is None:
+        _http_client = create_http_client()
+    return ChatOpenAI(
+        model=LLM_CONFIG["model"],
+        temperature=LLM_CONFIG["temperature"],
+        timeout=LLM_CONFIG["node_timeouts"].get(node, LLM_CONFIG["default_timeout"]),
+        max_retries=0,  # 🔹 재시도는 NodeLLM에서 지터를 적용해 직접 수행
+        http_client=_http_client,
+    )
+
+
+def get_llm(node="default"):
+    """
+    노드별 LLM 클라이언트를 반환하는 함수 (노드마다 한 번만 생성).
+
+    Args:
+        node (str): 그래프 노드 이름 (edges.py 의 add_node 이름)
+
+    Returns:
+        NodeLLM: invoke 를 지원하는 LLM 클라이언트
+    """
+    with _clients_lock:
+        client = _clients.get(node)
+        if client is None:
+            client = NodeLLM(
+                node,
+                _create_model(node),
+                max_retries=LLM_CONFIG["max_retries"],
+                retry_base_delay=LLM_CONFIG["retry_base_delay"],
+                retry_max_delay=LLM_CONFIG["retry_max_delay"],
+                hedge=LLM_CONFIG["hedge"],
+            )
+            _clients[node] = client
+    return client
@@ -1,10 +1,15 @@
 from fastapi.staticfiles import StaticFiles
-from fastapi import FastAPI, Body
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import FastAPI, Body, Request
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
+from starlette.concurrency import iterate_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from edges import llm_app
-from nodes import latest_properties
+from langchain_core.runnables import RunnableConfig
 from utils import config
+from config import STATE_CONFIG
+from state_store import state_store
+from retrievers import get_retriever
+from admission import admission, AdmissionRejected, AdmissionSlot
 app = FastAPI()
 
 app.add_middleware(
@@ -17,13 +22,27 @@ app.add_middleware(
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+@app.on_event("startup")
+async def warm_up_retriever():
+    # 벡터/BM25 인덱스를 첫 요청 전에 미리 생성해두어 검색 시 추가 비용이 없도록 함
+    get_retriever()
+
 @app.get("/real_estate")
 async def real_estate_info():
     return {"info": "API는 부동산 관련 요청을 처리할 준비가 되었습니다"}
 
-async def stream_llm_response(query_text: str):
+def session_config(session_id: str) -> RunnableConfig:
+    # 세션 ID를 LangGraph 스레드 ID로 사용하여 워커가 바뀌어도 같은 대화를 이어감
+    return RunnableConfig(
+        recursion_limit=config["recursion_limit"],
+        configurable={"thread_id": session_id},
+        tags=config["tags"],
+    )
+
+def stream_llm_response(query_text: str, session_id: str):
+    # 동기 제너레이터로 두고 스레드풀에서 순회하여 그래프 실행이 이벤트 루프를 막지 않도록 함
     try:
-        for chunk in llm_app.stream({'messages': query_text}, config=config, stream_mode="messages"):
+        for chunk in llm_app.stream({'messages': query_text}, config=session_config(session_id), stream_mode="messages"):
             # 🚀 각 응답을 일정 시간마다 출력하도록 딜레이 추가 (예: 0.5초)
 
             if chunk[1]['langgraph_node'] == "Re_Questions":
@@ -36,22 +55,60 @@ async def stream_llm_response(query_text: str):
     except Exception as e:
         yield f"Error: {str(e)}\n"
 
+async def admitted_stream(query_text: str, session_id: str, slot: AdmissionSlot):
+    # 스트리밍이 끝나면 바로 실행 슬롯 반환
+    try:
+        async for chunk in iterate_in_threadpool(stream_llm_response(query_text, session_id)):
+            yield chunk
+    finally:
+        slot.release()
+
+class AdmittedStreamingResponse(StreamingResponse):
+    # 🔹 제너레이터가 시작되기 전에 클라이언트가 연결을 끊어도 응답 처리가 끝나면 실행 슬롯 반환
+    # (AdmissionSlot은 한 번만 반환되므로 제너레이터의 finally와 겹쳐도 안전)
+    def __init__(self, content, slot: AdmissionSlot, **kwargs):
+        super().__init__(content, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.slot.release()
+
                 
 
 # POST 요청: 사용자 입력 받아 AI 모델에 전달 (스트리밍 방식)
 @app.post("/real_estate")
-async def handle_real_estate_input(payload: dict = Body(...)):
+async def handle_real_estate_input(request: Request, payload: dict = Body(...)):
     query_text = payload.get("query", "")
+    session_id = str(payload.get("session_id") or STATE_CONFIG["default_session_id"])
     if not query_text:
         return {"error": "Invalid input: 'query' is required."}
-    
+
+    # 세션 ID가 없으면 모든 사용자가 기본 세션을 공유하므로 IP 기준으로 사용량 제한
+    client_key = payload.get("session_id") or (request.client.host if request.client else "unknown")
+    try:
+        slot = await admission.acquire(str(client_key))
+    except AdmissionRejected as e:
+        print(f"❌ 요청 거절 ({e.reason}): {client_key}")
+        return JSONResponse(
+            content={"error": "Too many requests" if e.status_code == 429 else "Server is busy", "reason": e.reason},
+            status_code=e.status_code,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     print(f"Received query: {query_text}")
-    return StreamingResponse(stream_llm_response(query_text), media_type="text/plain")
+    return AdmittedStreamingResponse(admitted_stream(query_text, session_id, slot), slot, media_type="text/plain")
 
 @app.get("/properties")
-async def get_properties():
-    global latest_properties
+async def get_properties(session_id: str = STATE_CONFIG["default_session_id"]):
+    latest_properties = state_store.get("properties", session_id, [])
     if not latest_properties:
         return JSONResponse(content={"error": "No properties available yet"}, status_code=404)
 
-    return JSONResponse(content={"properties": latest_properties})
\ No newline at end of file
+    return JSONResponse(content={"properties": latest_properties})
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(admission.metrics(), media_type="text/plain; version=0.0.4")
@@ -3,9 +3,12 @@ from langgraph.graph.message import add_messages
 from langchain_core.messages import HumanMessage, SystemMessage, RemoveMessage
 from langchain_community.tools.sql_database.tool import QuerySQLDataBaseTool
 
-from utils import llm
+from llm_client import get_llm
 from postgresql import db
-from chroma_db import model, collection, initialize_vector_db
+from retrievers import get_retriever
+from config import RETRIEVER_CONFIG, STATE_CONFIG
+from state_store import state_store, shared_cache
+from langchain_core.runnables import RunnableConfig
 
 import json
 import os
@@ -44,7 +47,7 @@ def filter_node(state:RealEstateState) -> RealEstateState:
     else:
         messages = state["messages"][-1].content
 
-    response = llm.invoke([
+    response = get_llm("Filter Question").invoke([
         SystemMessage(content=system_prompt),
         HumanMessage(messages)
     ])
@@ -60,7 +63,7 @@ def filter_node(state:RealEstateState) -> RealEstateState:
         print("[Filter Node] 최근 질문이 애매해서 직전 질문과 연결 여부 검사 중...")
         
         combined_message = previous_message + " " + messages
-        combined_response = llm.invoke([
+        combined_response = get_llm("Filter Question").invoke([
             SystemMessage(content=system_prompt),
             HumanMessage(combined_message)
         ])
@@ -86,7 +89,7 @@ def summarize_conversation(state: RealEstateState):
         summary_prompt = "위의 대화를 요약하세요:"
 
     messages = state["messages"] + [HumanMessage(content=summary_prompt)]
-    response = llm.invoke(messages)
+    response = get_llm("Summary").invoke(messages)
 
     # 최근 2개의 메시지만 남기고 이전 메시지 삭제
     delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-2]]
@@ -119,7 +122,7 @@ def re_questions(state: RealEstateState) -> RealEstateState:
     user_prompt=f"""
     사용자의 질문: {state['messages'][-1].content}
     """
-    response = llm.invoke([
+    response = get_llm("Re_Questions").invoke([
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ])
@@ -130,34 +133,17 @@ def re_questions(state: RealEstateState) -> RealEstateState:
 
 def find_similar_questions(state: RealEstateState) -> RealEstateState:
     """
-    사용자의 질문을 벡터화하여 ChromaDB에서 유사한 질문을 검색.
+    사용자의 질문을 벡터화하여 벡터 인덱스에서 유사한 질문을 검색.
     threshold 값보다 높은(유사한) 결과만 반환.
     """
-    initialize_vector_db()  # ✅ 벡터 DB 초기화
+    retriever = get_retriever()  # ✅ 검색기 초기화 (최초 1회)
 
     query = state["messages"][-1].content  # ✅ 최신 입력된 사용자 메시지
-    top_k = 5  # 검색할 유사 질문 개수
-    threshold = 0.7  # ✅ 코사인 유사도 기준 (1에 가까울수록 유사)
-
-    # ✅ 입력된 질문을 벡터화
-    query_embedding = model.encode([query])[0].tolist()
-
-    # ✅ ChromaDB에서 유사 질문 검색
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k
-    )
-
-    # ✅ 유사도 변환 및 필터링 (코사인 유사도 사용)
-    filtered_results = [
-        {
-            "score": 1 - score,  # ✅ 코사인 거리 → 코사인 유사도로 변환 (1 - 거리)
-            "full_question": doc.get("question"),
-            "sql": doc.get("sql")
-        }
-        for doc, score in zip(results["metadatas"][0], results["distances"][0])
-        if (1 - score) >= threshold  # ✅ 유사도 기준 필터링 (0.7 이상만 출력)
-    ]
+    top_k = RETRIEVER_CONFIG["top_k"]  # 검색할 유사 질문 개수
+    threshold = RETRIEVER_CONFIG["threshold"]  # ✅ 코사인 유사도 기준 (1에 가까울수록 유사)
+
+    # ✅ 설정된 백엔드(NumPy/Chroma)에서 유사 질문 검색 및 필터링
+    filtered_results = retriever.search(query, top_k=top_k, threshold=threshold)
 
     # ✅ 검색 결과 출력
     if not filtered_results:
@@ -176,7 +162,7 @@ def find_similar_questions(state: RealEstateState) -> RealEstateState:
 def extract_keywords_based_on_db(state: RealEstateState) -> RealEstateState:
     system_prompt = prompts['keyword_system_prompt']
 
-    response = llm.invoke([
+    response = get_llm("Extract_keywords_based_on_db").invoke([
         SystemMessage(content=system_prompt),
         HumanMessage(content=state["messages"][-1].content)
     ])
@@ -185,6 +171,19 @@ def extract_keywords_based_on_db(state: RealEstateState) -> RealEstateState:
     result = json.loads(extracted_keywords)
     return {"keywordlist":result}
 
+@shared_cache("table_info", ttl=3600)
+def get_table_info(transaction_type):
+    # 스키마 정보는 요청마다 바뀌지 않으므로 워커 간 공유 캐시에 저장 (1시간)
+    return db.get_table_info(table_names=[
+        "addresses",
+        transaction_type,
+        "property_info",
+        "property_locations",
+        "location_distances",
+        "property_poi_features",
+        "cultural_facilities",
+    ])
+
 def generate_query(state: RealEstateState) -> RealEstateState:
 
     print("[generate_query] 열심히 데이터베이스 쿼리문을 작성중입니다...")
@@ -199,14 +198,7 @@ def generate_query(state: RealEstateState) -> RealEstateState:
         prompt = prompts['base_prompt'] + prompts['rentals_prompt']
         transaction_type = 'rentals'
         
-    table = db.get_table_info(table_names=[
-        "addresses",
-        transaction_type,
-        "property_info",
-        "property_locations",
-        "location_distances",
-        "cultural_facilities",
-    ])
+    table = get_table_info(transaction_type)
 
     prompt = prompt.format(
             table = table,
@@ -223,7 +215,7 @@ def generate_query(state: RealEstateState) -> RealEstateState:
         )
         prompt = prompt + f"\n\n**유사한 질문 예시:**\n{examples}"
     
-    response = llm.invoke([
+    response = get_llm("Generate_Query").invoke([
             SystemMessage(content="당신은 SQLite Database  쿼리를 생성하는 전문가입니다."),
             HumanMessage(prompt)
         ])
@@ -276,7 +268,7 @@ def no_result_answer(state: RealEstateState) -> RealEstateState:
     no_result_answer_prompt = prompts['no_result_answer_prompt'].format(query=query)
 
     user_prompt = f"사용자 질문:{query}"
-    response = llm.invoke([
+    response = get_llm("No_Result_Answer").invoke([
             SystemMessage(content=no_result_answer_prompt),
             HumanMessage(content=user_prompt)
         ])
@@ -302,7 +294,7 @@ def clean_result_query(state: RealEstateState) -> RealEstateState:
         
     user_prompt=f"{state['results']}"
 
-    response = llm.invoke([
+    response = get_llm("Clean_results").invoke([
             SystemMessage(content=clean_result_query_prompt),
             HumanMessage(content=user_prompt)
         ])
@@ -311,11 +303,10 @@ def clean_result_query(state: RealEstateState) -> RealEstateState:
 
     return {"clean_results":output}
 
-# ✅ 전역 변수로 최신 properties 저장
-latest_properties = []
+def get_session_id(config: RunnableConfig) -> str:
+    return (config or {}).get("configurable", {}).get("thread_id", STATE_CONFIG["default_session_id"])
 
-def clean_response(state: RealEstateState) -> RealEstateState:
-    global latest_properties
+def clean_response(state: RealEstateState, config: RunnableConfig) -> RealEstateState:
     print('[clean_response]: 쿼리문을 다듬는 중 입니다.')
 
     clean_results = state['clean_results']
@@ -342,15 +333,16 @@ def clean_response(state: RealEstateState) -> RealEstateState:
             print(f"❌ JSON 데이터가 리스트가 아님: {type(data_list)}")
             raise ValueError("JSON 데이터가 리스트가 아닙니다.")
 
-        latest_properties.clear()
-        latest_properties.extend([
+        latest_properties = [
             {
                 "property_id": item.get("property_id"),
                 "latitude": item.get("latitude"),
                 "longitude": item.get("longitude")
             }
             for item in data_list
-        ])
+        ]
+        # ✅ 워커가 여러 개여도 /properties 요청에서 조회할 수 있도록 세션별로 공유 저장소에 저장
+        state_store.set("properties", get_session_id(config), latest_properties, ttl=86400)
 
         print(f"✅ Updated properties: {latest_properties}")
 
@@ -381,7 +373,7 @@ def generate_response(state: RealEstateState)-> RealEstateState:
     user_prompt=f"""
     사용자의 질문: {state['messages'][-1].content}
     """
-    response = llm.invoke([
+    response = get_llm("Generate_Response").invoke([
             SystemMessage(content=generate_response_prompt),
             HumanMessage(content=user_prompt)
         ])
@@ -0,0 +1,365 @@
+"""
+유사 질문 검색기(Retriever) 모듈.
+
+QA 예시 질문을 벡터화하여 저장하고, 사용자 질문과 코사인 유사도가 높은
+예시 질문과 SQL을 찾아주는 검색기 인터페이스와 구현체를 포함한다.
+
+- NumpyRetriever: 정규화된 임베딩을 메모리 맵 NumPy 행렬로 저장 (기본값)
+- ChromaRetriever: 기존 ChromaDB PersistentClient 사용
+- HybridRetriever: 위 벡터 검색 점수에 문자 n-gram BM25 점수를 결합
+"""
+
+import json
+import os
+
+import numpy as np
+
+from config import RETRIEVER_CONFIG
+from embedding import encode_questions
+from lexical import CharNgramBM25
+
+
+def load_qa_records(jsonl_file):
+    """
+    QA JSONL 파일을 읽어 질문/SQL 레코드 리스트로 반환하는 함수.
+
+    Args:
+        jsonl_file (str): JSONL 데이터 파일 경로
+
+    Returns:
+        list[dict]: {"question": ..., "sql": ...} 형태의 레코드 리스트
+    """
+    with open(jsonl_file, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def top_k_results(scores, records, top_k, threshold):
+    """
+    점수 벡터에서 상위 k개를 골라 threshold 이상인 결과만 반환하는 함수.
+
+    전체 정렬 대신 argpartition으로 상위 k개만 추린 뒤 정렬한다.
+    """
+    if not len(scores):
+        return []
+
+    k = min(top_k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
+    return [
+        {
+            "score": float(scores[idx]),
+            "full_question": records[idx]["question"],
+            "sql": records[idx]["sql"],
+        }
+        for idx in top
+        if scores[idx] >= threshold
+    ]
+
+
+class BaseRetriever:
+    """
+    유사 질문 검색기 기본 클래스.
+
+    하위 클래스는 initialize()와 search_by_embedding()을 구현한다.
+    검색 결과는 {"score", "full_question", "sql"} 딕셔너리 리스트로 반환한다.
+    """
+
+    name = "base"
+
+    def initialize(self, jsonl_file):
+        """QA 데이터를 로드하여 검색 인덱스를 준비한다."""
+        raise NotImplementedError
+
+    def search_by_embedding(self, query_embedding, top_k=5, threshold=0.7):
+        """벡터화된 질문으로 유사 질문을 검색한다."""
+        raise NotImplementedError
+
+    def search(self, query, top_k=5, threshold=0.7):
+        """
+        사용자 질문을 벡터화한 뒤 유사 질문을 검색하는 함수.
+
+        Args:
+            query (str): 사용자 질문
+            top_k (int): 검색할 유사 질문 개수
+            threshold (float): 코사인 유사도 기준 (이상만 반환)
+
+        Returns:
+            list[dict]: 유사도 내림차순으로 정렬된 검색 결과
+        """
+        query_embedding = encode_questions([query])[0]
+        return self.search_by_embedding(query_embedding, top_k=top_k, threshold=threshold)
+
+
+class NumpyRetriever(BaseRetriever):
+    """
+    NumPy 행렬 기반 검색기.
+
+    정규화된 임베딩을 .npy 파일로 저장해두고 메모리 맵으로 읽어,
+    한 번의 행렬-벡터 내적으로 전체 코사인 유사도를 계산한다.
+    수백~수천 개 규모의 QA 예시에서는 HNSW 인덱스보다 빠르고 가볍다.
+    """
+
+    name = "numpy"
+
+    def __init__(self, index_dir="./vector_index"):
+        self.index_dir = index_dir
+        self.embeddings = None  # (N, D) float32 행렬 (메모리 맵)
+        self.records = []
+
+    @property
+    def matrix_path(self):
+        return os.path.join(self.index_dir, "embeddings.npy")
+
+    @property
+    def records_path(self):
+        return os.path.join(self.index_dir, "records.json")
+
+    def initialize(self, jsonl_file="./data/QA.jsonl"):
+        """
+        저장된 인덱스가 있으면 메모리 맵으로 로드하고, 없으면 새로 생성하는 함수.
+
+        Args:
+            jsonl_file (str): JSONL 데이터 파일 경로 (기본값: "./data/QA.jsonl")
+        """
+        if self.embeddings is not None:
+            return
+
+        # 🔹 QA 데이터가 인덱스보다 최신이면 예시 SQL이 바뀐 것이므로 다시 생성
+        if (
+            os.path.exists(self.matrix_path) and os.path.exists(self.records_path)
+            and os.path.getmtime(self.records_path) >= os.path.getmtime(jsonl_file)
+        ):
+            self.load()
+            print(f"🔹 기존에 {len(self.records)}개의 벡터 데이터가 존재합니다. 생성을 건너뜁니다.")
+            return
+
+        print("🔹 벡터 인덱스(NumPy)가 비어 있습니다. 데이터를 생성합니다...")
+        records = load_qa_records(jsonl_file)
+
+        print("🔹 질문을 벡터화하는 중...")
+        embeddings = encode_questions(
+            [item["question"] for item in records], show_progress_bar=True
+        )
+
+        self.save(records, embeddings)
+        self.load()
+        print(f"✅ 총 {len(records)}개의 벡터 데이터가 NumPy 인덱스에 저장되었습니다.")
+
+    def build(self, records, embeddings):
+        """
+        파일 저장 없이 메모리에서 바로 인덱스를 구성하는 함수 (평가/테스트용).
+
+        Args:
+            records (list[dict]): 질문/SQL 레코드 리스트
+            embeddings (np.ndarray): 정규화된 임베딩 행렬
+        """
+        self.records = list(records)
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        return self
+
+    def save(self, records, embeddings):
+        """임베딩 행렬과 레코드를 임시 파일에 쓴 뒤 원자적으로 교체한다."""
+        os.makedirs(self.index_dir, exist_ok=True)
+
+        tmp_matrix = self.matrix_path + ".tmp.npy"
+        np.save(tmp_matrix, np.asarray(embeddings, dtype=np.float32))
+        os.replace(tmp_matrix, self.matrix_path)
+
+        tmp_records = self.records_path + ".tmp"
+        with open(tmp_records, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+        os.replace(tmp_records, self.records_path)
+
+    def load(self):
+        """저장된 인덱스를 메모리 맵으로 로드한다."""
+        self.embeddings = np.load(self.matrix_path, mmap_mode="r")
+        with open(self.records_path, "r", encoding="utf-8") as f:
+            self.records = json.load(f)
+
+    def score_all(self, query_embedding):
+        """전체 예시 질문과의 코사인 유사도 벡터를 반환한다."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        return self.embeddings @ query
+
+    def search_by_embedding(self, query_embedding, top_k=5, threshold=0.7):
+        if self.embeddings is None or not self.records:
+            return []
+
+        scores = self.score_all(query_embedding)
+        return top_k_results(scores, self.records, top_k, threshold)
+
+
+class ChromaRetriever(BaseRetriever):
+    """
+    ChromaDB 기반 검색기.
+
+    기존 chroma_db 모듈의 PersistentClient 컬렉션을 그대로 사용한다.
+    chromadb 임포트가 무겁기 때문에 initialize() 시점에 지연 로드한다.
+    """
+
+    name = "chroma"
+
+    def __init__(self):
+        self.collection = None
+        self.embeddings = None  # 하이브리드 검색용 전체 임베딩 (필요할 때 한 번만 로드)
+        self.records = []
+
+    def initialize(self, jsonl_file="./data/QA.jsonl"):
+        if self.collection is not None:
+            return
+
+        from chroma_db import initialize_vector_db
+
+        # QA 데이터가 바뀌면 컬렉션을 새로 만들므로 반환된 컬렉션을 사용
+        self.collection = initialize_vector_db(jsonl_file)
+
+    def load_matrix(self):
+        """
+        컬렉션의 전체 임베딩과 메타데이터를 QA 파일 순서(id 순)로 읽어오는 함수.
+
+        하이브리드 검색처럼 모든 예시의 점수가 필요한 경우에만 사용한다.
+        """
+        data = self.collection.get(include=["embeddings", "metadatas"])
+        order = np.argsort([int(doc_id) for doc_id in data["ids"]])
+
+        embeddings = np.asarray(data["embeddings"], dtype=np.float32)[order]
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.embeddings = embeddings / np.maximum(norms, 1e-12)
+        self.records = [
+            {"question": data["metadatas"][idx]["question"], "sql": data["metadatas"][idx]["sql"]}
+            for idx in order
+        ]
+
+    def score_all(self, query_embedding):
+        """전체 예시 질문과의 코사인 유사도 벡터를 반환한다."""
+        if self.embeddings is None:
+            self.load_matrix()
+        query = np.asarray(query_embedding, dtype=np.float32)
+        return self.embeddings @ (query / max(np.linalg.norm(query), 1e-12))
+
+    def search_by_embedding(self, query_embedding, top_k=5, threshold=0.7):
+        results = self.collection.query(
+            query_embeddings=[np.asarray(query_embedding).tolist()],
+            n_results=top_k
+        )
+
+        # ✅ 코사인 거리 → 코사인 유사도로 변환 (1 - 거리) 후 필터링
+        return [
+            {
+                "score": 1 - distance,
+                "full_question": doc.get("question"),
+                "sql": doc.get("sql")
+            }
+            for doc, distance in zip(results["metadatas"][0], results["distances"][0])
+            if (1 - distance) >= threshold
+        ]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    벡터 검색 + 문자 n-gram BM25 하이브리드 검색기.
+
+    최종 점수는 max(벡터 점수, (1 - w) * 벡터 점수 + w * BM25 점수)로 계산한다.
+    벡터 검색만으로 기준을 넘던 예시는 그대로 유지되고, 지역명처럼
+    정확히 일치하는 단어를 공유하는 예시만 점수가 올라간다.
+    BM25 인덱스는 initialize() 시점에 한 번만 생성한다.
+    """
+
+    name = "hybrid"
+
+    def __init__(self, dense, lexical_weight=0.4):
+        self.dense = dense
+        self.lexical_weight = lexical_weight
+        self.lexical = None
+        self.records = []
+
+    def initialize(self, jsonl_file="./data/QA.jsonl"):
+        if self.lexical is not None:
+            return
+
+        self.dense.initialize(jsonl_file)
+        if not self.dense.records:
+            self.dense.load_matrix()  # 🔹 Chroma는 전체 임베딩/레코드를 한 번 읽어와야 함
+        self._build_lexical()
+
+    def build(self, records, embeddings):
+        """파일 저장 없이 메모리에서 바로 인덱스를 구성하는 함수 (평가/테스트용)."""
+        self.dense.build(records, embeddings)
+        self._build_lexical()
+        return self
+
+    def _build_lexical(self):
+        self.records = self.dense.records
+        self.lexical = CharNgramBM25([record["question"] for record in self.records])
+        print(f"✅ BM25 문자 n-gram 인덱스 생성 완료 ({len(self.lexical.postings)}개 n-gram)")
+
+    def fuse(self, dense_scores, lexical_scores):
+        """벡터 점수와 BM25 점수를 결합한다."""
+        w = self.lexical_weight
+        return np.maximum(dense_scores, (1 - w) * dense_scores + w * lexical_scores)
+
+    def search(self, query, top_k=5, threshold=0.7):
+        query_embedding = encode_questions([query])[0]
+        return self.search_hybrid(query, query_embedding, top_k=top_k, threshold=threshold)
+
+    def search_hybrid(self, query, query_embedding, top_k=5, threshold=0.7):
+        """
+        질문 원문(BM25)과 임베딩(벡터) 점수를 결합하여 유사 질문을 검색하는 함수.
+
+        Args:
+            query (str): 사용자 질문
+            query_embedding (np.ndarray): 질문 임베딩
+            top_k (int): 검색할 유사 질문 개수
+            threshold (float): 결합 점수 기준 (이상만 반환)
+        """
+        scores = self.fuse(self.dense.score_all(query_embedding), self.lexical.score(query))
+        return top_k_results(scores, self.records, top_k, threshold)
+
+    def search_by_embedding(self, query_embedding, top_k=5, threshold=0.7):
+        # 🔹 질문 원문이 없으면 BM25를 쓸 수 없으므로 벡터 검색만 수행
+        return self.dense.search_by_embedding(query_embedding, top_k=top_k, threshold=threshold)
+
+
+RETRIEVER_BACKENDS = {
+    "numpy": lambda: NumpyRetriever(index_dir=RETRIEVER_CONFIG["index_dir"]),
+    "chroma": ChromaRetriever,
+}
+
+_retriever = None
+
+
+def create_retriever(backend=None, hybrid=None):
+    """
+    설정된 백엔드의 검색기를 생성하고 초기화하는 함수.
+
+    Args:
+        backend (str): "numpy" 또는 "chroma" (기본값: RETRIEVER_CONFIG["backend"])
+        hybrid (bool): BM25 하이브리드 검색 사용 여부 (기본값: RETRIEVER_CONFIG["hybrid"])
+
+    Returns:
+        BaseRetriever: 초기화된 검색기
+    """
+    backend = backend or RETRIEVER_CONFIG["backend"]
+    if backend not in RETRIEVER_BACKENDS:
+        raise ValueError(
+            f"지원하지 않는 검색기 백엔드입니다: {backend} "
+            f"(선택 가능: {', '.join(RETRIEVER_BACKENDS)})"
+        )
+
+    retriever = RETRIEVER_BACKENDS[backend]()
+    if RETRIEVER_CONFIG["hybrid"] if hybrid is None else hybrid:
+        retriever = HybridRetriever(retriever, lexical_weight=RETRIEVER_CONFIG["lexical_weight"])
+    retriever.initialize(RETRIEVER_CONFIG["qa_file"])
+    return retriever
+
+
+def get_retriever():
+    """프로세스 전역에서 공유하는 검색기를 반환한다 (최초 호출 시 생성)."""
+    global _retriever
+    if _retriever is None:
+        _retriever = create_retriever()
+    return _retriever
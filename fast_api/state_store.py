@@ -0,0 +1,206 @@
+"""
+공유 상태 저장소 모듈.
+
+`uvicorn --workers N` 이나 여러 레플리카로 서비스를 띄워도 대화가 끊기지 않도록
+세션별 매물 정보와 캐시를 프로세스 밖 저장소에 보관한다.
+
+- MemoryStateStore: 단일 프로세스용 (기본값, 기존 동작과 동일)
+- SQLiteStateStore: 같은 호스트의 여러 워커가 공유하는 로컬 파일 저장소 (테스트용 대체재)
+- RedisStateStore: 여러 호스트/레플리카가 공유하는 외부 저장소
+
+사용 예:
+    STATE_BACKEND=sqlite CHECKPOINT_BACKEND=sqlite uvicorn main:app --workers 4
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from config import STATE_CONFIG
+
+
+class BaseStateStore:
+    """
+    네임스페이스/키 단위로 JSON 직렬화 가능한 값을 저장하는 저장소 기본 클래스.
+
+    ttl(초)을 지정하면 해당 시간이 지난 값은 없는 것으로 취급한다.
+    """
+
+    def get(self, namespace, key, default=None):
+        raise NotImplementedError
+
+    def set(self, namespace, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, namespace, key):
+        raise NotImplementedError
+
+
+class MemoryStateStore(BaseStateStore):
+    """프로세스 메모리 저장소 (단일 워커 전용)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            item = self._data.get((namespace, key))
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at is not None and expires_at < time.time():
+            self.delete(namespace, key)
+            return default
+        return json.loads(value)
+
+    def set(self, namespace, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        # 🔹 다른 저장소와 동일하게 JSON으로 저장하여 직렬화 불가 값을 미리 걸러냄
+        with self._lock:
+            self._data[(namespace, key)] = (json.dumps(value, ensure_ascii=False), expires_at)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+
+class SQLiteStateStore(BaseStateStore):
+    """
+    SQLite 파일 저장소.
+
+    같은 호스트의 여러 워커 프로세스가 하나의 파일을 공유한다.
+    WAL 모드를 사용해 읽기와 쓰기가 서로를 막지 않도록 한다.
+    """
+
+    def __init__(self, path="./state/state.sqlite3"):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        conn.commit()
+
+    def _connection(self):
+        # 🔹 sqlite3 연결은 스레드 간 공유하지 않고 스레드마다 하나씩 사용
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key, default=None):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM state WHERE namespace = ? AND key = ?",
+            (namespace, str(key)),
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(namespace, key)
+            return default
+        return json.loads(value)
+
+    def set(self, namespace, key, value, ttl=None):
+        conn = self._connection()
+        conn.execute(
+            """
+            INSERT INTO state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (namespace, key) DO UPDATE SET
+                value = excluded.value, expires_at = excluded.expires_at
+            """,
+            (namespace, str(key), json.dumps(value, ensure_ascii=False),
+             time.time() + ttl if ttl else None),
+        )
+        conn.commit()
+
+    def delete(self, namespace, key):
+        conn = self._connection()
+        conn.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, str(key)))
+        conn.commit()
+
+
+class RedisStateStore(BaseStateStore):
+    """Redis 저장소 (여러 호스트/레플리카 공유용)."""
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="real_estate"):
+        import redis  # 🔹 redis 백엔드를 사용할 때만 필요
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace, key, default=None):
+        value = self.client.get(self._key(namespace, key))
+        return default if value is None else json.loads(value)
+
+    def set(self, namespace, key, value, ttl=None):
+        self.client.set(
+            self._key(namespace, key), json.dumps(value, ensure_ascii=False), ex=ttl
+        )
+
+    def delete(self, namespace, key):
+        self.client.delete(self._key(namespace, key))
+
+
+def create_state_store(backend=None):
+    """
+    설정된 백엔드의 상태 저장소를 생성하는 함수.
+
+    Args:
+        backend (str): "memory", "sqlite", "redis" (기본값: STATE_CONFIG["backend"])
+
+    Returns:
+        BaseStateStore: 상태 저장소
+    """
+    backend = backend or STATE_CONFIG["backend"]
+    if backend == "memory":
+        return MemoryStateStore()
+    if backend == "sqlite":
+        return SQLiteStateStore(STATE_CONFIG["sqlite_path"])
+    if backend == "redis":
+        return RedisStateStore(STATE_CONFIG["redis_url"])
+    raise ValueError(f"지원하지 않는 상태 저장소 백엔드입니다: {backend} (선택 가능: memory, sqlite, redis)")
+
+
+# ✅ 프로세스 전역 상태 저장소
+state_store = create_state_store()
+
+
+def shared_cache(namespace, ttl=None):
+    """
+    함수 결과를 공유 상태 저장소에 캐시하는 데코레이터.
+
+    위치 인자를 문자열로 이어 붙여 키로 사용하므로, 인자와 반환값은
+    JSON 직렬화가 가능해야 한다.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            key = ":".join(str(arg) for arg in args) or "_"
+            cached = state_store.get(namespace, key)
+            if cached is not None:
+                return cached
+            result = func(*args)
+            state_store.set(namespace, key, result, ttl=ttl)
+            return result
+        return wrapper
+    return decorator
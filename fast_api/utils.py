@@ -1,10 +1,12 @@
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import RunnableConfig
-from langchain_openai.chat_models.base import ChatOpenAI
 
 from dotenv import load_dotenv
 from langsmith import Client
 
+from config import STATE_CONFIG
+from llm_client import get_llm
+
 load_dotenv() 
 client = Client() # langsmith 추적
 
@@ -13,7 +15,49 @@ config = RunnableConfig(
     configurable={"thread_id": "1"},  # 스레드 ID 설정, ssesion_id랑 연결해서 사용 예정
     tags=["랭그래프"],  # Tag, 없어도 됨
 )
-memory = MemorySaver()
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=1)
+
+def create_checkpointer(backend=None):
+    """
+    LangGraph 체크포인터를 생성하는 함수.
+
+    memory 백엔드는 단일 프로세스에서만 대화가 유지되므로,
+    `uvicorn --workers N` 이나 여러 레플리카로 띄울 때는 sqlite(같은 호스트) 또는
+    postgres(여러 호스트) 백엔드를 사용한다.
+
+    Args:
+        backend (str): "memory", "sqlite", "postgres" (기본값: STATE_CONFIG["checkpoint_backend"])
+
+    Returns:
+        BaseCheckpointSaver: 체크포인터
+    """
+    backend = backend or STATE_CONFIG["checkpoint_backend"]
+    if backend == "memory":
+        return MemorySaver()
+    if backend == "sqlite":
+        import os
+        import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        path = STATE_CONFIG["checkpoint_sqlite_path"]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")  # 🔹 여러 워커가 동시에 읽고 쓸 수 있도록 WAL 사용
+        return SqliteSaver(conn)
+    if backend == "postgres":
+        from psycopg import Connection
+        from langgraph.checkpoint.postgres import PostgresSaver
+
+        conn = Connection.connect(
+            STATE_CONFIG["checkpoint_postgres_url"], autocommit=True, prepare_threshold=0
+        )
+        saver = PostgresSaver(conn)
+        saver.setup()  # 체크포인트 테이블이 없으면 생성
+        return saver
+    raise ValueError(f"지원하지 않는 체크포인트 백엔드입니다: {backend} (선택 가능: memory, sqlite, postgres)")
+
+
+memory = create_checkpointer()
+
+llm = get_llm()  # 노드 이름이 없는 호출용 (노드에서는 get_llm(노드 이름) 사용)
 